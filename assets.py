@@ -0,0 +1,320 @@
+"""
+Archivo con el administrador de recursos (imágenes, sonidos y fuentes).
+
+Cada recurso se carga una sola vez y se comparte: la primera vez que se
+pide se lee del disco (y las imágenes se convierten al formato de la
+pantalla), y las siguientes se devuelve el mismo objeto. Así una pantalla
+que se abre varias veces, o varios jugadores con la misma nave, no leen
+los archivos de nuevo. También lleva estadísticas de tiempo de carga y
+memoria ocupada.
+
+Si existe el atlas de texturas (generado con build_atlas.py), las imágenes
+que contiene salen de ahí: se lee un solo archivo y cada imagen es una
+subsuperficie. Las máscaras de colisión de todas se calculan juntas, con
+una sola pasada sobre el atlas. El índice guarda el tamaño y el CRC32 de
+cada imagen original: si alguna cambió, el atlas se ignora.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from os.path import join
+
+import pygame
+
+FONT_PATH = join('images', 'Oxanium-Bold.ttf')  # Fuente de la interfaz del juego
+ATLAS_INDEX = join('images', 'atlas.json')  # Índice generado por build_atlas.py
+ATLAS_VERSION = 2  # Cambiarla si cambia el formato del índice
+
+
+def source_fingerprint(path):
+    """
+    Devuelve el tamaño y el CRC32 de un archivo, para saber si cambió.
+
+    Argumentos:
+        path: Ruta del archivo
+
+    Devuelve:
+        list: [bytes, crc32]
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    return [len(data), zlib.crc32(data)]
+
+
+class AssetManager:
+    """
+    Administrador de recursos compartidos con carga perezosa.
+
+    Atributos:
+        images: Diccionario ruta -> superficie
+        sounds: Diccionario ruta -> pygame.mixer.Sound
+        fonts: Diccionario (ruta, tamaño) -> pygame.font.Font
+        masks: Diccionario superficie -> máscara de colisión
+        offsets: Diccionario superficie -> desplazamiento de su esquina
+                 respecto del centro de la imagen original
+        atlas: Superficie del atlas de texturas (None si no se usa)
+        atlas_checked: Si ya se buscó el atlas
+        lock: Lock para poder cargar recursos desde otro thread
+        load_time: Segundos totales que se tardó en cargar
+        loads: Cantidad de archivos cargados del disco
+        hits: Cantidad de pedidos que se resolvieron sin cargar nada
+    """
+
+    def __init__(self):
+        """
+        Crea un administrador sin recursos cargados.
+        """
+        self.images = {}
+        self.sounds = {}
+        self.fonts = {}
+        self.masks = {}
+        self.offsets = {}
+        self.atlas = None
+        self.atlas_checked = False
+        self.lock = threading.RLock()
+        self.load_time = 0.0
+        self.loads = 0
+        self.hits = 0
+
+    def _get(self, cache, key, load):
+        """
+        Devuelve un recurso de la caché o lo carga con load() si no está.
+        """
+        with self.lock:
+            value = cache.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            start = time.perf_counter()
+            value = cache[key] = load()
+            self.load_time += time.perf_counter() - start
+            self.loads += 1
+            return value
+
+    def load_atlas(self, index_path=ATLAS_INDEX):
+        """
+        Carga el atlas de texturas y registra cada imagen que contiene.
+
+        Argumentos:
+            index_path: Ruta del índice generado por build_atlas.py
+
+        Devuelve:
+            bool: True si se cargó. Si no existe, es de otra versión o alguna
+                  imagen original cambió desde que se generó, se ignora y
+                  las imágenes se cargan de sus archivos.
+        """
+        with self.lock:
+            self.atlas_checked = True
+            try:
+                with open(index_path) as file:
+                    index = json.load(file)
+            except (OSError, ValueError):
+                return False
+            if index.get("version") != ATLAS_VERSION:
+                return False
+
+            for name, frame in index["frames"].items():
+                try:
+                    changed = source_fingerprint(name) != frame["source"]
+                except OSError:
+                    changed = False  # Sin el original, el atlas es lo único que hay
+                if changed:
+                    print(f"El atlas está desactualizado ({name} cambió), se usan "
+                          f"las imágenes sueltas. Regenerarlo con python build_atlas.py")
+                    return False
+
+            start = time.perf_counter()
+            directory = os.path.dirname(index_path)
+            atlas = pygame.image.load(join(directory, index["image"]))
+            if pygame.display.get_surface() is not None:
+                atlas = atlas.convert_alpha()
+            # Máscaras de todas las imágenes de una vez (hay un píxel vacío entre ellas)
+            atlas_mask = pygame.mask.from_surface(atlas)
+
+            for name, frame in index["frames"].items():
+                x, y, width, height = frame["rect"]
+                surf = atlas.subsurface((x, y, width, height))
+                mask = pygame.mask.Mask((width, height))
+                mask.draw(atlas_mask, (-x, -y))
+                original_width, original_height = frame["size"]
+                self.images[join(*name.split('/'))] = surf
+                self.masks[surf] = mask
+                self.offsets[surf] = (frame["offset"][0] - original_width // 2,
+                                      frame["offset"][1] - original_height // 2)
+
+            self.atlas = atlas
+            self.load_time += time.perf_counter() - start
+            self.loads += 2  # Índice y atlas
+            return True
+
+    def image(self, *path, alpha=True):
+        """
+        Devuelve una imagen, cargándola la primera vez.
+
+        Argumentos:
+            path: Partes de la ruta del archivo (se unen con join)
+            alpha: Si la imagen tiene transparencia (convert_alpha o convert)
+
+        Devuelve:
+            pygame.Surface: Imagen compartida (no se debe modificar). Si la
+                            imagen está en el atlas es una subsuperficie,
+                            recortada a su parte visible si es un frame de
+                            una animación (ver center_offset).
+        """
+        if not self.atlas_checked:
+            self.load_atlas()
+
+        def load():
+            surf = pygame.image.load(join(*path))
+            # Convertir necesita una pantalla; sin ella la dejamos como está
+            if pygame.display.get_surface() is None:
+                return surf
+            return surf.convert_alpha() if alpha else surf.convert()
+
+        return self._get(self.images, join(*path), load)
+
+    def mask(self, surf):
+        """
+        Devuelve la máscara de colisión de una imagen, calculándola una sola vez.
+
+        Argumentos:
+            surf: Superficie (no se debe modificar después de pedir su máscara)
+
+        Devuelve:
+            pygame.mask.Mask: Máscara compartida. Las de las imágenes del
+                              atlas se calculan al cargarlo.
+        """
+        # Se pide en cada frame: no pasa por _get para no contarse en las estadísticas
+        mask = self.masks.get(surf)
+        if mask is None:
+            mask = self.masks[surf] = pygame.mask.from_surface(surf)
+        return mask
+
+    def center_offset(self, surf):
+        """
+        Devuelve dónde va la esquina de una imagen respecto de su centro.
+
+        Argumentos:
+            surf: Superficie a ubicar
+
+        Devuelve:
+            tuple: (dx, dy) a sumar al centro para obtener la esquina superior
+                   izquierda. Para los frames recortados del atlas tiene en
+                   cuenta el recorte, así quedan donde estaba la imagen original.
+        """
+        offset = self.offsets.get(surf)
+        if offset is None:
+            offset = (-(surf.get_width() // 2), -(surf.get_height() // 2))
+        return offset
+
+    def frames(self, directory, count):
+        """
+        Devuelve una animación guardada como archivos 0.png, 1.png, ...
+
+        Argumentos:
+            directory: Carpeta con los frames
+            count: Cantidad de frames
+
+        Devuelve:
+            list: Superficies de cada frame, en orden
+        """
+        return [self.image(directory, f'{i}.png') for i in range(count)]
+
+    def sound(self, *path):
+        """
+        Devuelve un sonido, cargándolo la primera vez.
+
+        Argumentos:
+            path: Partes de la ruta del archivo (se unen con join)
+
+        Devuelve:
+            pygame.mixer.Sound: Sonido compartido
+        """
+        return self._get(self.sounds, join(*path), lambda: pygame.mixer.Sound(join(*path)))
+
+    def font(self, size, path=FONT_PATH):
+        """
+        Devuelve una fuente de un tamaño, cargándola la primera vez.
+
+        Argumentos:
+            size: Tamaño de la fuente
+            path: Archivo de la fuente (None para la fuente por defecto de pygame)
+
+        Devuelve:
+            pygame.font.Font: Fuente compartida
+        """
+        return self._get(self.fonts, (path, size), lambda: pygame.font.Font(path, size))
+
+    def preload(self, images=(), sounds=(), fonts=()):
+        """
+        Carga recursos en un thread aparte, para que ya estén listos cuando se pidan.
+
+        Argumentos:
+            images: Rutas de imágenes (tuplas con las partes de cada ruta)
+            sounds: Rutas de sonidos (tuplas con las partes de cada ruta)
+            fonts: Tamaños de la fuente de la interfaz
+
+        Devuelve:
+            threading.Thread: Thread ya iniciado; join() espera a que termine.
+                              Pedir un recurso mientras se precarga es seguro:
+                              si todavía no está, se carga en ese momento.
+        """
+        loads = ([(self.image, path) for path in images]
+                 + [(self.sound, path) for path in sounds]
+                 + [(self.font, (size,)) for size in fonts])
+
+        def load_all():
+            for load, args in loads:
+                try:
+                    load(*args)
+                except (pygame.error, FileNotFoundError) as e:
+                    # Seguimos con los demás; este se vuelve a pedir (y falla)
+                    # en el thread principal, donde se maneja el error
+                    print(f"Error al precargar recursos: {e}")
+
+        thread = threading.Thread(target=load_all, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """
+        Devuelve las estadísticas de carga y memoria.
+
+        Devuelve:
+            dict: Cantidad de imágenes, sonidos y fuentes, archivos cargados,
+                  pedidos resueltos sin cargar, segundos de carga y bytes
+                  aproximados de imágenes y sonidos
+        """
+        with self.lock:
+            # Las subsuperficies del atlas comparten sus píxeles: contamos el atlas una vez
+            surfaces = {}
+            for surf in self.images.values():
+                surf = surf.get_parent() or surf
+                surfaces[id(surf)] = surf
+            image_bytes = sum(surf.get_width() * surf.get_height() * surf.get_bytesize()
+                              for surf in surfaces.values())
+            # Los sonidos se guardan sin comprimir en el formato del mixer
+            sound_bytes = 0
+            mixer = pygame.mixer.get_init()
+            if mixer:
+                frequency, size, channels = mixer
+                sound_bytes = int(sum(sound.get_length() for sound in self.sounds.values())
+                                  * frequency * channels * abs(size) // 8)
+            return {
+                "images": len(self.images),
+                "sounds": len(self.sounds),
+                "fonts": len(self.fonts),
+                "loads": self.loads,
+                "hits": self.hits,
+                "load_time": self.load_time,
+                "image_bytes": image_bytes,
+                "sound_bytes": sound_bytes,
+            }
+
+
+# Administrador compartido por todo el cliente y el panel del servidor
+assets = AssetManager()
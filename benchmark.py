@@ -0,0 +1,918 @@
+"""
+Archivo con benchmarks de rendimiento del juego.
+
+Cada benchmark es un subcomando, por ejemplo:
+
+    python benchmark.py protocol
+
+Los resultados se imprimen como tabla de texto.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+
+def measure_rate(func, duration=0.5):
+    """
+    Mide cuántas veces por segundo se puede ejecutar una función.
+
+    Argumentos:
+        func: Función sin argumentos a medir
+        duration: Tiempo mínimo de medición en segundos
+
+    Devuelve:
+        float: Ejecuciones por segundo
+    """
+    count = 0
+    batch = 100
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < duration:
+        for _ in range(batch):
+            func()
+        count += batch
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def bench_protocol(args):
+    """
+    Compara el protocolo binario con JSON: bytes por mensaje y
+    codificaciones/decodificaciones por segundo.
+    """
+    import io
+    import protocol
+    from snapshot import diff_state
+
+    players = {
+        str(pid): {"id": pid, "username": f"Player{pid}", "x": 100 * pid, "y": 500,
+                   "lives": 3, "score": 40 * pid, "alive": True}
+        for pid in range(1, 5)
+    }
+    state = {"status": "running", "num_players": 4, "players": players}
+    moved = {"status": "running", "num_players": 4,
+             "players": {**players, "1": {**players["1"], "x": 120, "y": 480}}}
+
+    messages = [
+        ("update_position", {"action": "update_position", "x": 512, "y": 640}),
+        ("hit", {"action": "hit"}),
+        ("update_score", {"action": "update_score", "score": 1230}),
+        ("ack", {"action": "ack", "seq": 4821}),
+        ("input (movimiento)", {"action": "input", "seq": 1520, "kind": "move",
+                                "dx": 1, "dy": -1, "dt": 50}),
+        ("input_ack", {"type": "input_ack", "seq": 1520, "x": 512, "y": 640,
+                       "lives": 3, "score": 1230, "alive": True}),
+        ("keyframe (4 jugadores)", {"type": "state", "seq": 4821, "state": state}),
+        ("delta (1 movimiento)", {"type": "delta", "seq": 4822, "base": 4821,
+                                  "delta": diff_state(state, moved)}),
+    ]
+
+    print(f"{'mensaje':<24}{'formato':<8}{'bytes':>7}{'enc/s':>12}{'dec/s':>12}")
+    for name, message in messages:
+        for fmt in (protocol.JSON_PROTOCOL, protocol.BINARY_PROTOCOL):
+            data = protocol.encode_message(message, fmt)
+            encode_rate = measure_rate(lambda: protocol.encode_message(message, fmt), args.duration)
+            decode_rate = measure_rate(lambda: protocol.read_message(io.BytesIO(data)), args.duration)
+            print(f"{name:<24}{fmt:<8}{len(data):>7}{encode_rate:>12,.0f}{decode_rate:>12,.0f}")
+
+
+def _run_benchmark_server(engine, port, pipe, duration):
+    """
+    Corre el servidor en un proceso hijo y mide los mensajes que procesa.
+
+    Se fija el proceso a un solo núcleo para comparar los motores en las
+    mismas condiciones. Espera la señal del proceso padre (cuando todas
+    las conexiones están abiertas), mide durante "duration" segundos y
+    devuelve por el pipe la cantidad de mensajes por segundo.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+    import server
+    server.PORT = port
+    server.HOST = "127.0.0.1"
+    server.MAX_PLAYERS = 100000  # Sin límite para medir muchas conexiones
+    threading.Thread(target=server.ENGINES[engine], daemon=True).start()
+
+    pipe.recv()  # Esperamos a que el cliente de carga esté listo
+    start_count = server.messages_received
+    time.sleep(duration)
+    pipe.send((server.messages_received - start_count) / duration)
+    pipe.recv()  # No cerramos hasta que la carga se detenga
+
+
+async def _load_connection(port, stop, opened, rate):
+    """
+    Conexión de carga: envía "rate" posiciones por segundo (como un cliente
+    real, que manda una cada 50 ms) y descarta los snapshots que recibe.
+    La posición no cambia, así que el servidor no genera snapshots y se
+    mide solo el costo de recibir y procesar mensajes.
+    """
+    import protocol
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(protocol.encode_json({"action": "join", "username": "bench",
+                                       "protocols": [protocol.BINARY_PROTOCOL]}))
+    await reader.readline()  # welcome
+    opened.append(writer)
+
+    async def drain_input():
+        try:
+            while await reader.read(65536):
+                pass
+        except ConnectionError:
+            pass
+
+    drain_task = asyncio.create_task(drain_input())
+    message = protocol.encode_message({"action": "update_position", "x": 500, "y": 500},
+                                      protocol.BINARY_PROTOCOL)
+    interval = 1 / rate
+    next_send = time.perf_counter()
+    try:
+        while not stop.is_set():
+            writer.write(message)
+            await writer.drain()
+            next_send += interval
+            await asyncio.sleep(max(0, next_send - time.perf_counter()))
+    finally:
+        drain_task.cancel()
+        writer.close()
+
+
+async def _run_load(port, connections, pipe, rate):
+    """
+    Abre todas las conexiones de carga, avisa al servidor y las mantiene
+    enviando mensajes durante la medición.
+    """
+    stop = asyncio.Event()
+    opened = []
+    tasks = []
+    for _ in range(connections):
+        tasks.append(asyncio.create_task(_load_connection(port, stop, opened, rate)))
+        await asyncio.sleep(0.001)  # No saturamos la cola de accept
+    while len(opened) < connections:
+        await asyncio.sleep(0.05)
+        if any(task.done() for task in tasks):
+            break
+
+    loop = asyncio.get_running_loop()
+    pipe.send("start")
+    processed = await loop.run_in_executor(None, pipe.recv)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    pipe.send("stop")
+    return len(opened), processed
+
+
+def bench_server(args):
+    """
+    Compara los motores de red del servidor (threads vs asyncio): cuántas
+    conexiones mantiene y cuántos mensajes por segundo procesa en un núcleo.
+
+    La carga ofrecida es conexiones * rate mensajes por segundo; si el
+    servidor procesa menos, el motor no sostiene esa cantidad de conexiones.
+    """
+    counts = [int(count) for count in args.connections.split(",")]
+    port = args.port
+
+    print(f"{'motor':<10}{'conexiones':>12}{'ofrecidos/s':>14}{'procesados/s':>14}")
+    for engine in ("threaded", "asyncio"):
+        for count in counts:
+            parent_pipe, child_pipe = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_benchmark_server,
+                args=(engine, port, child_pipe, args.duration), daemon=True)
+            process.start()
+            time.sleep(1)  # Tiempo para que el servidor empiece a escuchar
+
+            opened, processed = asyncio.run(_run_load(port, count, parent_pipe, args.rate))
+            print(f"{engine:<10}{opened:>12}{opened * args.rate:>14,.0f}{processed:>14,.0f}")
+
+            process.terminate()
+            process.join()
+            port += 1
+
+
+def _init_headless_pygame():
+    """
+    Inicializa pygame sin ventana para medir el código de dibujo del cliente.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((1000, 800))
+    return pygame
+
+
+def bench_meteors(args):
+    """
+    Mide la actualización de meteoritos por frame: rotozoom en cada frame
+    contra la caché de rotaciones compartida.
+    """
+    pygame = _init_headless_pygame()
+    from meteor import Meteor
+    from rotation_cache import RotationCache
+
+    surf = pygame.image.load(os.path.join("images", "meteor.png")).convert_alpha()
+    start = time.perf_counter()
+    rotations = RotationCache(surf, args.step)
+    build_time = time.perf_counter() - start
+    print(f"caché: {len(rotations.frames)} rotaciones cada {rotations.step:g}°, "
+          f"{rotations.size_bytes / 1024 / 1024:.1f} MB, {build_time * 1000:.0f} ms")
+
+    print(f"{'meteoritos':>10}{'modo':>10}{'frames/s':>12}")
+    for count in [int(count) for count in args.counts.split(",")]:
+        for mode, cache in (("rotozoom", None), ("caché", rotations)):
+            group = pygame.sprite.Group()
+            for i in range(count):
+                # Edad 0 y vida larga: los meteoritos no desaparecen durante la medición
+                meteor = Meteor(group, surf, (i * 10 % 1000, 0), 0, 0, 60, rotations=cache)
+                meteor.lifetime = float("inf")
+            rate = measure_rate(lambda: group.update(1 / 60), args.duration) if count else 0
+            print(f"{count:>10}{mode:>10}{rate:>12,.0f}")
+
+
+def bench_collisions(args):
+    """
+    Mide la detección de colisiones láser/meteorito de un frame: fuerza
+    bruta con pygame.sprite.spritecollide contra la grilla espacial.
+    """
+    pygame = _init_headless_pygame()
+    from collision import SpatialHash
+
+    rng = random.Random(1)
+    meteor_surf = pygame.image.load(os.path.join("images", "meteor.png")).convert_alpha()
+    laser_surf = pygame.image.load(os.path.join("images", "laser.png")).convert_alpha()
+
+    def make_sprites(surf, count):
+        sprites = []
+        for _ in range(count):
+            sprite = pygame.sprite.Sprite()
+            sprite.image = surf
+            sprite.rect = surf.get_rect(center=(rng.randint(0, 1000), rng.randint(0, 800)))
+            sprite.mask = pygame.mask.from_surface(surf)
+            sprites.append(sprite)
+        return sprites
+
+    print(f"{'láseres':>8}{'meteoritos':>12}{'fuerza bruta/s':>16}{'grilla/s':>12}")
+    for count in [int(count) for count in args.counts.split(",")]:
+        lasers = make_sprites(laser_surf, count)
+        meteors = pygame.sprite.Group(make_sprites(meteor_surf, count))
+        grid = SpatialHash(args.cell_size)
+
+        # Sin eliminar sprites, así cada medición prueba el mismo frame
+        def brute_force():
+            for laser in lasers:
+                pygame.sprite.spritecollide(laser, meteors, False, pygame.sprite.collide_mask)
+
+        def spatial_hash():
+            grid.rebuild(meteors)
+            for laser in lasers:
+                grid.spritecollide(laser, False, pygame.sprite.collide_mask)
+
+        brute_rate = measure_rate(brute_force, args.duration)
+        grid_rate = measure_rate(spatial_hash, args.duration)
+        print(f"{count:>8}{count:>12}{brute_rate:>16,.0f}{grid_rate:>12,.0f}")
+
+
+def bench_entities(args):
+    """
+    Mide la actualización por frame de meteoritos y láseres: un sprite con
+    update() por entidad contra los arreglos de entity_store.
+    """
+    pygame = _init_headless_pygame()
+    from entity_store import NUMPY_AVAILABLE, MeteorStore, LaserStore
+    from laser import Laser
+    from meteor import Meteor
+    from rotation_cache import RotationCache
+
+    if not NUMPY_AVAILABLE:
+        print("NumPy no está instalado: no hay nada que comparar")
+        return
+
+    rng = random.Random(1)
+    meteor_surf = pygame.image.load(os.path.join("images", "meteor.png")).convert_alpha()
+    laser_surf = pygame.image.load(os.path.join("images", "laser.png")).convert_alpha()
+    rotations = RotationCache(meteor_surf)
+
+    print(f"{'entidades':>10}{'sprites µs/frame':>18}{'arreglos µs/frame':>19}")
+    for count in [int(count) for count in args.counts.split(",")]:
+        meteors = [{"pos": (rng.randint(0, 1000), rng.randint(-200, 600)),
+                    "direction_x": rng.uniform(-0.5, 0.5), "speed": rng.randint(500, 600),
+                    "rotation_speed": rng.randint(50, 80)} for _ in range(count // 2)]
+        lasers = [(rng.randint(0, 1000), rng.randint(0, 800)) for _ in range(count - count // 2)]
+
+        group = pygame.sprite.Group()
+        for params in meteors:
+            Meteor(group, meteor_surf, rotations=rotations, **params).lifetime = float("inf")
+        for pos in lasers:
+            Laser(group, laser_surf, pos).speed = 0
+
+        # Vida infinita y láseres quietos: las entidades no desaparecen durante la medición
+        meteor_store = MeteorStore(rotations, lifetime=float("inf"))
+        laser_store = LaserStore(laser_surf, speed=0)
+        for params in meteors:
+            meteor_store.spawn(**params)
+        for pos in lasers:
+            laser_store.spawn(pos)
+
+        def update_stores():
+            meteor_store.update(1 / 60)
+            laser_store.update(1 / 60)
+
+        sprites_rate = measure_rate(lambda: group.update(1 / 60, ()), args.duration)
+        stores_rate = measure_rate(update_stores, args.duration)
+        print(f"{count:>10}{1e6 / sprites_rate:>18,.0f}{1e6 / stores_rate:>19,.0f}")
+
+
+def bench_pools(args):
+    """
+    Simula una partida a 60 FPS con disparos, meteoritos y explosiones
+    constantes y cuenta cuántos sprites se crean por segundo con los pools.
+    """
+    pygame = _init_headless_pygame()
+    from laser import Laser
+    from main import Explosion
+    from meteor import Meteor
+    from rotation_cache import RotationCache
+    from sprite_pool import SpritePool
+
+    rng = random.Random(1)
+    meteor_surf = pygame.image.load(os.path.join("images", "meteor.png")).convert_alpha()
+    laser_surf = pygame.image.load(os.path.join("images", "laser.png")).convert_alpha()
+    explosion_frames = [pygame.image.load(os.path.join("images", "explosion", f"{i}.png")).convert_alpha()
+                        for i in range(21)]
+    rotations = RotationCache(meteor_surf)
+
+    pools = {"láseres": SpritePool(Laser), "meteoritos": SpritePool(Meteor),
+             "explosiones": SpritePool(Explosion)}
+    # Cada cuántos frames aparece uno de cada tipo (con --rate veces más de todo)
+    intervals = {"láseres": 24 / args.rate, "meteoritos": 30 / args.rate,
+                 "explosiones": 24 / args.rate}
+
+    group = pygame.sprite.Group()
+    warmup = 5 * 60
+    frames = int(args.seconds * 60)
+    for frame in range(frames):
+        if frame == warmup:
+            baseline = {name: (pool.hits, pool.misses) for name, pool in pools.items()}
+        for name, interval in intervals.items():
+            for _ in range(int((frame + 1) / interval) - int(frame / interval)):
+                pos = (rng.randint(0, 1000), rng.randint(0, 800))
+                if name == "láseres":
+                    pools[name].acquire(group, laser_surf, pos)
+                elif name == "meteoritos":
+                    pools[name].acquire(group, meteor_surf, pos, rotations=rotations)
+                else:
+                    pools[name].acquire(group, explosion_frames, pos)
+        group.update(1 / 60, ())
+
+    seconds = (frames - warmup) / 60
+    print(f"{args.seconds:g} s de juego, {seconds:g} s medidos después de {warmup // 60} s")
+    print(f"{'pool':>12}{'creados':>10}{'reutilizados/s':>16}{'creados/s':>11}")
+    for name, pool in pools.items():
+        hits, misses = baseline[name]
+        print(f"{name:>12}{pool.misses:>10}{(pool.hits - hits) / seconds:>16.1f}"
+              f"{(pool.misses - misses) / seconds:>11.2f}")
+
+
+def bench_ui(args):
+    """
+    Mide un frame de la interfaz (fondo con gradiente y paneles): dibujar
+    todo en cada frame contra la caché de superficies.
+    """
+    pygame = _init_headless_pygame()
+    import render_cache
+
+    screen = pygame.display.get_surface()
+    panels = [(pygame.Rect(200, 350 + i * 60, 600, 50), (30, 35, 55), 240)
+              for i in range(args.panels)]
+
+    def uncached():
+        screen.blit(render_cache.build_gradient(screen.get_size(), (15, 20, 35), (30, 40, 60)),
+                    (0, 0))
+        for rect, color, alpha in panels:
+            screen.blit(render_cache.build_panel(rect.size, color, alpha), rect,
+                        special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def cached():
+        render_cache.draw_gradient_background(screen, (15, 20, 35), (30, 40, 60))
+        for rect, color, alpha in panels:
+            render_cache.draw_panel(screen, rect, color, alpha)
+
+    uncached_rate = measure_rate(uncached, args.duration)
+    cached_rate = measure_rate(cached, args.duration)
+    cache = render_cache.cache
+    print(f"gradiente + {args.panels} paneles en {screen.get_width()}x{screen.get_height()}")
+    print(f"sin caché: {1000 / uncached_rate:.2f} ms/frame")
+    print(f"con caché: {1000 / cached_rate:.2f} ms/frame "
+          f"({len(cache.surfaces)} superficies, {cache.size_bytes / 1024 / 1024:.1f} MB)")
+
+
+def bench_text(args):
+    """
+    Mide los textos del HUD de un frame (puntaje y marcador de los demás
+    jugadores): renderizar en cada frame contra la caché de textos.
+    """
+    pygame = _init_headless_pygame()
+    from text_cache import TextCache
+
+    font_path = os.path.join("images", "Oxanium-Bold.ttf")
+    score_font = pygame.font.Font(font_path, 50)
+    hud_font = pygame.font.Font(font_path, 28)
+    lines = [f"player{i}: {i * 130} pts ({3 - i % 3})" for i in range(args.players)]
+    cache = TextCache()
+
+    def uncached():
+        score_font.render("1250", True, (255, 255, 100))
+        for line in lines:
+            hud_font.render(line, True, (220, 220, 220))
+
+    def cached():
+        cache.render(score_font, "1250", True, (255, 255, 100))
+        for line in lines:
+            cache.render(hud_font, line, True, (220, 220, 220))
+
+    uncached_rate = measure_rate(uncached, args.duration)
+    cached_rate = measure_rate(cached, args.duration)
+    print(f"puntaje + {args.players} líneas del marcador")
+    print(f"sin caché: {1e6 / uncached_rate:,.0f} µs/frame")
+    print(f"con caché: {1e6 / cached_rate:,.1f} µs/frame (aciertos: {cache.hit_rate():.1%})")
+
+
+def bench_render(args):
+    """
+    Mide el tiempo de un frame de juego con la pantalla completa contra
+    el renderizado por rectángulos sucios (pygame en modo software).
+    """
+    pygame = _init_headless_pygame()
+    from dirty_renderer import DirtyRenderer
+    from render_cache import draw_panel
+
+    rng = random.Random(1)
+    screen = pygame.display.get_surface()
+    meteor_surf = pygame.image.load(os.path.join("images", "meteor.png")).convert_alpha()
+    star_surf = pygame.image.load(os.path.join("images", "star.png")).convert_alpha()
+    player_surf = pygame.image.load(os.path.join("images", "player.png")).convert_alpha()
+
+    background = pygame.Surface(screen.get_size()).convert()
+    background.fill("#1a1a2e")
+    for _ in range(20):
+        background.blit(star_surf, (rng.randint(0, 1000), rng.randint(0, 800)))
+
+    panels = [pygame.Rect(380, 700, 240, 70), pygame.Rect(10, 10, 160, 60),
+              pygame.Rect(670, 10, 320, 145)]
+    hud = [(index, rect.inflate(8, 8), 0, lambda surface, rect=rect: draw_panel(surface, rect))
+           for index, rect in enumerate(panels)]
+    positions = [[rng.randint(0, 1000), rng.randint(0, 800)] for _ in range(args.meteors)]
+    player_rect = player_surf.get_rect(center=(500, 400))
+
+    def frame_sprites():
+        for position in positions:
+            position[1] = (position[1] + 9) % 900 - 50
+        return ([(meteor_surf, meteor_surf.get_rect(center=position)) for position in positions]
+                + [(player_surf, player_rect)])
+
+    def full():
+        screen.blit(background, (0, 0))
+        for key, rect, signature, draw in hud:
+            draw(screen)
+        for image, rect in frame_sprites():
+            screen.blit(image, rect)
+        pygame.display.update()
+
+    renderer = DirtyRenderer(screen, background)
+
+    def dirty():
+        renderer.render(hud, frame_sprites())
+
+    full_rate = measure_rate(full, args.duration)
+    dirty_rate = measure_rate(dirty, args.duration)
+    total = screen.get_width() * screen.get_height()
+    print(f"{args.meteors} meteoritos, jugador quieto y 3 paneles en "
+          f"{screen.get_width()}x{screen.get_height()} (driver {pygame.display.get_driver()})")
+    print(f"pantalla completa: {1000 / full_rate:.2f} ms/frame")
+    print(f"dirty rects:       {1000 / dirty_rate:.2f} ms/frame "
+          f"({renderer.dirty_area / total:.0%} de la pantalla repintada)")
+
+
+# Benchmarks disponibles: nombre -> (función, descripción, argumentos propios)
+def bench_startup(args):
+    """
+    Mide la carga de los sprites del juego y sus máscaras al iniciar: PNG
+    sueltos contra el atlas de texturas.
+    """
+    _init_headless_pygame()
+    from assets import AssetManager
+    from build_atlas import ANIMATIONS, IMAGES
+
+    paths = [("images", name) for name in IMAGES]
+    for directory, count in ANIMATIONS.items():
+        paths += [("images", directory, f"{i}.png") for i in range(count)]
+
+    for name, use_atlas in (("PNG sueltos", False), ("atlas", True)):
+        times = []
+        for _ in range(args.repeat):
+            manager = AssetManager()
+            start = time.perf_counter()
+            if not use_atlas:
+                manager.atlas_checked = True  # No buscar el atlas
+            elif not manager.load_atlas():
+                print("No hay atlas (o está desactualizado): python build_atlas.py")
+                return
+            for path in paths:
+                manager.mask(manager.image(*path))
+            times.append(time.perf_counter() - start)
+        stats = manager.stats()
+        print(f"{name:>12}: {min(times) * 1000:6.1f} ms, {stats['loads']:3d} archivos leídos, "
+              f"{stats['image_bytes'] / 1024:.0f} KB de imágenes")
+
+
+def bench_interpolation(args):
+    """
+    Simula una nave remota que da vueltas a 300 px/s, con posiciones que
+    llegan con variación y pérdidas, dibujada a 60 FPS: última posición
+    recibida contra el buffer de interpolación. Mide cuánto varía el
+    desplazamiento entre frames (0 = movimiento perfectamente parejo).
+    """
+    import math
+    import statistics
+    from interpolation import InterpolationBuffer
+
+    rng = random.Random(1)
+    speed, radius = 300, 200
+
+    def position(t):
+        angle = t * speed / radius
+        return (500 + radius * math.cos(angle), 400 + radius * math.sin(angle))
+
+    # Posiciones enviadas cada 1/rate segundos, que llegan con latencia variable
+    arrivals = []
+    for i in range(int(args.seconds * args.rate)):
+        if rng.random() < args.loss:
+            continue
+        sent = i / args.rate
+        arrivals.append((sent + 0.03 + rng.uniform(0, args.jitter), position(sent)))
+    arrivals.sort()
+
+    for delay in (None, *(float(d) for d in args.delays.split(","))):
+        buffer = InterpolationBuffer(delay or 0)
+        latest = None
+        steps = []
+        previous = None
+        pending = iter(arrivals)
+        arrival = next(pending, None)
+        for frame in range(int(args.seconds * 60)):
+            now = frame / 60
+            while arrival is not None and arrival[0] <= now:
+                latest = arrival[1]
+                buffer.add({"1": arrival[1]}, arrival[0])
+                arrival = next(pending, None)
+            current = latest if delay is None else buffer.sample(now).get("1")
+            if current is not None and previous is not None:
+                steps.append(math.dist(current, previous))
+            previous = current
+        name = "última posición" if delay is None else f"buffer {delay * 1000:.0f} ms"
+        print(f"{name:>16}: desplazamiento por frame {statistics.mean(steps):5.2f} px, "
+              f"desvío {statistics.pstdev(steps):5.2f} px, "
+              f"frames quietos {sum(step < 0.5 for step in steps) / len(steps):5.1%}")
+
+
+def bench_prediction(args):
+    """
+    Simula un jugador que cambia de dirección al azar a 60 FPS con un
+    servidor a cierta latencia: entradas enviadas, costo de reconciliar y
+    diferencia final entre la predicción y el servidor.
+    """
+    import protocol
+    from prediction import Prediction, apply_input, new_player_state
+
+    rng = random.Random(1)
+    for rtt in (float(r) for r in args.rtts.split(",")):
+        prediction = Prediction()
+        prediction.authoritative = True
+        server = new_player_state()
+        in_flight = []  # (frame en que llega al servidor, entrada)
+        acks = []  # (frame en que llega al cliente, seq, estado)
+        sent_bytes = sent = 0
+        replayed = reconcile_time = 0
+        direction = (0, 0)
+        frames = int(args.seconds * 60)
+        latency = round(rtt / 2 * 60)  # Frames de ida (y de vuelta)
+
+        for frame in range(frames):
+            if rng.random() < 0.05:
+                direction = (rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+            prediction.move(*direction, 1 / 60)
+            if frame % 3 == 0:  # Cada 50 ms, como el cliente
+                for msg in prediction.flush():
+                    sent += 1
+                    sent_bytes += len(protocol.encode_message(msg, protocol.BINARY_PROTOCOL))
+                    in_flight.append((frame + latency, msg))
+            while in_flight and in_flight[0][0] <= frame:
+                msg = in_flight.pop(0)[1]
+                apply_input(server, msg)
+                acks.append((frame + latency, msg["seq"], dict(server)))
+            while acks and acks[0][0] <= frame:
+                _arrival, seq, state = acks.pop(0)
+                replayed += len(prediction.pending)
+                start = time.perf_counter()
+                prediction.reconcile(seq, state)
+                reconcile_time += time.perf_counter() - start
+
+        # Dejamos llegar todo lo pendiente
+        for msg in [msg for _frame, msg in in_flight] + prediction.flush():
+            apply_input(server, msg)
+            prediction.reconcile(msg["seq"], dict(server))
+        seconds = frames / 60
+        print(f"RTT {rtt * 1000:4.0f} ms: {sent / seconds:4.1f} entradas/s "
+              f"({sent_bytes / seconds:4.0f} B/s), {replayed / max(1, prediction.seq):4.1f} "
+              f"entradas repetidas por confirmación, "
+              f"reconciliar {reconcile_time / max(1, prediction.seq) * 1e6:4.1f} µs, "
+              f"correcciones {prediction.corrections}, "
+              f"diferencia final {prediction.state != server}")
+
+
+def bench_send(args):
+    """
+    Mide cuánto bloquea al loop del juego enviar los mensajes de cada frame:
+    un sendall por mensaje contra la cola de envío de network.py, con una
+    red rápida y con una que no da abasto (el receptor lee de a poco).
+    """
+    import socket
+
+    import protocol
+    from network import Network
+
+    cases = [(f"{name} ({bandwidth / 1000:g} KB/s)" if bandwidth else name, queued, bandwidth)
+             for bandwidth in (0, args.bandwidth)
+             for name, queued in (("sendall directo", False), ("cola", True))]
+    for name, queued, bandwidth in cases:
+        rng = random.Random(1)
+        # Buffers chicos (antes de conectar) para que una red lenta llene la conexión enseguida
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        client.connect(listener.getsockname())
+        server, _addr = listener.accept()
+        listener.close()
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def receive():
+            # Con bandwidth, leemos de a bandwidth / 100 bytes cada 10 ms
+            try:
+                while server.recv(max(1, int(bandwidth / 100)) if bandwidth else 65536):
+                    if bandwidth:
+                        time.sleep(0.01)
+            except OSError:
+                pass  # Cerramos el socket al terminar el caso
+
+        receiver = threading.Thread(target=receive, daemon=True)
+        receiver.start()
+
+        network = Network()
+        network.client = client
+        network.connected = True
+        sender = threading.Thread(target=network.send_loop, daemon=True)
+        if queued:
+            sender.start()
+
+        frame_times = []
+        writes = messages = 0
+        score = 0
+        frames = int(args.seconds * 60)
+        next_frame = time.perf_counter()
+        for frame in range(frames):
+            batch = [{"action": "update_position", "x": 500 + frame % 100, "y": 400}]
+            if rng.random() < 0.5:
+                batch.append({"action": "ack", "seq": frame})
+            for _ in range(rng.choice((0, 0, 0, 1, 2))):  # Meteoritos destruidos
+                score += 10
+                batch.append({"action": "update_score", "score": score})
+            if rng.random() < 0.02:
+                batch.append({"action": "hit"})
+
+            start = time.perf_counter()
+            for message in batch:
+                if queued:
+                    network.send_data(message)
+                else:
+                    client.sendall(protocol.encode_message(message, network.protocol))
+                    writes += 1
+            if queued:
+                network.flush()
+            frame_times.append(time.perf_counter() - start)
+            messages += len(batch)
+
+            next_frame += 1 / 60
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+
+        if queued:
+            stats = network.send_stats()
+            writes = stats["writes"]
+            detail = (f", {stats['coalesced']} reemplazados, espera promedio "
+                      f"{stats['avg_latency'] * 1000:.1f} ms (máx. {stats['max_latency'] * 1000:.0f} ms), "
+                      f"hasta {stats['max_queue_length']} en cola, {stats['bytes']} bytes enviados")
+        else:
+            detail = ""
+        # El thread de envío termina la escritura en curso (el receptor
+        # sigue leyendo); después cortamos la conexión para el receptor
+        network.send_queue.close()
+        if queued:
+            sender.join()
+        try:
+            server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        receiver.join()
+        client.close()
+        server.close()
+        frame_times.sort()
+        print(f"{name:>26}: envío por frame {sum(frame_times) / frames * 1e6:7.1f} µs promedio, "
+              f"{frame_times[-1] * 1000:6.1f} ms máx., {frame_times[int(frames * 0.99)] * 1e6:7.0f} µs p99; "
+              f"{messages} mensajes en {writes} escrituras{detail}")
+
+
+def bench_state(args):
+    """
+    Mide lo que cuesta en cada frame leer el estado del juego y armar el
+    panel de otros jugadores mientras el thread de red publica estados:
+    copia con lock y panel en cada frame contra el snapshot inmutable y
+    el panel solo cuando cambia la versión.
+    """
+    from network import Network
+
+    network = Network()
+    players = {str(pid): {"username": f"P{pid}", "x": 100 * pid, "y": 400, "lives": 3,
+                          "score": 10 * pid, "alive": True}
+               for pid in range(1, args.players + 1)}
+    stop = threading.Event()
+
+    def publish():
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            network.apply_snapshot(seq, {"status": "running", "num_players": len(players),
+                                         "players": players, "meteors": []})
+            time.sleep(1 / args.rate)
+
+    def panel(state):
+        return tuple(f"{pdata.get('username')}: {pdata.get('score', 0)} pts ({pdata.get('lives', 0)})"
+                     for pid, pdata in state.get("players", {}).items() if pid != "1")
+
+    def copy_frame():
+        with network.lock:
+            state = dict(network.snapshot.state)
+        panel(state)
+
+    cache = [None, ()]
+
+    def snapshot_frame():
+        snapshot = network.get_snapshot()
+        if snapshot.version != cache[0]:
+            cache[0], cache[1] = snapshot.version, panel(snapshot.state)
+
+    writer = threading.Thread(target=publish, daemon=True)
+    writer.start()
+    for name, func in (("copia con lock", copy_frame), ("snapshot", snapshot_frame)):
+        rate = measure_rate(func, args.duration)
+        print(f"{name:>15}: {1e6 / rate:6.2f} µs por frame")
+    stop.set()
+    writer.join()
+    print(f"{network.snapshot.version} estados publicados")
+
+
+def bench_metrics(args):
+    """
+    Mide lo que agregan las métricas del servidor en cada mensaje: tomar
+    un lock con y sin medir la espera, registrar una duración y, en cada
+    consulta, armar el texto para Prometheus con muchos clientes.
+    """
+    from metrics import MetricsRegistry, TimedLock
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "Duraciones", ("action",))
+    lock = threading.Lock()
+    timed_lock = TimedLock(registry.histogram("bench_lock_wait_seconds", "Esperas", ("lock",)),
+                           "room")
+
+    def plain():
+        with lock:
+            pass
+
+    def timed():
+        with timed_lock:
+            pass
+
+    def observe():
+        start = time.perf_counter()
+        histogram.observe(time.perf_counter() - start, "input")
+
+    for name, func in (("threading.Lock", plain), ("TimedLock", timed),
+                       ("perf_counter + observe", observe)):
+        print(f"{name:>24}: {1e9 / measure_rate(func, args.duration):6.0f} ns")
+
+    clients = {("room-1", str(pid)): pid * 100 for pid in range(args.clients)}
+    registry.callback("bench_client_bytes_total", "Bytes por cliente", "counter",
+                      ("room", "player"), lambda: clients)
+    start = time.perf_counter()
+    text = registry.render()
+    print(f"{'render':>24}: {(time.perf_counter() - start) * 1000:6.1f} ms con "
+          f"{args.clients} clientes ({len(text) / 1024:.0f} KB)")
+
+
+BENCHMARKS = {
+    "protocol": (bench_protocol, "Protocolo binario vs JSON", []),
+    "server": (bench_server, "Motores de red del servidor (threads vs asyncio)", [
+        (("--connections",), {"default": "4,64,256,1024",
+                              "help": "Cantidades de conexiones separadas por coma"}),
+        (("--rate",), {"type": float, "default": 20,
+                       "help": "Mensajes por segundo de cada conexión"}),
+        (("--port",), {"type": int, "default": 5700, "help": "Primer puerto a usar"}),
+    ]),
+    "meteors": (bench_meteors, "Rotación de meteoritos: rotozoom vs caché", [
+        (("--counts",), {"default": "10,50,200",
+                         "help": "Cantidades de meteoritos separadas por coma"}),
+        (("--step",), {"type": float, "default": 3, "help": "Grados entre rotaciones"}),
+    ]),
+    "collisions": (bench_collisions, "Colisiones: fuerza bruta vs grilla espacial", [
+        (("--counts",), {"default": "50,200,1000",
+                         "help": "Cantidades de láseres y de meteoritos separadas por coma"}),
+        (("--cell-size",), {"type": int, "default": 128, "help": "Lado de cada celda en píxeles"}),
+    ]),
+    "entities": (bench_entities, "Meteoritos y láseres: sprites vs arreglos de NumPy", [
+        (("--counts",), {"default": "10,100,1000,10000",
+                         "help": "Cantidades de entidades separadas por coma"}),
+    ]),
+    "pools": (bench_pools, "Sprites creados por segundo con los pools", [
+        (("--seconds",), {"type": float, "default": 60, "help": "Segundos de juego simulados"}),
+        (("--rate",), {"type": float, "default": 4,
+                       "help": "Multiplicador de disparos, meteoritos y explosiones"}),
+    ]),
+    "ui": (bench_ui, "Interfaz: gradiente y paneles con y sin caché", [
+        (("--panels",), {"type": int, "default": 4, "help": "Cantidad de paneles"}),
+    ]),
+    "text": (bench_text, "Textos del HUD con y sin caché", [
+        (("--players",), {"type": int, "default": 3, "help": "Líneas del marcador"}),
+    ]),
+    "render": (bench_render, "Frame completo vs rectángulos sucios", [
+        (("--meteors",), {"type": int, "default": 10, "help": "Meteoritos en pantalla"}),
+    ]),
+    "interpolation": (bench_interpolation, "Naves remotas: última posición vs interpolación", [
+        (("--rate",), {"type": float, "default": 20, "help": "Posiciones por segundo"}),
+        (("--jitter",), {"type": float, "default": 0.03,
+                         "help": "Variación máxima de la latencia en segundos"}),
+        (("--loss",), {"type": float, "default": 0.05, "help": "Fracción de posiciones perdidas"}),
+        (("--delays",), {"default": "0.05,0.1,0.15", "help": "Retrasos a probar separados por coma"}),
+        (("--seconds",), {"type": float, "default": 30, "help": "Segundos simulados"}),
+    ]),
+    "prediction": (bench_prediction, "Predicción del jugador local a distintas latencias", [
+        (("--rtts",), {"default": "0.05,0.15,0.3", "help": "Latencias (ida y vuelta) separadas por coma"}),
+        (("--seconds",), {"type": float, "default": 60, "help": "Segundos simulados"}),
+    ]),
+    "send": (bench_send, "Envío de mensajes: sendall directo vs cola con thread", [
+        (("--seconds",), {"type": float, "default": 3, "help": "Segundos de juego simulados"}),
+        (("--bandwidth",), {"type": float, "default": 1500,
+                            "help": "Bytes por segundo que lee el receptor en la red lenta"}),
+    ]),
+    "state": (bench_state, "Estado del juego: copia con lock vs snapshot inmutable", [
+        (("--players",), {"type": int, "default": 4, "help": "Jugadores en la sala"}),
+        (("--rate",), {"type": float, "default": 30, "help": "Estados por segundo que llegan"}),
+    ]),
+    "metrics": (bench_metrics, "Costo de las métricas del servidor", [
+        (("--clients",), {"type": int, "default": 1000, "help": "Clientes en la consulta"}),
+    ]),
+    "startup": (bench_startup, "Carga de sprites: PNG sueltos vs atlas", [
+        (("--repeat",), {"type": int, "default": 20, "help": "Veces que se repite la carga"}),
+    ]),
+}
+
+
+def main():
+    """
+    Punto de entrada: parsea los argumentos y ejecuta el benchmark elegido.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks de Space Shooter")
+    parser.add_argument("--duration", type=float, default=0.5,
+                        help="Segundos de medición por caso")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    for name, (func, description, arguments) in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=description)
+        for flags, options in arguments:
+            subparser.add_argument(*flags, **options)
+        subparser.set_defaults(func=func)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Archivo con el paso de build del atlas de texturas.
+
+Empaqueta los sprites del juego (naves, láser, meteorito, estrella, vida
+y los 21 frames de la explosión) en una sola imagen, images/atlas.bmp,
+más un índice images/atlas.json con el rectángulo de cada imagen. En el
+juego, assets.py lee el atlas una sola vez y corta cada imagen como una
+subsuperficie, en lugar de abrir y decodificar decenas de PNG.
+
+El atlas se guarda en BMP sin comprimir: ocupa más en disco, pero cargarlo
+es copiar los píxeles, mientras que descomprimir un PNG de ese tamaño
+tarda más que leer los PNG sueltos.
+
+Los frames de animaciones se recortan a su parte visible (en el índice
+se guarda cuánto se recortó). Las imágenes sueltas se guardan enteras,
+porque su tamaño es el rectángulo de colisión del sprite.
+
+Uso:
+
+    python build_atlas.py
+
+Hay que volver a ejecutarlo cada vez que cambia alguna imagen; si el
+atlas quedó viejo, el juego lo ignora y carga los PNG sueltos.
+"""
+
+import argparse
+import json
+import os
+from os.path import join
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from assets import ATLAS_INDEX, ATLAS_VERSION, source_fingerprint
+
+ATLAS_IMAGE = join('images', 'atlas.bmp')
+MAX_WIDTH = 512  # Ancho máximo del atlas en píxeles
+PADDING = 1  # Píxeles vacíos entre imágenes
+
+# Imágenes sueltas (se guardan enteras) y animaciones (frames recortados)
+IMAGES = ['laser.png', 'meteor.png', 'life.png', 'star.png',
+          'player.png', 'player2.png', 'player3.png', 'player4.png']
+ANIMATIONS = {'explosion': 21}
+
+
+def load_sources():
+    """
+    Carga todas las imágenes que van al atlas.
+
+    Devuelve:
+        list: Tuplas (ruta, superficie, recortar)
+    """
+    sources = [(join('images', name), False) for name in IMAGES]
+    for directory, count in ANIMATIONS.items():
+        sources += [(join('images', directory, f'{i}.png'), True) for i in range(count)]
+    return [(path, pygame.image.load(path).convert_alpha(), trim) for path, trim in sources]
+
+
+def pack(sizes, max_width=MAX_WIDTH, padding=PADDING):
+    """
+    Ubica rectángulos en estantes (filas), de los más altos a los más bajos.
+
+    Argumentos:
+        sizes: Lista de tuplas (ancho, alto)
+        max_width: Ancho máximo del atlas
+        padding: Espacio entre rectángulos
+
+    Devuelve:
+        tuple: (lista de posiciones (x, y) en el orden de sizes, (ancho, alto) del atlas)
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for index in order:
+        w, h = sizes[index]
+        if x and x + w > max_width:
+            # No entra en el estante actual: empezamos uno nuevo abajo
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[index] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+        width = max(width, x - padding)
+    return positions, (width, y + shelf_height)
+
+
+def build(output_image=ATLAS_IMAGE, output_index=ATLAS_INDEX):
+    """
+    Genera el atlas y su índice.
+
+    Devuelve:
+        dict: Índice generado
+    """
+    sources = load_sources()
+
+    # Recortamos los frames de animaciones a su parte visible
+    pieces = []
+    for path, surf, trim in sources:
+        area = surf.get_bounding_rect() if trim else surf.get_rect()
+        if not area.width or not area.height:
+            area = pygame.Rect(0, 0, 1, 1)  # Frame vacío: guardamos un píxel
+        pieces.append((path, surf, area))
+
+    positions, size = pack([area.size for path, surf, area in pieces])
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    frames = {}
+    for (path, surf, area), (x, y) in zip(pieces, positions):
+        atlas.blit(surf, (x, y), area)
+        frames[path.replace(os.sep, '/')] = {
+            "rect": [x, y, area.width, area.height],
+            "offset": [area.x, area.y],
+            "size": list(surf.get_size()),
+            # Tamaño y CRC32 del archivo, para detectar si el atlas quedó viejo
+            "source": source_fingerprint(path),
+        }
+
+    pygame.image.save(atlas, output_image)
+    index = {"version": ATLAS_VERSION, "image": os.path.basename(output_image),
+             "size": list(size), "frames": frames}
+    with open(output_index, "w") as file:
+        json.dump(index, file)
+    return index
+
+
+def main():
+    """
+    Punto de entrada: genera el atlas e imprime un resumen.
+    """
+    parser = argparse.ArgumentParser(description="Genera el atlas de texturas del juego")
+    parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    index = build()
+
+    width, height = index["size"]
+    original = sum(w * h for w, h in (frame["size"] for frame in index["frames"].values()))
+    print(f"{ATLAS_IMAGE}: {len(index['frames'])} imágenes en {width}x{height} "
+          f"({width * height * 4 / 1024:.0f} KB sin comprimir, "
+          f"antes {original * 4 / 1024:.0f} KB en archivos sueltos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Archivo con la detección de colisiones por grilla espacial (spatial hash).
+
+En lugar de probar cada láser contra todos los meteoritos, los sprites
+se ubican en las celdas de una grilla uniforme y solo se prueban los
+que comparten celda (fase amplia). Las máscaras pixel-perfect se
+siguen usando para los candidatos (fase precisa), así el resultado es
+el mismo que con pygame.sprite.spritecollide.
+"""
+
+CELL_SIZE = 128  # Lado de cada celda en píxeles (del orden del sprite más grande)
+
+
+class SpatialHash:
+    """
+    Grilla uniforme que indexa sprites por las celdas que ocupa su rect.
+
+    Atributos:
+        cell_size: Lado de cada celda en píxeles
+        cells: Diccionario (columna, fila) -> lista de sprites
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        """
+        Inicializa una grilla vacía.
+
+        Argumentos:
+            cell_size: Lado de cada celda en píxeles
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _cell_range(self, rect):
+        """
+        Devuelve los rangos de columnas y filas que cubre un rect.
+        """
+        size = self.cell_size
+        return (range(rect.left // size, (rect.right - 1) // size + 1),
+                range(rect.top // size, (rect.bottom - 1) // size + 1))
+
+    def clear(self):
+        """
+        Vacía la grilla.
+        """
+        self.cells.clear()
+
+    def insert(self, sprite):
+        """
+        Agrega un sprite en todas las celdas que toca su rect.
+        """
+        columns, rows = self._cell_range(sprite.rect)
+        cells = self.cells
+        for column in columns:
+            for row in rows:
+                cell = cells.get((column, row))
+                if cell is None:
+                    cells[(column, row)] = [sprite]
+                else:
+                    cell.append(sprite)
+
+    def rebuild(self, sprites):
+        """
+        Reconstruye la grilla con las posiciones actuales de los sprites.
+
+        Argumentos:
+            sprites: Grupo o lista de sprites (por ejemplo, los meteoritos)
+
+        Se llama una vez por frame, después de mover los sprites.
+        """
+        self.cells.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def query(self, rect):
+        """
+        Devuelve los sprites cuyo rect se superpone con el rect dado.
+
+        Argumentos:
+            rect: pygame.Rect a consultar
+
+        Devuelve:
+            list: Sprites candidatos, sin repetir, en orden de inserción
+        """
+        columns, rows = self._cell_range(rect)
+        cells = self.cells
+        found = []
+        seen = set()
+        for column in columns:
+            for row in rows:
+                for sprite in cells.get((column, row), ()):
+                    if id(sprite) not in seen:
+                        seen.add(id(sprite))
+                        if rect.colliderect(sprite.rect):
+                            found.append(sprite)
+        return found
+
+    def pairs(self, sprites):
+        """
+        Devuelve los pares candidatos entre otros sprites y los de la grilla.
+
+        Argumentos:
+            sprites: Sprites a probar (por ejemplo, los láseres)
+
+        Devuelve:
+            list: Tuplas (sprite, sprite de la grilla) con rects superpuestos,
+                  listas para la fase precisa (máscaras)
+        """
+        return [(sprite, other) for sprite in sprites for other in self.query(sprite.rect)]
+
+    def spritecollide(self, sprite, dokill, collided=None):
+        """
+        Equivalente a pygame.sprite.spritecollide usando la grilla.
+
+        Argumentos:
+            sprite: Sprite a probar
+            dokill: Si es True, los sprites con los que choca se eliminan
+                    de sus grupos
+            collided: Función de fase precisa (por ejemplo
+                      pygame.sprite.collide_mask), o None para usar solo rects
+
+        Devuelve:
+            list: Sprites de la grilla con los que choca. Los que ya fueron
+                  eliminados en este frame se ignoran.
+        """
+        hits = []
+        for other in self.query(sprite.rect):
+            if not other.alive():
+                continue  # Ya lo destruyó otro láser en este frame
+            if collided is None or collided(sprite, other):
+                hits.append(other)
+                if dokill:
+                    other.kill()
+        return hits
@@ -0,0 +1,146 @@
+"""
+Archivo con el renderizado por rectángulos sucios (dirty rects).
+
+Redibujar toda la pantalla y enviarla completa con display.update() en
+cada frame cuesta lo mismo aunque solo se hayan movido unos pocos
+sprites. Este renderizador compara lo que se dibuja en cada frame con lo
+del frame anterior y solo repinta (fondo, HUD y sprites) las zonas que
+cambiaron, que son las únicas que se pasan a display.update(rects).
+"""
+
+import pygame
+
+# Si las zonas sucias cubren más que esta fracción de la pantalla, conviene
+# repintarla entera en una sola pasada
+FULL_REDRAW_RATIO = 0.5
+
+
+class DirtyRenderer:
+    """
+    Renderizador que solo repinta y actualiza las zonas que cambiaron.
+
+    El fondo (color y estrellas) es una superficie fija. Encima va el HUD,
+    formado por elementos que se redibujan solo cuando cambia su firma
+    (por ejemplo, el puntaje), y encima los sprites.
+
+    Atributos:
+        screen: Superficie de la pantalla
+        background: Superficie fija del fondo, del tamaño de la pantalla
+        previous_sprites: Conjunto de (id de imagen, rect) del frame anterior
+        previous_hud: Diccionario clave -> (rect, firma) del frame anterior
+        full_redraw: Si el próximo frame se repinta entero
+        dirty_area: Píxeles repintados en el último frame
+    """
+
+    def __init__(self, screen, background):
+        """
+        Crea el renderizador. El primer frame se dibuja completo.
+
+        Argumentos:
+            screen: Superficie de la pantalla
+            background: Superficie fija del fondo
+        """
+        self.screen = screen
+        self.background = background
+        self.previous_sprites = set()
+        self.previous_hud = {}
+        self.full_redraw = True
+        self.dirty_area = 0
+
+    def invalidate(self):
+        """
+        Fuerza a repintar la pantalla completa en el próximo frame (por
+        ejemplo, al volver de otra pantalla como la de game over).
+        """
+        self.full_redraw = True
+
+    def render(self, hud, sprites):
+        """
+        Dibuja un frame repintando solo lo que cambió y actualiza la pantalla.
+
+        Argumentos:
+            hud: Lista de tuplas (clave, rect, firma, función de dibujo). La
+                 función recibe la pantalla y dibuja el elemento dentro de
+                 su rect; solo se vuelve a llamar si cambia la firma o si un
+                 sprite pasa por encima.
+            sprites: Lista de tuplas (imagen, rect) en orden de dibujo
+
+        Devuelve:
+            list: Rectángulos que se actualizaron en la pantalla
+        """
+        dirty = []
+
+        # Sprites: los que aparecieron, se movieron o cambiaron de imagen
+        current_sprites = set()
+        for image, rect in sprites:
+            key = (id(image), tuple(rect))
+            current_sprites.add(key)
+            if key not in self.previous_sprites:
+                dirty.append(rect)
+        # ... y los lugares donde estaban los que ya no están igual
+        for image_id, rect in self.previous_sprites - current_sprites:
+            dirty.append(pygame.Rect(rect))
+        self.previous_sprites = current_sprites
+
+        # HUD: los elementos nuevos o con otra firma
+        current_hud = {}
+        for key, rect, signature, draw in hud:
+            current_hud[key] = (rect, signature)
+            if self.previous_hud.get(key) != (rect, signature):
+                dirty.append(rect)
+                old = self.previous_hud.get(key)
+                if old is not None and old[0] != rect:
+                    dirty.append(old[0])
+        for key in self.previous_hud.keys() - current_hud.keys():
+            dirty.append(self.previous_hud[key][0])
+        self.previous_hud = current_hud
+
+        screen_rect = self.screen.get_rect()
+        dirty = merge_rects(dirty, screen_rect)
+        dirty_pixels = sum(rect.width * rect.height for rect in dirty)
+        if self.full_redraw or dirty_pixels > FULL_REDRAW_RATIO * screen_rect.width * screen_rect.height:
+            dirty = [screen_rect]
+            self.full_redraw = False
+
+        # Repintamos cada zona sucia completa: fondo, HUD y sprites que la tocan
+        sprite_rects = [rect for image, rect in sprites]
+        hud_rects = [rect for key, rect, signature, draw in hud]
+        self.dirty_area = 0
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.blit(self.background, area, area)
+            for index in area.collidelistall(hud_rects):
+                hud[index][3](self.screen)
+            for index in area.collidelistall(sprite_rects):
+                self.screen.blit(sprites[index][0], sprite_rects[index])
+            self.dirty_area += area.width * area.height
+        self.screen.set_clip(None)
+
+        pygame.display.update(dirty)
+        return dirty
+
+
+def merge_rects(rects, bounds):
+    """
+    Une los rectángulos que se superponen y los recorta a la pantalla.
+
+    Argumentos:
+        rects: Lista de pygame.Rect
+        bounds: Rectángulo de la pantalla
+
+    Devuelve:
+        list: Rectángulos sin superposiciones entre sí (cada uno puede
+              cubrir algo más de área que los originales)
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect).clip(bounds)
+        if not rect.width or not rect.height:
+            continue
+        # Absorbemos los ya unidos que toca, hasta que no toque ninguno
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
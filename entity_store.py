@@ -0,0 +1,382 @@
+"""
+Archivo con el almacenamiento por arreglos de meteoritos y láseres.
+
+Cada Meteor y cada Laser es un Sprite con su propio Vector2, Rect y
+update() en Python. Con miles de entidades ese costo por objeto domina
+el frame. Acá las entidades viven en arreglos de NumPy (una columna por
+atributo) y el movimiento, la rotación y el tiempo de vida se calculan
+para todas juntas en unas pocas operaciones por frame.
+
+NumPy es opcional: si no está instalado NUMPY_AVAILABLE es False y el
+juego sigue usando las clases Meteor y Laser.
+"""
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+INITIAL_CAPACITY = 64  # Lugar inicial de cada arreglo (se duplica al llenarse)
+METEOR_LIFETIME = 3.0  # Segundos de vida de cada meteorito
+LASER_SPEED = 400  # Píxeles por segundo hacia arriba
+
+
+class EntityStore:
+    """
+    Base de los almacenamientos: columnas de NumPy con las entidades vivas
+    al principio de cada arreglo.
+
+    Atributos:
+        columns: Nombres de los arreglos de la entidad
+        count: Cantidad de entidades vivas
+    """
+
+    columns = ()
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        """
+        Crea los arreglos vacíos.
+
+        Argumentos:
+            capacity: Cantidad de entidades que entran sin agrandar los arreglos
+        """
+        self.count = 0
+        for name in self.columns:
+            setattr(self, name, np.zeros(capacity))
+
+    def __len__(self):
+        """
+        Devuelve la cantidad de entidades vivas.
+        """
+        return self.count
+
+    def _append(self, **values):
+        """
+        Agrega una entidad, agrandando los arreglos si hace falta.
+        """
+        capacity = len(getattr(self, self.columns[0]))
+        if self.count == capacity:
+            for name in self.columns:
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate((column, np.zeros(capacity))))
+        for name, value in values.items():
+            getattr(self, name)[self.count] = value
+        self.count += 1
+
+    def keep(self, alive):
+        """
+        Compacta los arreglos dejando solo las entidades indicadas.
+
+        Argumentos:
+            alive: Arreglo booleano de largo count (True = se conserva)
+        """
+        kept = int(np.count_nonzero(alive))
+        if kept == self.count:
+            return
+        for name in self.columns:
+            column = getattr(self, name)
+            column[:kept] = column[:self.count][alive]
+        self.count = kept
+
+    def clear(self):
+        """
+        Elimina todas las entidades.
+        """
+        self.count = 0
+
+
+class MeteorStore(EntityStore):
+    """
+    Meteoritos guardados como arreglos.
+
+    La posición se calcula a partir del origen y la edad, igual que en
+    Meteor, así el campo de meteoritos de la partida se ve igual en todos
+    los clientes. La imagen y la máscara salen de una RotationCache.
+
+    Atributos:
+        rotations: RotationCache con las rotaciones de la imagen
+        time: Reloj del almacenamiento en segundos
+        lifetime: Segundos de vida de cada meteorito
+        origin_x, origin_y: Posición inicial de cada meteorito
+        velocity_x, velocity_y: Velocidad en píxeles por segundo
+        rotation_speed: Velocidad de rotación en grados por segundo
+        spawn_time: Valor de time en el que apareció cada meteorito
+        left, top: Esquina del rectángulo de cada meteorito en este frame
+        frame: Índice de la rotación de cada meteorito en este frame
+    """
+
+    columns = ("origin_x", "origin_y", "velocity_x", "velocity_y",
+               "rotation_speed", "spawn_time")
+
+    def __init__(self, rotations, lifetime=METEOR_LIFETIME, capacity=INITIAL_CAPACITY):
+        """
+        Crea un almacenamiento vacío.
+
+        Argumentos:
+            rotations: RotationCache con las rotaciones de la imagen
+            lifetime: Segundos de vida de cada meteorito
+            capacity: Cantidad de meteoritos que entran sin agrandar los arreglos
+        """
+        super().__init__(capacity)
+        self.rotations = rotations
+        self.lifetime = lifetime
+        self.time = 0.0
+
+        # Tamaño de cada rotación, para ubicar los rectángulos sin objetos Rect
+        sizes = np.array([image.get_size() for image, mask in rotations.frames])
+        self.frame_width = sizes[:, 0]
+        self.frame_height = sizes[:, 1]
+
+        self.left = np.zeros(0, dtype=int)
+        self.top = np.zeros(0, dtype=int)
+        self.frame = np.zeros(0, dtype=int)
+
+    def spawn(self, pos, direction_x, speed, rotation_speed, age=0):
+        """
+        Agrega un meteorito.
+
+        Argumentos:
+            pos: Tupla (x, y) con la posición inicial
+            direction_x: Componente horizontal de la dirección
+            speed: Velocidad de caída en píxeles por segundo
+            rotation_speed: Velocidad de rotación en grados por segundo
+            age: Segundos que ya pasaron desde su aparición
+        """
+        self._append(origin_x=pos[0], origin_y=pos[1],
+                     velocity_x=direction_x * speed, velocity_y=speed,
+                     rotation_speed=rotation_speed, spawn_time=self.time - age)
+
+    def update(self, dt):
+        """
+        Avanza todos los meteoritos un frame.
+
+        Argumentos:
+            dt: Delta time en segundos
+
+        Elimina los que cumplieron su tiempo de vida y calcula la rotación
+        y el rectángulo de los demás.
+        """
+        self.time += dt
+        n = self.count
+        age = self.time - self.spawn_time[:n]
+        self.keep(age < self.lifetime)
+
+        n = self.count
+        age = self.time - self.spawn_time[:n]
+        centers_x = np.rint(self.origin_x[:n] + self.velocity_x[:n] * age).astype(int)
+        centers_y = np.rint(self.origin_y[:n] + self.velocity_y[:n] * age).astype(int)
+
+        rotation = self.rotation_speed[:n] * age
+        self.frame = np.rint(rotation / self.rotations.step).astype(int) % len(self.rotations.frames)
+
+        # Mismo redondeo que get_rect(center=...): el centro menos la mitad entera
+        self.left = centers_x - self.frame_width[self.frame] // 2
+        self.top = centers_y - self.frame_height[self.frame] // 2
+
+    def clear(self):
+        """
+        Elimina todos los meteoritos.
+        """
+        super().clear()
+        self.left = self.left[:0]
+        self.top = self.top[:0]
+        self.frame = self.frame[:0]
+
+    def remove(self, indices):
+        """
+        Elimina los meteoritos con los índices dados (los de collide_rect o
+        collide_lasers, calculados después del último update).
+        """
+        alive = np.ones(self.count, dtype=bool)
+        alive[indices] = False
+        self.keep(alive)
+        self.left = self.left[alive]
+        self.top = self.top[alive]
+        self.frame = self.frame[alive]
+
+    def collide_rect(self, rect):
+        """
+        Devuelve los índices de los meteoritos cuyo rectángulo toca uno dado.
+
+        Argumentos:
+            rect: pygame.Rect a probar (por ejemplo, el del jugador)
+        """
+        right = self.left + self.frame_width[self.frame]
+        bottom = self.top + self.frame_height[self.frame]
+        return np.flatnonzero((self.left < rect.right) & (right > rect.left)
+                              & (self.top < rect.bottom) & (bottom > rect.top))
+
+    def collide_lasers(self, lasers, laser_mask):
+        """
+        Detecta los choques entre láseres y meteoritos.
+
+        Argumentos:
+            lasers: LaserStore con los láseres
+            laser_mask: Máscara de la imagen del láser
+
+        Devuelve:
+            dict: Índice de láser -> lista de índices de los meteoritos con
+                  los que choca pixel a pixel. Igual que con spritecollide
+                  láser por láser, cada meteorito cuenta solo para el primer
+                  láser que lo toca.
+
+        La fase amplia es un barrido sobre el eje x: con los meteoritos
+        ordenados por su borde izquierdo, cada láser solo se compara con
+        los que empiezan antes de su borde derecho y a menos de un ancho
+        de meteorito de su borde izquierdo. Las máscaras se prueban solo
+        para los pares cuyos rectángulos se superponen.
+        """
+        if not self.count or not lasers.count:
+            return {}
+
+        width = self.frame_width[self.frame]
+        height = self.frame_height[self.frame]
+        order = np.argsort(self.left, kind="stable")
+        sorted_left = self.left[order]
+
+        laser_left, laser_top = lasers.rects()
+        laser_right = laser_left + lasers.width
+        laser_bottom = laser_top + lasers.height
+
+        # Rango de meteoritos (ordenados) que pueden tocar cada láser en x
+        first = np.searchsorted(sorted_left, laser_left - int(width.max()), side="right")
+        last = np.searchsorted(sorted_left, laser_right, side="left")
+        counts = np.maximum(last - first, 0)
+        if not counts.any():
+            return {}
+
+        # Expandimos los rangos en pares (láser, meteorito) candidatos
+        laser_index = np.repeat(np.arange(lasers.count), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        meteor_index = order[np.repeat(first, counts) + offsets]
+
+        overlap = ((self.left[meteor_index] + width[meteor_index] > laser_left[laser_index])
+                   & (self.left[meteor_index] < laser_right[laser_index])
+                   & (self.top[meteor_index] < laser_bottom[laser_index])
+                   & (self.top[meteor_index] + height[meteor_index] > laser_top[laser_index]))
+        laser_index = laser_index[overlap]
+        meteor_index = meteor_index[overlap]
+
+        # Fase precisa: la máscara de la rotación actual de cada meteorito
+        hits = {}
+        destroyed = set()
+        frames = self.rotations.frames
+        for laser, meteor in zip(laser_index.tolist(), meteor_index.tolist()):
+            if meteor in destroyed:
+                continue
+            mask = frames[self.frame[meteor]][1]
+            offset = (int(laser_left[laser] - self.left[meteor]),
+                      int(laser_top[laser] - self.top[meteor]))
+            if mask.overlap(laser_mask, offset):
+                destroyed.add(meteor)
+                hits.setdefault(laser, []).append(meteor)
+        return hits
+
+    def items(self):
+        """
+        Devuelve una lista de tuplas (imagen, rect) con cada meteorito.
+        """
+        frames = self.rotations.frames
+        widths = self.frame_width[self.frame].tolist()
+        heights = self.frame_height[self.frame].tolist()
+        return [(frames[frame][0], pygame.Rect(left, top, width, height))
+                for frame, left, top, width, height
+                in zip(self.frame.tolist(), self.left.tolist(), self.top.tolist(), widths, heights)]
+
+    def draw(self, surface):
+        """
+        Dibuja todos los meteoritos con un solo llamado a blits.
+        """
+        frames = self.rotations.frames
+        surface.blits([(frames[frame][0], (left, top)) for frame, left, top
+                       in zip(self.frame.tolist(), self.left.tolist(), self.top.tolist())],
+                      doreturn=False)
+
+
+class LaserStore(EntityStore):
+    """
+    Láseres guardados como arreglos.
+
+    Atributos:
+        image: Superficie con la imagen del láser
+        width, height: Tamaño de la imagen
+        speed: Velocidad hacia arriba en píxeles por segundo
+        x: Centro horizontal de cada láser
+        bottom: Borde inferior de cada láser
+    """
+
+    columns = ("x", "bottom")
+
+    def __init__(self, image, speed=LASER_SPEED, capacity=INITIAL_CAPACITY):
+        """
+        Crea un almacenamiento vacío.
+
+        Argumentos:
+            image: Superficie con la imagen del láser
+            speed: Velocidad hacia arriba en píxeles por segundo
+            capacity: Cantidad de láseres que entran sin agrandar los arreglos
+        """
+        super().__init__(capacity)
+        self.image = image
+        self.width, self.height = image.get_size()
+        self.speed = speed
+
+    def spawn(self, pos):
+        """
+        Agrega un láser con su parte inferior en la posición dada.
+
+        Argumentos:
+            pos: Tupla (x, y), normalmente la parte superior de la nave
+        """
+        self._append(x=pos[0], bottom=pos[1])
+
+    def update(self, dt):
+        """
+        Mueve todos los láseres hacia arriba y elimina los que salieron de la pantalla.
+        """
+        self.bottom[:self.count] -= self.speed * dt
+        self.keep(self.bottom[:self.count] >= 0)
+
+    def rects(self):
+        """
+        Devuelve dos arreglos con la esquina superior izquierda de cada láser.
+        """
+        left = self.x[:self.count].astype(int) - self.width // 2
+        top = self.bottom[:self.count].astype(int) - self.height
+        return left, top
+
+    def midtop(self, index):
+        """
+        Devuelve la posición de la punta de un láser (para la explosión).
+        """
+        return int(self.x[index]), int(self.bottom[index]) - self.height
+
+    def remove(self, indices):
+        """
+        Elimina los láseres con los índices dados.
+        """
+        alive = np.ones(self.count, dtype=bool)
+        alive[indices] = False
+        self.keep(alive)
+
+    def items(self):
+        """
+        Devuelve una lista de tuplas (imagen, rect) con cada láser.
+        """
+        left, top = self.rects()
+        image = self.image
+        return [(image, pygame.Rect(x, y, self.width, self.height))
+                for x, y in zip(left.tolist(), top.tolist())]
+
+    def draw(self, surface):
+        """
+        Dibuja todos los láseres con un solo llamado a blits.
+        """
+        left, top = self.rects()
+        image = self.image
+        surface.blits([(image, position) for position in zip(left.tolist(), top.tolist())],
+                      doreturn=False)
@@ -0,0 +1,129 @@
+"""
+Archivo con el buffer de interpolación de las naves de los demás jugadores.
+
+Las posiciones de los demás jugadores llegan del servidor unas 20 o 30
+veces por segundo, y no a intervalos exactos. Si cada frame se dibujara
+la última posición recibida, las naves avanzarían a saltos. En cambio,
+cada posición se guarda con la hora en que llegó y las naves se dibujan
+un poco en el pasado (INTERPOLATION_DELAY), interpolando entre las dos
+posiciones recibidas que rodean ese instante.
+
+Si las posiciones se atrasan más que ese margen, la nave sigue un rato
+con su última velocidad (hasta MAX_EXTRAPOLATION segundos) y después
+vuelve a la última posición conocida, en lugar de seguir de largo.
+"""
+
+import time
+from collections import deque
+
+INTERPOLATION_DELAY = 0.1  # Segundos en el pasado en que se dibujan las naves
+MAX_EXTRAPOLATION = 0.05  # Segundos máximos que se extrapola sin posiciones nuevas
+BUFFER_SIZE = 64  # Posiciones guardadas como máximo
+
+
+class InterpolationBuffer:
+    """
+    Posiciones recibidas con su hora, para calcular la posición de cada
+    jugador en cualquier instante.
+
+    Atributos:
+        delay: Segundos en el pasado en que se calculan las posiciones
+        max_extrapolation: Segundos máximos de extrapolación
+        samples: deque de tuplas (hora, diccionario id -> (x, y)), de la más
+                 vieja a la más nueva
+    """
+
+    def __init__(self, delay=INTERPOLATION_DELAY, max_extrapolation=MAX_EXTRAPOLATION,
+                 size=BUFFER_SIZE):
+        """
+        Crea un buffer vacío.
+
+        Argumentos:
+            delay: Segundos en el pasado en que se calculan las posiciones
+            max_extrapolation: Segundos máximos de extrapolación
+            size: Cantidad máxima de posiciones guardadas
+        """
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        self.samples = deque(maxlen=size)
+
+    def add(self, positions, timestamp=None):
+        """
+        Guarda las posiciones de los jugadores recibidas en un instante.
+
+        Argumentos:
+            positions: Diccionario id -> (x, y)
+            timestamp: Hora de llegada (time.monotonic()); por defecto, ahora
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self.samples and timestamp <= self.samples[-1][0]:
+            # Dos posiciones en el mismo instante: vale la última
+            self.samples[-1] = (self.samples[-1][0], positions)
+            return
+        self.samples.append((timestamp, positions))
+
+    def clear(self):
+        """
+        Descarta todas las posiciones guardadas.
+        """
+        self.samples.clear()
+
+    def sample(self, now=None):
+        """
+        Calcula la posición de cada jugador delay segundos antes de now.
+
+        Argumentos:
+            now: Hora actual (time.monotonic()); por defecto, ahora
+
+        Devuelve:
+            dict: id -> (x, y). Un jugador que todavía no estaba en la
+                  posición anterior se ubica directamente en la nueva.
+        """
+        if not self.samples:
+            return {}
+        if now is None:
+            now = time.monotonic()
+        render_time = now - self.delay
+        samples = self.samples
+
+        # Las posiciones anteriores a la penúltima que sirve ya no se usan
+        while len(samples) > 2 and samples[1][0] <= render_time:
+            samples.popleft()
+
+        if render_time <= samples[0][0] or len(samples) == 1:
+            return dict(samples[0][1])
+
+        for (t0, old), (t1, new) in zip(samples, list(samples)[1:]):
+            if render_time < t1:
+                return _lerp(old, new, (render_time - t0) / (t1 - t0))
+
+        # No llegaron posiciones nuevas: seguimos con la última velocidad un
+        # rato y después volvemos a la última posición conocida
+        (t0, old), (t1, new) = samples[-2], samples[-1]
+        late = render_time - t1
+        extrapolation = max(0.0, min(late, 2 * self.max_extrapolation - late))
+        return _lerp(old, new, 1 + extrapolation / (t1 - t0))
+
+
+def _lerp(old, new, ratio):
+    """
+    Interpola (o extrapola, si ratio > 1) las posiciones de cada jugador.
+
+    Argumentos:
+        old: Diccionario id -> (x, y) anterior
+        new: Diccionario id -> (x, y) siguiente
+        ratio: 0 para old, 1 para new
+
+    Devuelve:
+        dict: id -> (x, y) de los jugadores que están en new
+    """
+    positions = {}
+    for pid, (x1, y1) in new.items():
+        start = old.get(pid)
+        if start is None:
+            positions[pid] = (x1, y1)
+        else:
+            x0, y0 = start
+            positions[pid] = (x0 + (x1 - x0) * ratio, y0 + (y1 - y0) * ratio)
+    return positions
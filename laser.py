@@ -4,10 +4,10 @@ Archivo con la clase Laser.
 Los láseres son proyectiles que dispara el jugador para destruir meteoritos.
 """
 
-import pygame
+from sprite_pool import PooledSprite, get_mask
 
 
-class Laser(pygame.sprite.Sprite):
+class Laser(PooledSprite):
     """
     Clase que representa un láser disparado por el jugador.
 
@@ -21,17 +21,14 @@ class Laser(pygame.sprite.Sprite):
         mask: Máscara de colisión pixel-perfect
     """
 
-    def __init__(self, groups, surf, pos):
+    def reset(self, surf, pos):
         """
-        Inicializa un láser en la posición especificada.
+        Inicializa (o reutiliza) un láser en la posición especificada.
 
         Argumentos:
-            groups: Grupos de sprites a los que pertenece
             surf: Superficie con la imagen del láser
             pos: Tupla (x, y) con la posición inicial (con la nave)
         """
-        super().__init__(groups)
-
         self.image = surf
 
         # Posicionamos el láser con su parte inferior en la posición dada
@@ -40,9 +37,9 @@ class Laser(pygame.sprite.Sprite):
 
         self.speed = 400  # Velocidad en píxeles por segundo
 
-        # Creamos una máscara para colisiones pixel-perfect
+        # Máscara para colisiones pixel-perfect, compartida por todos los láseres
         # Esto permite detectar colisiones más precisas que solo con rectángulos
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = get_mask(self.image)
 
     def update(self, dt, events):
         """
@@ -9,16 +9,47 @@ Este es el punto de entrada del juego. Maneja:
 - Interfaz de usuario (HUD)
 """
 
+import os
 import pygame
 from os.path import join
-from random import randint
-from player import Player
+from random import randint, uniform
+from player import Player, RemotePlayer
 from star import Star
 from meteor import Meteor
+from meteor_field import MeteorField
+from rotation_cache import RotationCache
+from collision import SpatialHash
+from entity_store import NUMPY_AVAILABLE, MeteorStore, LaserStore
+from sprite_pool import PooledSprite, SpritePool
+from render_cache import draw_gradient_background, draw_panel, draw_translucent_rect
+from text_cache import render_text, cache as text_cache
+from dirty_renderer import DirtyRenderer
 from network import Network
+from interpolation import INTERPOLATION_DELAY as DEFAULT_INTERPOLATION_DELAY
+from assets import assets
 
+# Si es True solo se repintan y envían a la pantalla las zonas que cambiaron
+# (SPACE_SHOOTER_DIRTY_RECTS=0 vuelve a dibujar la pantalla completa)
+DIRTY_RECTS = os.environ.get("SPACE_SHOOTER_DIRTY_RECTS", "1") != "0"
 
-class Explosion(pygame.sprite.Sprite):
+READY_TIMEOUT = 5  # Segundos máximos de espera del welcome del servidor
+
+# Segundos en el pasado en que se dibujan los demás jugadores: más retraso
+# tolera más variación en la llegada de las posiciones
+INTERPOLATION_DELAY = float(os.environ.get("SPACE_SHOOTER_INTERPOLATION_DELAY",
+                                           DEFAULT_INTERPOLATION_DELAY))
+
+# Recursos del juego que se precargan mientras se muestra el login
+GAME_IMAGES = [('images', name) for name in ('laser.png', 'meteor.png', 'life.png', 'star.png',
+                                             'player.png', 'player2.png', 'player3.png',
+                                             'player4.png')]
+GAME_IMAGES += [('images', 'explosion', f'{i}.png') for i in range(21)]
+GAME_SOUNDS = [('audio', name) for name in ('laser.wav', 'explosion.wav', 'demage.wav',
+                                             'game_music.wav')]
+GAME_FONTS = [28, 32, 40, 45, 50, 70, 80]
+
+
+class Explosion(PooledSprite):
     """
     Clase que representa una animación de explosión.
 
@@ -30,22 +61,33 @@ class Explosion(pygame.sprite.Sprite):
         index: Índice del frame actual
         image: Imagen actual que se está mostrando
         rect: Rectángulo para posicionar la explosión
+        center: Centro de la explosión (los frames del atlas vienen
+                recortados y cada uno se ubica respecto de este punto)
     """
 
-    def __init__(self, frames, groups, pos):
+    def reset(self, frames, pos):
         """
-        Inicializa una explosión en la posición dada.
+        Inicializa (o reutiliza) una explosión en la posición dada.
 
         Argumentos:
             frames: Lista de superficies con los frames de la animación
-            groups: Grupos de sprites a los que pertenece
             pos: Tupla (x, y) con la posición de la explosión
         """
-        super().__init__(groups)
         self.frames = frames
         self.index = 0  # Empezamos en el primer frame
-        self.image = self.frames[self.index]
-        self.rect = self.image.get_rect(center=pos)
+        self.center = pos
+        self.set_frame(self.frames[self.index])
+
+    def set_frame(self, image):
+        """
+        Muestra un frame, ubicado donde estaría el frame original sin recortar.
+
+        Argumentos:
+            image: Superficie del frame
+        """
+        self.image = image
+        dx, dy = assets.center_offset(image)
+        self.rect = image.get_rect(topleft=(self.center[0] + dx, self.center[1] + dy))
 
     def update(self, dt, events=None):
         """
@@ -62,7 +104,7 @@ class Explosion(pygame.sprite.Sprite):
 
         # Si aún hay frames por mostrar
         if self.index < len(self.frames):
-            self.image = self.frames[int(self.index)]
+            self.set_frame(self.frames[int(self.index)])
         else:
             # La animación terminó, eliminamos el sprite
             self.kill()
@@ -131,7 +173,7 @@ class Button:
         pygame.draw.rect(screen, border_color, self.rect, 3, border_radius=15)
 
         # Renderizamos y centramos el texto
-        text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.font, self.text, True, self.text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
 
@@ -238,7 +280,7 @@ class InputBox:
         Dibuja la etiqueta, el fondo, el borde, el texto y el cursor.
         """
         # Dibujamos la etiqueta arriba del campo
-        label_surf = self.font.render(self.label, True, (200, 220, 255))
+        label_surf = render_text(self.font, self.label, True, (200, 220, 255))
         screen.blit(label_surf, (self.rect.x, self.rect.y - 35))
 
         # Dibujamos el fondo del input con efecto de profundidad
@@ -250,7 +292,7 @@ class InputBox:
         pygame.draw.rect(screen, border_color, self.rect, 3, border_radius=8)
 
         # Renderizamos el texto ingresado
-        text_surf = self.font.render(self.text, True, (255, 255, 255))
+        text_surf = render_text(self.font, self.text, True, (255, 255, 255))
         screen.blit(text_surf, (self.rect.x + 15, self.rect.y + 12))
 
         # Dibujamos cursor parpadeante si está activo
@@ -261,57 +303,6 @@ class InputBox:
                              (cursor_x, self.rect.y + self.rect.height - 10), 2)
 
 
-def draw_gradient_background(screen, color1, color2):
-    """
-    Dibuja un fondo con gradiente vertical.
-
-    Argumentos:
-        screen: Superficie de pygame donde dibujar
-        color1: Color RGB superior del gradiente
-        color2: Color RGB inferior del gradiente
-
-    Crea un efecto de gradiente suave interpolando entre dos colores.
-    """
-    height = screen.get_height()
-    for y in range(height):
-       #Calculamos cuánto se mezcla el color inicial con el final (de 0 a 1)
-        ratio = y / height
-        # Combinación de cada componente RGB
-        r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-        g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-        b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-        # Dibujamos una línea horizontal con el color combinado
-        pygame.draw.line(screen, (r, g, b), (0, y), (screen.get_width(), y))
-
-
-def draw_panel(screen, rect, color=(30, 35, 55), alpha=220):
-    """
-    Dibuja un panel decorativo con sombra y transparencia.
-
-    Argumentos:
-        screen: Superficie donde dibujar
-        rect: Rectángulo que define posición y tamaño
-        color: Color RGB del panel
-        alpha: Nivel de transparencia (0-255)
-
-    Crea paneles con efecto moderno para la interfaz.
-    """
-    # Dibujamos la sombra
-    shadow_rect = rect.copy()
-    shadow_rect.inflate_ip(8, 8)
-    shadow_surf = pygame.Surface(shadow_rect.size, pygame.SRCALPHA)
-    pygame.draw.rect(shadow_surf, (0, 0, 0, 60), shadow_surf.get_rect(), border_radius=20)
-    screen.blit(shadow_surf, shadow_rect)
-
-    # Dibujamos el panel principal con transparencia
-    panel_surf = pygame.Surface(rect.size, pygame.SRCALPHA)
-    pygame.draw.rect(panel_surf, (*color, alpha), panel_surf.get_rect(), border_radius=20)
-    screen.blit(panel_surf, rect)
-
-    # Dibujamos un borde brillante
-    pygame.draw.rect(screen, (100, 120, 180, 150), rect, 2, border_radius=20)
-
-
 def show_login_screen(screen, font):
     """
     Muestra la pantalla de login.
@@ -343,8 +334,11 @@ def show_login_screen(screen, font):
     show_instructions = False  # Bandera para mostrar/ocultar instrucciones
 
     # Cargamos fuentes personalizadas
-    title_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 70)
-    subtitle_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 28)
+    title_font = assets.font(70)
+    subtitle_font = assets.font(28)
+    # Fuentes de las instrucciones (se cargan una vez, no en cada frame)
+    icon_font = assets.font(32)
+    text_font = assets.font(26)
 
     # Loop principal de la pantalla de login
     while True:
@@ -392,7 +386,7 @@ def show_login_screen(screen, font):
             draw_panel(screen, panel_rect, (25, 30, 50), 240)
 
             # Título
-            title = title_font.render("¿Como jugar?", True, (255, 200, 100))
+            title = render_text(title_font, "¿Como jugar?", True, (255, 200, 100))
             title_rect = title.get_rect(center=(screen.get_width() // 2, 140))
             screen.blit(title, title_rect)
 
@@ -405,14 +399,12 @@ def show_login_screen(screen, font):
                 ("", "Destruye meteoritos")
             ]
 
-            icon_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 32)
-            text_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 26)
             y_offset = 230
 
             # Dibujamos cada instrucción
             for icon, text in instructions:
-                icon_surf = icon_font.render(icon, True, (100, 200, 255))
-                text_surf = text_font.render(text, True, (220, 220, 220))
+                icon_surf = render_text(icon_font, icon, True, (100, 200, 255))
+                text_surf = render_text(text_font, text, True, (220, 220, 220))
                 screen.blit(icon_surf, (230, y_offset))
                 screen.blit(text_surf, (310, y_offset + 3))
                 y_offset += 55
@@ -422,14 +414,14 @@ def show_login_screen(screen, font):
             draw_panel(screen, panel_rect, (25, 30, 50), 240)
 
             # Título con efecto de sombra
-            title = title_font.render("SPACE SHOOTER", True, (100, 200, 255))
-            title_shadow = title_font.render("SPACE SHOOTER", True, (50, 100, 150))
+            title = render_text(title_font, "SPACE SHOOTER", True, (100, 200, 255))
+            title_shadow = render_text(title_font, "SPACE SHOOTER", True, (50, 100, 150))
             title_rect = title.get_rect(center=(screen.get_width() // 2, 140))
             screen.blit(title_shadow, title_rect.move(3, 3))
             screen.blit(title, title_rect)
 
             # Subtítulo
-            subtitle = subtitle_font.render("Multiplayer Edition", True, (180, 180, 200))
+            subtitle = render_text(subtitle_font, "Multiplayer Edition", True, (180, 180, 200))
             subtitle_rect = subtitle.get_rect(center=(screen.get_width() // 2, 195))
             screen.blit(subtitle, subtitle_rect)
 
@@ -473,9 +465,9 @@ def show_game_over_screen(screen, font, game_state, network):
                             color=(80, 150, 255), hover_color=(120, 200, 255))
 
     # Cargamos imágenes
-    title_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 80)
-    header_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 40)
-    score_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 32)
+    title_font = assets.font(80)
+    header_font = assets.font(40)
+    score_font = assets.font(32)
 
     waiting = True
     animation_time = 0  # Para animaciones
@@ -495,6 +487,7 @@ def show_game_over_screen(screen, font, game_state, network):
                 if restart_button.is_clicked(mouse_pos):
                     # Enviamos señal de reinicio al servidor
                     network.send_restart()
+                    network.flush()
                     return True  # Queremos jugar de nuevo
 
         # Dibujamos el fondo
@@ -507,14 +500,14 @@ def show_game_over_screen(screen, font, game_state, network):
         # Título animado con efecto
         pulse = 1 + 0.1 * abs((animation_time * 2) % 2 - 1)
         title_color = (255, int(80 + 50 * pulse), int(80 + 50 * pulse))
-        title = title_font.render("GAME OVER", True, title_color)
-        title_shadow = title_font.render("GAME OVER", True, (100, 30, 30))
+        title = render_text(title_font, "GAME OVER", True, title_color)
+        title_shadow = render_text(title_font, "GAME OVER", True, (100, 30, 30))
         title_rect = title.get_rect(center=(screen.get_width() // 2, 120))
         screen.blit(title_shadow, title_rect.move(4, 4))
         screen.blit(title, title_rect)
 
         # Header de la tabla
-        header = header_font.render("FINAL SCORES", True, (255, 220, 100))
+        header = render_text(header_font, "FINAL SCORES", True, (255, 220, 100))
         header_rect = header.get_rect(center=(screen.get_width() // 2, 200))
         screen.blit(header, header_rect)
 
@@ -549,14 +542,12 @@ def show_game_over_screen(screen, font, game_state, network):
 
             # Dibujamos el fondo de la fila
             row_rect = pygame.Rect(200, y_offset - 5, 600, 50)
-            row_surf = pygame.Surface(row_rect.size, pygame.SRCALPHA)
-            pygame.draw.rect(row_surf, bg_color, row_surf.get_rect(), border_radius=8)
-            screen.blit(row_surf, row_rect)
+            draw_translucent_rect(screen, row_rect, bg_color, 8)
 
             # Dibujamos el contenido de la fila
-            pos_text = score_font.render(f" {position}", True, text_color)
-            name_text = score_font.render(username, True, text_color)
-            score_text = score_font.render(f"{score} pts", True, text_color)
+            pos_text = render_text(score_font, f" {position}", True, text_color)
+            name_text = render_text(score_font, username, True, text_color)
+            score_text = render_text(score_font, f"{score} pts", True, text_color)
 
             screen.blit(pos_text, (220, y_offset))
             screen.blit(name_text, (360, y_offset))
@@ -589,7 +580,10 @@ def main():
     clock = pygame.time.Clock()
 
     # Cargamos la fuente
-    font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 40)
+    font = assets.font(40)
+
+    # Mientras el usuario completa el login cargamos el resto de los recursos
+    preload = assets.preload(GAME_IMAGES, GAME_SOUNDS, GAME_FONTS)
 
     # Mostramos la pantalla de login
     login_data = show_login_screen(screen, font)
@@ -598,36 +592,41 @@ def main():
         pygame.quit()
         return
 
-    # Intentamos conectar al servidor
-    network = Network()
+    # Intentamos conectar al servidor. El thread de red avisa con state_event
+    # cada vez que publica un estado nuevo del juego
+    state_event = pygame.event.custom_type()
+    network = Network(INTERPOLATION_DELAY, state_event)
     if not network.connect(login_data["ip"], login_data["port"], login_data["username"]):
         print("No se pudo conectar al servidor")
         pygame.quit()
         return
 
-    # Esperamos un poco para que se establezca la conexión
-    import time
-    time.sleep(0.5)
+    # Esperamos a que el servidor nos asigne un ID (un ida y vuelta por la red)
+    if not network.wait_ready(READY_TIMEOUT):
+        print("El servidor no respondió")
+        network.disconnect()
+        pygame.quit()
+        return
 
-    # Cargamos todos los recursos del juego
-    laser_surf = pygame.image.load(join('images', 'laser.png')).convert_alpha()
-    meteor_surf = pygame.image.load(join('images', 'meteor.png')).convert_alpha()
-    life_surf = pygame.image.load(join('images', 'life.png')).convert_alpha()
+    # Los recursos ya deberían estar precargados; si no, esperamos a que terminen
+    preload.join()
+    laser_surf = assets.image('images', 'laser.png')
+    meteor_surf = assets.image('images', 'meteor.png')
+    # Rotaciones del meteorito (con sus máscaras) compartidas por todos los meteoritos
+    meteor_rotations = RotationCache(meteor_surf)
+    life_surf = assets.image('images', 'life.png')
 
     # Cargamos los frames de la explosión
-    explosion_frames = [
-        pygame.image.load(join('images', 'explosion', f'{i}.png')).convert_alpha()
-        for i in range(21)
-    ]
+    explosion_frames = assets.frames(join('images', 'explosion'), 21)
 
     # Cargamos y configuramos los sonidos
-    laser_sound = pygame.mixer.Sound(join('audio', 'laser.wav'))
+    laser_sound = assets.sound('audio', 'laser.wav')
     laser_sound.set_volume(0.5)
-    explosion_sound = pygame.mixer.Sound(join('audio', 'explosion.wav'))
+    explosion_sound = assets.sound('audio', 'explosion.wav')
     explosion_sound.set_volume(0.4)
-    damage_sound = pygame.mixer.Sound(join('audio', 'demage.wav'))
+    damage_sound = assets.sound('audio', 'demage.wav')
     damage_sound.set_volume(0.6)
-    game_sound = pygame.mixer.Sound(join('audio', 'game_music.wav'))
+    game_sound = assets.sound('audio', 'game_music.wav')
     game_sound.set_volume(0.4)
     game_sound.play(loops=-1)  # Música en loop infinito
 
@@ -636,40 +635,70 @@ def main():
     meteor_sprites = pygame.sprite.Group()
     laser_sprites = pygame.sprite.Group()
     all_sprites = pygame.sprite.Group()
+    remote_sprites = pygame.sprite.Group()  # Naves de los demás jugadores
+    remote_players = {}  # ID del jugador -> RemotePlayer
+
+    # Pools de sprites: los meteoritos y explosiones eliminados se reutilizan
+    meteor_pool = SpritePool(Meteor)
+    explosion_pool = SpritePool(Explosion)
+
+    # Con NumPy los meteoritos y láseres viven en arreglos y se actualizan
+    # todos juntos; sin NumPy se usan los sprites Meteor y Laser
+    if NUMPY_AVAILABLE:
+        meteor_store = MeteorStore(meteor_rotations)
+        laser_store = LaserStore(laser_surf)
+        laser_mask = pygame.mask.from_surface(laser_surf)
+    else:
+        meteor_store = laser_store = None
+        # Grilla espacial de meteoritos para las colisiones (se rearma cada frame)
+        meteor_grid = SpatialHash()
 
     # Creamos las estrellas de fondo
-    star_surf = pygame.image.load(join('images', 'star.png')).convert_alpha()
+    star_surf = assets.image('images', 'star.png')
     for i in range(20):
         Star(star_sprites, star_surf, W_WIDTH, W_HEIGHT)
 
+    # El fondo (color y estrellas) no cambia: con dirty rects se dibuja una
+    # sola vez y se usa para borrar las zonas que cambiaron
+    renderer = None
+    if DIRTY_RECTS:
+        background = pygame.Surface((W_WIDTH, W_HEIGHT)).convert()
+        background.fill('#1a1a2e')
+        star_sprites.draw(background)
+        renderer = DirtyRenderer(screen, background)
+
     # Creamos el jugador
     player = Player(all_sprites, W_WIDTH, W_HEIGHT, laser_surf, all_sprites,
-                    laser_sprites, laser_sound, network.player_id)
+                    laser_sprites, laser_sound, network.player_id, laser_store,
+                    network.prediction)
 
-    # Configuramos el evento de spawn de meteoritos
+    # Configuramos el evento de spawn de meteoritos (solo con servidores
+    # viejos; si el servidor reparte una semilla se usa el campo de meteoritos)
     meteor_event = pygame.event.custom_type()
     pygame.time.set_timer(meteor_event, 500)  # Cada 500ms
+    meteor_field = None
 
-    # Variables del juego
-    player_lives = 3
-    player_score = 0
+    # Variables del juego (las vidas y el puntaje son los predichos, que se
+    # reconcilian con los del servidor)
+    player_lives, player_score = network.prediction.stats()
     running = True
     last_position_update = 0
-    position_update_interval = 0.05  # Actualizamos posición cada 50ms
+    position_update_interval = 0.05  # Enviamos las entradas cada 50ms
 
     # Pantalla de espera para que se conecten más jugadores
     waiting_for_players = True
-    wait_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 45)
-    small_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 32)
+    wait_font = assets.font(45)
+    small_font = assets.font(32)
 
     # Loop de espera
+    game_state = network.get_game_state()
     while waiting_for_players and running:
-        game_state = network.get_game_state()
-
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
                 waiting_for_players = False
+            if event.type == state_event:
+                game_state = network.get_game_state()
 
         # Dibujamos la pantalla de espera
         draw_gradient_background(screen, (15, 20, 35), (30, 40, 60))
@@ -682,16 +711,16 @@ def main():
 
         # Mensaje según el estado
         if status == "ready":
-            waiting_text = wait_font.render("Esperando al servidor...", True, (255, 220, 100))
+            waiting_text = render_text(wait_font, "Esperando al servidor...", True, (255, 220, 100))
         else:
-            waiting_text = wait_font.render(f"Players: {num_players}/4", True, (100, 200, 255))
+            waiting_text = render_text(wait_font, f"Players: {num_players}/4", True, (100, 200, 255))
 
         waiting_rect = waiting_text.get_rect(center=(W_WIDTH // 2, 370))
         screen.blit(waiting_text, waiting_rect)
 
         # Texto parpadeante
         if pygame.time.get_ticks() % 1000 < 500:
-            status_text = small_font.render("Conectando...", True, (150, 150, 180))
+            status_text = render_text(small_font, "Conectando...", True, (150, 150, 180))
             status_rect = status_text.get_rect(center=(W_WIDTH // 2, 430))
             screen.blit(status_text, status_rect)
 
@@ -703,148 +732,270 @@ def main():
         clock.tick(60)
 
     # Fuentes para el HUD
-    hud_font = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 28)
-    score_font_big = pygame.font.Font(join('images', 'Oxanium-Bold.ttf'), 50)
+    hud_font = assets.font(28)
+    score_font_big = assets.font(50)
+
+    # El panel de otros jugadores se arma solo cuando cambia la versión del estado
+    snapshot = network.get_snapshot()
+    players_version = None
+    players_hud = None
 
     # Loop principal del juego
     while running:
         dt = clock.tick(60) / 1000  # Delta time en segundos
         events = pygame.event.get()
 
-        # Obtenemos el estado actualizado del juego
-        game_state = network.get_game_state()
+        # Volvemos a leer el estado del juego solo si el thread de red avisó
+        # que llegó uno nuevo
+        if any(event.type == state_event for event in events):
+            snapshot = network.get_snapshot()
+        game_state = snapshot.state
 
         # Verificamos si el jugador murió
         if player_lives <= 0:
             # Mostramos la pantalla de game over
             restart = show_game_over_screen(screen, font, game_state, network)
+            if renderer is not None:
+                renderer.invalidate()  # La pantalla de game over tapó todo
 
             if restart:
-                # Reiniciamos las variables del jugador
-                player_lives = 3
-                player_score = 0
-                player.rect.center = (W_WIDTH / 2, W_HEIGHT / 2)
+                # El reinicio ya se aplicó en la predicción (vidas, puntaje y posición)
+                player_lives, player_score = network.prediction.stats()
                 meteor_sprites.empty()
                 laser_sprites.empty()
+                if meteor_store is not None:
+                    meteor_store.clear()
+                    laser_store.clear()
 
-                # Esperamos a que todos los jugadores estén listos
+                # Esperamos a que todos los jugadores estén listos (los avisos
+                # de estado nuevo los consumió la pantalla de game over)
                 waiting_restart = True
+                snapshot = network.get_snapshot()
                 while waiting_restart:
-                    game_state = network.get_game_state()
-                    if game_state.get("status") == "running":
+                    if snapshot.state.get("status") == "running":
                         waiting_restart = False
 
                     for event in pygame.event.get():
                         if event.type == pygame.QUIT:
                             running = False
                             waiting_restart = False
+                        if event.type == state_event:
+                            snapshot = network.get_snapshot()
 
                     # Pantalla de espera
                     draw_gradient_background(screen, (15, 20, 35), (30, 40, 60))
                     panel_rect = pygame.Rect(250, 350, 500, 100)
                     draw_panel(screen, panel_rect, (30, 35, 55), 240)
-                    wait_text = font.render("Esperando jugadores...", True, (100, 200, 255))
+                    wait_text = render_text(font, "Esperando jugadores...", True, (100, 200, 255))
                     wait_rect = wait_text.get_rect(center=(W_WIDTH // 2, 400))
                     screen.blit(wait_text, wait_rect)
                     pygame.display.update()
                     clock.tick(60)
             else:
                 running = False
+            snapshot = network.get_snapshot()
             continue
 
+        # Meteoritos de la partida: todos los clientes generan los mismos
+        # a partir de la semilla y el tick de inicio que reparte el servidor
+        match = game_state.get("match")
+        server_tick = network.server_tick()
+        if match and server_tick is not None:
+            if (meteor_field is None or meteor_field.seed != match["seed"]
+                    or meteor_field.start_tick != match["start_tick"]):
+                meteor_field = MeteorField(match["seed"], match["start_tick"],
+                                           network.tick_rate, W_WIDTH)
+            for params in meteor_field.due(server_tick):
+                if meteor_store is not None:
+                    meteor_store.spawn(**params)
+                else:
+                    meteor_pool.acquire([all_sprites, meteor_sprites], meteor_surf,
+                                        rotations=meteor_rotations, **params)
+
         # Procesamos eventos
         for event in events:
             if event.type == pygame.QUIT:
                 running = False
-            if event.type == meteor_event:
+            if event.type == meteor_event and meteor_field is None:
                 # Creamos un nuevo meteorito en posición aleatoria
                 x = randint(0, W_WIDTH)
                 y = randint(-200, -100)
-                Meteor([all_sprites, meteor_sprites], meteor_surf, (x, y))
+                if meteor_store is not None:
+                    meteor_store.spawn((x, y), uniform(-0.5, 0.5), randint(500, 600),
+                                       randint(50, 80))
+                else:
+                    meteor_pool.acquire([all_sprites, meteor_sprites], meteor_surf, (x, y),
+                                        rotations=meteor_rotations)
 
         # Actualizamos sprites
         star_sprites.update(dt, events)
         all_sprites.update(dt, events)
+        if meteor_store is not None:
+            meteor_store.update(dt)
+            laser_store.update(dt)
 
-        # Enviamos la posición del jugador al servidor periódicamente
+        # Enviamos las entradas del jugador al servidor periódicamente
         current_time = pygame.time.get_ticks() / 1000
         if current_time - last_position_update > position_update_interval:
-            network.send_position(player.rect.centerx, player.rect.centery)
+            network.send_inputs()
             last_position_update = current_time
 
-        # Detectamos colisiones entre jugador y meteoritos
-        collision_sprites = pygame.sprite.spritecollide(player, meteor_sprites, True)
-        if collision_sprites:
-            player_lives -= 1
-            network.send_hit()  # Notificamos al servidor
-            damage_sound.play()
-            Explosion(explosion_frames, all_sprites, player.rect.center)
-
-        # Detectamos colisiones entre láseres y meteoritos
-        for laser in laser_sprites:
-            collided_sprites = pygame.sprite.spritecollide(
-                laser, meteor_sprites, True, pygame.sprite.collide_mask
-            )
-            if collided_sprites:
-                laser.kill()  # Destruimos el láser
-                Explosion(explosion_frames, all_sprites, laser.rect.midtop)
+        # Naves de los demás jugadores (vivos), en sus posiciones interpoladas
+        players = game_state.get("players", {})
+        shown = set()
+        for pid, pos in network.interpolated_positions().items():
+            pdata = players.get(pid)
+            if str(pid) == str(network.player_id) or not pdata or not pdata.get("alive", True):
+                continue
+            ship = remote_players.get(pid)
+            if ship is None:
+                ship = remote_players[pid] = RemotePlayer(remote_sprites, int(pid), pos)
+            ship.move_to(pos)
+            shown.add(pid)
+        for pid in remote_players.keys() - shown:
+            remote_players.pop(pid).kill()
+
+        if meteor_store is not None:
+            # Detectamos colisiones entre jugador y meteoritos
+            collided = meteor_store.collide_rect(player.rect)
+            if len(collided):
+                meteor_store.remove(collided)
+                network.send_hit()  # Descuenta la vida y notifica al servidor
+                damage_sound.play()
+                explosion_pool.acquire(all_sprites, explosion_frames, player.rect.center)
+
+            # Detectamos colisiones entre láseres y meteoritos
+            hits = meteor_store.collide_lasers(laser_store, laser_mask)
+            for laser in hits:
+                explosion_pool.acquire(all_sprites, explosion_frames, laser_store.midtop(laser))
                 explosion_sound.play()
-                player_score += 10  # Sumamos puntos
-                network.send_score(player_score)  # Actualizamos en el servidor
-
-        # Renderizado
-        screen.fill('#1a1a2e')  # Fondo oscuro
+                network.send_kill()  # Suma los puntos y notifica al servidor
+            if hits:
+                meteor_store.remove([meteor for meteors in hits.values() for meteor in meteors])
+                laser_store.remove(list(hits))
+        else:
+            # Ubicamos los meteoritos en la grilla: cada láser solo se prueba
+            # contra los meteoritos de sus celdas y no contra todos
+            meteor_grid.rebuild(meteor_sprites)
+
+            # Detectamos colisiones entre jugador y meteoritos
+            collision_sprites = meteor_grid.spritecollide(player, True)
+            if collision_sprites:
+                network.send_hit()  # Descuenta la vida y notifica al servidor
+                damage_sound.play()
+                explosion_pool.acquire(all_sprites, explosion_frames, player.rect.center)
+
+            # Detectamos colisiones entre láseres y meteoritos
+            for laser in laser_sprites:
+                collided_sprites = meteor_grid.spritecollide(
+                    laser, True, pygame.sprite.collide_mask
+                )
+                if collided_sprites:
+                    laser.kill()  # Destruimos el láser
+                    explosion_pool.acquire(all_sprites, explosion_frames, laser.rect.midtop)
+                    explosion_sound.play()
+                    network.send_kill()  # Suma los puntos y notifica al servidor
 
-        # Panel de puntaje principal
-        score_panel_rect = pygame.Rect(W_WIDTH // 2 - 120, W_HEIGHT - 100, 240, 70)
-        draw_panel(screen, score_panel_rect, (40, 80, 140), 200)
+        # Todo lo que se encoló en este frame sale al servidor en una sola escritura
+        network.flush()
 
-        score_text = score_font_big.render(str(player_score), True, (255, 255, 100))
-        score_rect = score_text.get_rect(center=score_panel_rect.center)
-        screen.blit(score_text, score_rect)
+        # Vidas y puntaje predichos (ya corregidos si el servidor no coincidió)
+        player_lives, player_score = network.prediction.stats()
 
-        # Panel de vidas
+        # Renderizado: cada elemento del HUD es una función que lo dibuja,
+        # con una firma que cambia solo cuando cambia lo que muestra
+        score_panel_rect = pygame.Rect(W_WIDTH // 2 - 120, W_HEIGHT - 100, 240, 70)
         lives_panel_rect = pygame.Rect(10, 10, 160, 60)
-        draw_panel(screen, lives_panel_rect, (140, 40, 80), 200)
-
-        # Dibujamos los íconos de vidas
-        for i in range(player_lives):
-            screen.blit(life_surf, (25 + i * 45, 18))
-
-        # Panel de otros jugadores
-        if game_state.get("players"):
-            # Filtramos para no mostrar nuestro propio jugador
-            other_players = {
-                k: v for k, v in game_state.get("players", {}).items()
-                if k != network.player_id
-            }
 
-            if other_players:
+        def draw_score(surface):
+            # Panel de puntaje principal
+            draw_panel(surface, score_panel_rect, (40, 80, 140), 200)
+            score_text = render_text(score_font_big, str(player_score), True, (255, 255, 100))
+            score_rect = score_text.get_rect(center=score_panel_rect.center)
+            surface.blit(score_text, score_rect)
+
+        def draw_lives(surface):
+            # Panel de vidas
+            draw_panel(surface, lives_panel_rect, (140, 40, 80), 200)
+            # Dibujamos los íconos de vidas
+            for i in range(player_lives):
+                surface.blit(life_surf, (25 + i * 45, 18))
+
+        # Los paneles tienen una sombra de 4 píxeles alrededor
+        hud = [
+            ("score", score_panel_rect.inflate(8, 8), player_score, draw_score),
+            ("lives", lives_panel_rect.inflate(8, 8), player_lives, draw_lives),
+        ]
+
+        # Panel de otros jugadores (sin mostrar nuestro propio jugador). Sale
+        # del estado del servidor: solo se rearma si llegó una versión nueva
+        if snapshot.version != players_version:
+            players_version = snapshot.version
+            players_hud = None
+            other_lines = tuple(
+                f"{pdata.get('username', f'P{player_id}')}: {pdata.get('score', 0)} pts "
+                f"({pdata.get('lives', 0)})"
+                for player_id, pdata in game_state.get("players", {}).items()
+                if str(player_id) != str(network.player_id)
+            )
+            if other_lines:
                 # Calculamos el tamaño del panel según la cantidad de jugadores
                 players_panel_rect = pygame.Rect(
-                    W_WIDTH - 330, 10, 320, 40 + len(other_players) * 35
+                    W_WIDTH - 330, 10, 320, 40 + len(other_lines) * 35
                 )
-                draw_panel(screen, players_panel_rect, (60, 40, 80), 200)
-
-                y_offset = 20
-                # Mostramos info de cada jugador
-                for player_id, pdata in other_players.items():
-                    username = pdata.get("username", f"P{player_id}")
-                    score = pdata.get("score", 0)
-                    lives = pdata.get("lives", 0)
-                    text = hud_font.render(
-                        f"{username}: {score} pts ({lives})", True, (220, 220, 220)
-                    )
-                    screen.blit(text, (W_WIDTH - 315, y_offset))
-                    y_offset += 35
-
-        # Dibujamos todos los sprites
-        star_sprites.draw(screen)
-        all_sprites.draw(screen)
 
-        pygame.display.update()
+                def draw_players(surface, rect=players_panel_rect, lines=other_lines):
+                    draw_panel(surface, rect, (60, 40, 80), 200)
+                    y_offset = 20
+                    # Mostramos info de cada jugador
+                    for line in lines:
+                        text = render_text(hud_font, line, True, (220, 220, 220))
+                        surface.blit(text, (W_WIDTH - 315, y_offset))
+                        y_offset += 35
+
+                players_hud = ("players", players_panel_rect.inflate(8, 8), other_lines,
+                               draw_players)
+        if players_hud is not None:
+            hud.append(players_hud)
+
+        if renderer is not None:
+            # Solo repintamos y enviamos a la pantalla las zonas que cambiaron
+            sprites = [(sprite.image, sprite.rect) for sprite in remote_sprites]
+            sprites += [(sprite.image, sprite.rect) for sprite in all_sprites]
+            if meteor_store is not None:
+                sprites = meteor_store.items() + laser_store.items() + sprites
+            renderer.render(hud, sprites)
+        else:
+            screen.fill('#1a1a2e')  # Fondo oscuro
+            for key, rect, signature, draw in hud:
+                draw(screen)
+
+            # Dibujamos todos los sprites
+            star_sprites.draw(screen)
+            if meteor_store is not None:
+                meteor_store.draw(screen)
+                laser_store.draw(screen)
+            remote_sprites.draw(screen)
+            all_sprites.draw(screen)
+
+            pygame.display.update()
 
     # Limpieza al salir
+    stats = assets.stats()
+    print(f"Recursos: {stats['images']} imágenes, {stats['sounds']} sonidos, "
+          f"{stats['fonts']} fuentes cargadas en {stats['load_time'] * 1000:.0f} ms "
+          f"({(stats['image_bytes'] + stats['sound_bytes']) / 1024 / 1024:.1f} MB), "
+          f"{stats['hits']} pedidos sin cargar")
+    for name, pool in (("láseres", player.laser_pool), ("meteoritos", meteor_pool),
+                       ("explosiones", explosion_pool)):
+        print(f"Pool de {name}: {pool.hits} reutilizados, {pool.misses} creados")
+    print(f"Caché de textos: {text_cache.hits} reutilizados, {text_cache.misses} renderizados "
+          f"({text_cache.hit_rate():.1%})")
+    stats = network.send_stats()
+    print(f"Envíos: {stats['messages']} mensajes en {stats['writes']} escrituras "
+          f"({stats['coalesced']} reemplazados antes de enviarse), espera promedio "
+          f"{stats['avg_latency'] * 1000:.1f} ms (máx. {stats['max_latency'] * 1000:.1f} ms), "
+          f"hasta {stats['max_queue_length']} en cola")
     network.disconnect()
     pygame.quit()
 
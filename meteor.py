@@ -7,9 +7,10 @@ y deben ser esquivados o destruidos por el jugador.
 
 import pygame
 from random import randint, uniform
+from sprite_pool import PooledSprite, get_mask
 
 
-class Meteor(pygame.sprite.Sprite):
+class Meteor(PooledSprite):
     """
     Clase que representa un meteorito en el juego.
 
@@ -21,47 +22,64 @@ class Meteor(pygame.sprite.Sprite):
         og: Imagen original del meteorito
         image: Imagen actual rotada
         rect: Rectángulo para posición y colisiones
-        start_time: Tiempo de cuando se creó el meteorito
+        origin: Posición inicial del meteorito
+        age: Segundos desde que apareció el meteorito
         lifetime: Tiempo de vida en milisegundos
         direction: Vector de dirección del movimiento
         speed: Velocidad de caída en píxeles por segundo
         rotation_speed: Velocidad de rotación en grados por segundo
         rotation: Ángulo de rotación actual
+        rotations: RotationCache compartida con las rotaciones de la imagen
     """
 
-    def __init__(self, groups, surf, pos):
+    def reset(self, surf, pos, direction_x=None, speed=None,
+              rotation_speed=None, age=0, rotations=None):
         """
-        Inicializa un meteorito en la posición especificada.
+        Inicializa (o reutiliza) un meteorito en la posición especificada.
 
         Argumentos:
-            groups: Grupos de sprites a los que pertenece
             surf: Superficie con la imagen del meteorito
             pos: Tupla (x, y) con la posición inicial
+            direction_x: Componente horizontal de la dirección
+            speed: Velocidad de caída en píxeles por segundo
+            rotation_speed: Velocidad de rotación en grados por segundo
+            age: Segundos que ya pasaron desde su aparición
+            rotations: RotationCache de la imagen (opcional). Si se indica,
+                       rotar es una búsqueda en lugar de un rotozoom por frame
+
+        Los parámetros que no se indican se eligen al azar. El campo de
+        meteoritos de la partida (meteor_field.py) los indica todos para
+        que todos los clientes vean los mismos meteoritos.
         """
-        super().__init__(groups)
-
         # Guardamos la imagen original para poder rotarla sin perder calidad
         self.og = surf
         self.image = surf
+        self.rotations = rotations
         self.rect = self.image.get_rect(center=pos)
 
-        # Guardamos el tiempo de creación para calcular el lifetime
-        self.start_time = pygame.time.get_ticks()
+        # La posición se calcula a partir del origen y la edad del meteorito,
+        # así no se acumulan errores de redondeo distintos en cada cliente
+        self.origin = pygame.math.Vector2(pos)
+        self.age = age
         self.lifetime = 3000  # 3 segundos de vida
 
         # Dirección aleatoria
         # uniform genera un float aleatorio entre los valores dados
-        self.direction = pygame.math.Vector2(uniform(-0.5, 0.5), 1)
+        if direction_x is None:
+            direction_x = uniform(-0.5, 0.5)
+        self.direction = pygame.math.Vector2(direction_x, 1)
 
         # Velocidad aleatoria entre 500 y 600 píxeles por segundo
-        self.speed = randint(500, 600)
+        self.speed = speed if speed is not None else randint(500, 600)
 
-        # Creamos una máscara para colisiones pixel-perfect
+        # Máscara para colisiones pixel-perfect, calculada una vez por imagen
         # Esto permite detectar colisiones más precisas que solo con rectángulos
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = get_mask(self.image)
 
         # Velocidad de rotación aleatoria
-        self.rotation_speed = randint(50, 80)  # Grados por segundo
+        if rotation_speed is None:
+            rotation_speed = randint(50, 80)
+        self.rotation_speed = rotation_speed  # Grados por segundo
         self.rotation = 0  # Ángulo inicial
 
     def update(self, dt, events=None):
@@ -71,20 +89,28 @@ class Meteor(pygame.sprite.Sprite):
         Argumentos:
             dt: Delta time en segundos
         """
+        self.age += dt
+
         # Actualizamos la posición según la dirección y velocidad
-        self.rect.center += self.direction * self.speed * dt
+        center = self.origin + self.direction * self.speed * self.age
 
         # Verificamos si ya pasó el tiempo de vida
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
+        if self.age * 1000 >= self.lifetime:
             self.kill()  # Eliminamos el sprite del juego
 
         # Actualizamos la rotación
-        self.rotation += self.rotation_speed * dt
-
-        # Rotamos la imagen original (no la ya rotada para evitar distorsión)
-        # rotozoom permite rotar y escalar, usamos escala 1 para mantener tamaño
-        self.image = pygame.transform.rotozoom(self.og, self.rotation, 1)
-
-        # Actualizamos el rectángulo manteniendo el centro en la misma posición
+        self.rotation = self.rotation_speed * self.age
+
+        if self.rotations is not None:
+            # Imagen y máscara ya rotadas, compartidas por todos los meteoritos
+            self.image, self.mask = self.rotations.get(self.rotation)
+        else:
+            # Rotamos la imagen original (no la ya rotada para evitar distorsión)
+            # rotozoom permite rotar y escalar, usamos escala 1 para mantener tamaño
+            self.image = pygame.transform.rotozoom(self.og, self.rotation, 1)
+            # La máscara tiene que coincidir con la imagen rotada
+            self.mask = pygame.mask.from_surface(self.image)
+
+        # Actualizamos el rectángulo manteniendo el centro en la posición calculada
         # (rotar cambia el tamaño del rectángulo)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        self.rect = self.image.get_rect(center=(round(center.x), round(center.y)))
@@ -0,0 +1,94 @@
+"""
+Archivo con el campo de meteoritos determinista de una partida.
+
+El servidor reparte una semilla y el tick de inicio de la partida. Con
+eso cada cliente genera exactamente la misma secuencia de meteoritos
+(posición, dirección, velocidad y rotación) sin que el servidor envíe
+un solo meteorito por la red.
+"""
+
+import random
+
+SPAWN_INTERVAL = 0.5  # Segundos entre meteoritos (antes era el timer de 500 ms)
+METEOR_LIFETIME = 3.0  # Segundos de vida de cada meteorito
+
+
+def meteor_params(seed, index, width):
+    """
+    Calcula los parámetros del meteorito número "index" de una partida.
+
+    Argumentos:
+        seed: Semilla de la partida
+        index: Número de meteorito (0, 1, 2...)
+        width: Ancho de la pantalla
+
+    Devuelve:
+        dict: pos, direction_x, speed y rotation_speed del meteorito.
+              Cada meteorito usa su propio generador, así el resultado no
+              depende de cuántos meteoritos se generaron antes.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    return {
+        "pos": (rng.randint(0, width), rng.randint(-200, -100)),
+        "direction_x": rng.uniform(-0.5, 0.5),
+        "speed": rng.randint(500, 600),
+        "rotation_speed": rng.randint(50, 80),
+    }
+
+
+class MeteorField:
+    """
+    Generador de los meteoritos de una partida a partir de su semilla.
+
+    Atributos:
+        seed: Semilla de la partida
+        start_tick: Tick del servidor en el que empezó la partida
+        tick_rate: Ticks por segundo del servidor
+        width: Ancho de la pantalla
+        next_index: Número del próximo meteorito a generar
+    """
+
+    def __init__(self, seed, start_tick, tick_rate, width):
+        """
+        Inicializa el campo sin meteoritos generados.
+
+        Argumentos:
+            seed: Semilla de la partida
+            start_tick: Tick del servidor en el que empezó la partida
+            tick_rate: Ticks por segundo del servidor
+            width: Ancho de la pantalla
+        """
+        self.seed = seed
+        self.start_tick = start_tick
+        self.tick_rate = tick_rate
+        self.width = width
+        self.next_index = 0
+
+    def due(self, server_tick):
+        """
+        Devuelve los meteoritos que ya deberían existir y todavía no se generaron.
+
+        Argumentos:
+            server_tick: Tick actual del servidor (puede tener decimales)
+
+        Devuelve:
+            list: Diccionarios con los parámetros de cada meteorito más
+                  "age", los segundos que pasaron desde su aparición. Los
+                  que ya cumplieron su tiempo de vida (por ejemplo mientras
+                  el jugador estaba en la pantalla de game over) se saltean.
+        """
+        elapsed = (server_tick - self.start_tick) / self.tick_rate
+        if elapsed < 0:
+            return []
+
+        # Salteamos los meteoritos que ya habrían desaparecido
+        first_alive = int((elapsed - METEOR_LIFETIME) / SPAWN_INTERVAL) + 1
+        self.next_index = max(self.next_index, first_alive)
+
+        meteors = []
+        while self.next_index * SPAWN_INTERVAL <= elapsed:
+            params = meteor_params(self.seed, self.next_index, self.width)
+            params["age"] = elapsed - self.next_index * SPAWN_INTERVAL
+            meteors.append(params)
+            self.next_index += 1
+        return meteors
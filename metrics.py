@@ -0,0 +1,430 @@
+"""
+Archivo con las métricas del servidor: contadores e histogramas de latencia.
+
+Las métricas se registran en un MetricsRegistry y se pueden consultar de
+tres formas: por HTTP en formato de texto de Prometheus (start_http_server),
+escritas a un archivo cada cierto tiempo (start_log_dump) o como un
+snapshot serializable que los procesos de salas le envían al principal.
+
+Uso:
+
+    curl http://127.0.0.1:9100/metrics
+"""
+
+import http.server
+import threading
+import time
+from bisect import bisect_left
+
+# Límites superiores (en segundos) de los buckets de los histogramas de latencia
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+METRICS_HOST = "127.0.0.1"  # El endpoint HTTP solo escucha localmente
+
+
+class Counter:
+    """
+    Contador que solo aumenta, uno por cada combinación de etiquetas.
+
+    Atributos:
+        name: Nombre de la métrica
+        help: Descripción
+        labels: Nombres de las etiquetas
+        values: Diccionario tupla de valores de etiquetas -> valor
+        lock: Lock para sumar desde varios threads
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        """
+        Crea un contador sin valores.
+
+        Argumentos:
+            name: Nombre de la métrica
+            help_text: Descripción
+            labels: Nombres de las etiquetas
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """
+        Suma al contador.
+
+        Argumentos:
+            label_values: Valores de las etiquetas, en el orden de labels
+            amount: Cantidad a sumar
+        """
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def snapshot(self):
+        """
+        Devuelve los valores actuales (ver MetricsRegistry.snapshot).
+        """
+        with self.lock:
+            return dict(self.values)
+
+
+class Histogram:
+    """
+    Histograma de valores (por ejemplo, duraciones en segundos), uno por
+    cada combinación de etiquetas.
+
+    Atributos:
+        name: Nombre de la métrica
+        help: Descripción
+        labels: Nombres de las etiquetas
+        buckets: Límites superiores de los buckets, de menor a mayor
+        values: Diccionario tupla de valores de etiquetas -> [cantidades por
+                bucket (la última es la de los mayores al último límite),
+                suma, cantidad]
+        lock: Lock para registrar desde varios threads
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        """
+        Crea un histograma sin valores.
+
+        Argumentos:
+            name: Nombre de la métrica
+            help_text: Descripción
+            labels: Nombres de las etiquetas
+            buckets: Límites superiores de los buckets
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Registra un valor.
+
+        Argumentos:
+            value: Valor a registrar
+            label_values: Valores de las etiquetas, en el orden de labels
+        """
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(label_values)
+            if entry is None:
+                entry = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        """
+        Devuelve los valores actuales (ver MetricsRegistry.snapshot).
+        """
+        with self.lock:
+            return {key: (list(counts), total, count)
+                    for key, (counts, total, count) in self.values.items()}
+
+
+class CallbackMetric:
+    """
+    Métrica cuyos valores se calculan al consultarla (por ejemplo, los bytes
+    de cada cliente conectado, que ya lleva cada conexión).
+
+    Atributos:
+        name: Nombre de la métrica
+        help: Descripción
+        kind: "counter" o "gauge"
+        labels: Nombres de las etiquetas
+        func: Función sin argumentos que devuelve un diccionario tupla de
+              valores de etiquetas -> valor
+    """
+
+    def __init__(self, name, help_text, kind, labels, func):
+        """
+        Crea la métrica.
+
+        Argumentos:
+            name: Nombre de la métrica
+            help_text: Descripción
+            kind: "counter" o "gauge"
+            labels: Nombres de las etiquetas
+            func: Función que calcula los valores
+        """
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.func = func
+
+    def snapshot(self):
+        """
+        Devuelve los valores actuales (ver MetricsRegistry.snapshot).
+        """
+        return dict(self.func())
+
+
+class TimedLock:
+    """
+    Lock que registra en un histograma cuánto se esperó para tomarlo.
+
+    Se usa igual que threading.Lock (con with, acquire y release). Solo
+    se registran las veces que el lock ya estaba tomado: si estaba libre
+    cuesta casi lo mismo que un threading.Lock.
+
+    Atributos:
+        lock: threading.Lock real
+        histogram: Histogram donde se registran las esperas en segundos
+        label_values: Valores de las etiquetas del histograma
+    """
+
+    def __init__(self, histogram, *label_values):
+        """
+        Crea el lock.
+
+        Argumentos:
+            histogram: Histogram de esperas
+            label_values: Valores de las etiquetas del histograma
+        """
+        self.lock = threading.Lock()
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def acquire(self, blocking=True, timeout=-1):
+        """
+        Toma el lock (ver threading.Lock.acquire) y, si hubo que esperar,
+        registra la espera.
+        """
+        if self.lock.acquire(False):
+            return True  # Estaba libre: no hay espera que registrar
+        if not blocking:
+            return False
+        return self._wait(timeout)
+
+    def _wait(self, timeout=-1):
+        """
+        Espera a que se suelte el lock, lo toma y registra la espera.
+        """
+        start = time.perf_counter()
+        if not self.lock.acquire(True, timeout):
+            return False
+        self.histogram.observe(time.perf_counter() - start, *self.label_values)
+        return True
+
+    def release(self):
+        """
+        Suelta el lock.
+        """
+        self.lock.release()
+
+    def locked(self):
+        """
+        Indica si el lock está tomado.
+        """
+        return self.lock.locked()
+
+    def __enter__(self):
+        if not self.lock.acquire(False):
+            self._wait()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas de un proceso.
+
+    Atributos:
+        metrics: Diccionario nombre -> métrica, en el orden en que se crearon
+        lock: Lock para crear métricas desde varios threads
+    """
+
+    def __init__(self):
+        """
+        Crea un registro vacío.
+        """
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        """
+        Registra una métrica o devuelve la que ya tenía ese nombre.
+        """
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labels=()):
+        """
+        Devuelve el Counter con ese nombre, creándolo la primera vez.
+        """
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        """
+        Devuelve el Histogram con ese nombre, creándolo la primera vez.
+        """
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def callback(self, name, help_text, kind, labels, func):
+        """
+        Registra una métrica calculada al consultarla (ver CallbackMetric).
+        """
+        return self._register(CallbackMetric(name, help_text, kind, labels, func))
+
+    def snapshot(self):
+        """
+        Devuelve todas las métricas como datos simples (se pueden enviar a
+        otro proceso).
+
+        Devuelve:
+            dict: nombre -> diccionario con "kind", "help", "labels",
+                  "buckets" (solo histogramas) y "values"
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            try:
+                values = metric.snapshot()
+            except Exception as e:
+                print(f"Error al calcular la métrica {metric.name}: {e}")
+                continue
+            snapshot[metric.name] = {"kind": metric.kind, "help": metric.help,
+                                     "labels": metric.labels,
+                                     "buckets": getattr(metric, "buckets", None),
+                                     "values": values}
+        return snapshot
+
+    def render(self, extra=()):
+        """
+        Devuelve las métricas en el formato de texto de Prometheus.
+
+        Argumentos:
+            extra: Lista de tuplas (etiquetas, snapshot) de otros procesos;
+                   etiquetas es un diccionario que se agrega a cada valor
+                   (por ejemplo {"worker": "0"})
+
+        Devuelve:
+            str: Texto con una familia por métrica
+        """
+        return render_text([({}, self.snapshot())] + list(extra))
+
+
+def _format_labels(names, values, extra=()):
+    """
+    Arma el bloque {nombre="valor",...} de una muestra (vacío sin etiquetas).
+    """
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _name, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _value), value in zip(pairs, escaped)) + "}"
+
+
+def render_text(snapshots):
+    """
+    Convierte snapshots de métricas al formato de texto de Prometheus.
+
+    Argumentos:
+        snapshots: Lista de tuplas (etiquetas extra, snapshot). Las métricas
+                   con el mismo nombre se agrupan en una sola familia.
+
+    Devuelve:
+        str: Texto terminado en salto de línea
+    """
+    families = {}  # nombre -> (snapshot de la métrica, [(etiquetas extra, valores)])
+    for extra, snapshot in snapshots:
+        for name, metric in snapshot.items():
+            family = families.setdefault(name, (metric, []))
+            family[1].append((tuple(extra.items()), metric["values"]))
+
+    lines = []
+    for name, (metric, sources) in families.items():
+        kind = metric["kind"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {kind}")
+        for extra, values in sources:
+            for label_values, value in sorted(values.items(), key=lambda item: tuple(map(str, item[0]))):
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(metric['labels'], label_values, extra)} "
+                                 f"{value:g}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric["buckets"]) + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(metric["labels"] + ("le",),
+                                            label_values + (f"{bound:g}" if bound != "+Inf" else bound,),
+                                            extra)
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(metric["labels"], label_values, extra)
+                lines.append(f"{name}_sum{labels} {total:.9g}")
+                lines.append(f"{name}_count{labels} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def start_http_server(render, port, host=METRICS_HOST):
+    """
+    Expone las métricas por HTTP en un thread separado.
+
+    Argumentos:
+        render: Función sin argumentos que devuelve el texto de las métricas
+        port: Puerto TCP
+        host: Dirección donde escuchar (por defecto solo local)
+
+    Responde en /metrics (y en /) con el formato de texto de Prometheus.
+    """
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Sin una línea por cada consulta
+
+    http.server.ThreadingHTTPServer.allow_reuse_address = True
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Métricas en http://{host}:{port}/metrics")
+
+
+def start_log_dump(render, path, interval):
+    """
+    Agrega las métricas a un archivo cada cierto tiempo, en un thread separado.
+
+    Argumentos:
+        render: Función sin argumentos que devuelve el texto de las métricas
+        path: Archivo al que se agregan (cada bloque empieza con la hora)
+        interval: Segundos entre escrituras
+    """
+
+    def dump_loop():
+        while True:
+            time.sleep(interval)
+            try:
+                with open(path, "a") as file:
+                    file.write(f"# {time.strftime('%Y-%m-%d %H:%M:%S')}\n{render()}\n")
+            except OSError as e:
+                print(f"Error al escribir las métricas: {e}")
+
+    threading.Thread(target=dump_loop, daemon=True).start()
+
+
+# Registro compartido por todo el proceso
+registry = MetricsRegistry()
@@ -2,13 +2,204 @@
 Archivo que conecta main.py con el server.py.
 
 Maneja la conexión con el servidor y el intercambio de datos usando
-sockets TCP y JSON para la serialización de mensajes.
+sockets TCP. Los mensajes se serializan con el protocolo binario de
+protocol.py si el servidor lo acepta, o con JSON en caso contrario.
+Si el servidor ofrece el canal UDP, las posiciones viajan por UDP y
+el resto de los eventos sigue por TCP.
+
+Los mensajes TCP no se envían desde el thread del juego: se encolan y
+un thread aparte los escribe todos juntos al final de cada frame, así
+una demora de la red nunca frena un frame.
+
+El estado del juego que recibe el thread de red se publica como un
+GameSnapshot inmutable: cada estado nuevo es un objeto nuevo que
+reemplaza al anterior, así el loop del juego lo lee sin locks ni copias.
 
 """
 
 import socket
-import json
+import struct
 import threading
+import time
+from types import MappingProxyType
+
+import pygame
+
+from interpolation import INTERPOLATION_DELAY, InterpolationBuffer
+from prediction import Prediction
+from snapshot import SnapshotHistory, apply_delta
+from protocol import (BINARY_PROTOCOL, JSON_PROTOCOL, decode_datagram, encode_message,
+                      encode_udp_hello, encode_udp_position, read_message)
+
+SEND_INTERVAL = 0.02  # Segundos máximos que espera un mensaje si nadie llama a flush()
+# Acciones de las que solo importa la última: si hay una encolada, la nueva la reemplaza
+COALESCED_ACTIONS = ("update_position", "update_score", "ack")
+
+
+class SendQueue:
+    """
+    Cola de mensajes pendientes de enviar al servidor.
+
+    Los mensajes se acumulan hasta que se llama a flush() (una vez por
+    frame) o hasta que el más viejo lleva SEND_INTERVAL segundos esperando,
+    y entonces se envían todos en una sola escritura. De las acciones de
+    COALESCED_ACTIONS solo queda la última encolada.
+
+    Atributos:
+        items: Lista de tuplas (mensaje, hora en que se encoló)
+        condition: Condition que despierta al thread que envía
+        flush_requested: Si se pidió enviar lo encolado
+        closed: Si la cola se cerró (se cortó la conexión)
+        messages: Mensajes enviados
+        coalesced: Mensajes reemplazados por uno más nuevo antes de enviarse
+        writes: Escrituras en el socket
+        bytes_sent: Bytes enviados
+        max_length: Máximo de mensajes que hubo encolados a la vez
+        latency_total: Suma de lo que esperó cada mensaje hasta enviarse
+        latency_max: Máximo que esperó un mensaje hasta enviarse
+    """
+
+    def __init__(self):
+        """
+        Crea una cola vacía.
+        """
+        self.items = []
+        self.condition = threading.Condition()
+        self.flush_requested = False
+        self.closed = False
+        self.messages = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.bytes_sent = 0
+        self.max_length = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def put(self, message):
+        """
+        Encola un mensaje sin bloquear.
+
+        Argumentos:
+            message: Diccionario con el mensaje
+        """
+        with self.condition:
+            action = message.get("action")
+            if action in COALESCED_ACTIONS:
+                for index, (queued, _queued_at) in enumerate(self.items):
+                    if queued.get("action") == action:
+                        # Va al final, después de lo que se encoló mientras tanto
+                        del self.items[index]
+                        self.coalesced += 1
+                        break
+            self.items.append((message, time.monotonic()))
+            self.max_length = max(self.max_length, len(self.items))
+            if len(self.items) == 1:
+                self.condition.notify()  # Empieza a correr el SEND_INTERVAL
+
+    def flush(self):
+        """
+        Pide enviar ya todo lo encolado.
+        """
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify()
+
+    def get_batch(self):
+        """
+        Espera a que haya que enviar y saca todos los mensajes encolados.
+
+        Devuelve:
+            list o None: Tuplas (mensaje, hora en que se encoló), o None si
+                         la cola se cerró
+        """
+        with self.condition:
+            while not self.closed:
+                if self.items:
+                    waited = time.monotonic() - self.items[0][1]
+                    if self.flush_requested or waited >= SEND_INTERVAL:
+                        break
+                    self.condition.wait(SEND_INTERVAL - waited)
+                else:
+                    self.condition.wait()
+            if self.closed:
+                return None
+            batch, self.items = self.items, []
+            self.flush_requested = False
+            return batch
+
+    def record_write(self, batch, size):
+        """
+        Registra una escritura para las métricas.
+
+        Argumentos:
+            batch: Mensajes enviados (como los devolvió get_batch)
+            size: Bytes escritos
+        """
+        now = time.monotonic()
+        with self.condition:
+            self.writes += 1
+            self.bytes_sent += size
+            self.messages += len(batch)
+            for _message, queued_at in batch:
+                self.latency_total += now - queued_at
+                self.latency_max = max(self.latency_max, now - queued_at)
+
+    def close(self):
+        """
+        Cierra la cola y despierta al thread que envía para que termine.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def stats(self):
+        """
+        Devuelve las métricas de envío.
+
+        Devuelve:
+            dict: Mensajes encolados ahora y máximo, mensajes enviados y
+                  reemplazados, escrituras, bytes, mensajes por escritura
+                  y espera promedio y máxima en segundos
+        """
+        with self.condition:
+            return {
+                "queue_length": len(self.items),
+                "max_queue_length": self.max_length,
+                "messages": self.messages,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "bytes": self.bytes_sent,
+                "messages_per_write": self.messages / self.writes if self.writes else 0.0,
+                "avg_latency": self.latency_total / self.messages if self.messages else 0.0,
+                "max_latency": self.latency_max,
+            }
+
+
+class GameSnapshot:
+    """
+    Estado del juego publicado por el thread de red.
+
+    No se modifica nunca: cada estado recibido se publica como un
+    GameSnapshot nuevo, con la versión siguiente.
+
+    Atributos:
+        version: Número que aumenta con cada estado publicado
+        state: Estado del juego (diccionario de solo lectura)
+    """
+
+    __slots__ = ("version", "state")
+
+    def __init__(self, version, state):
+        """
+        Crea el snapshot.
+
+        Argumentos:
+            version: Número de versión
+            state: Diccionario con el estado del juego (no se debe modificar
+                   después, ni él ni sus diccionarios internos)
+        """
+        self.version = version
+        self.state = MappingProxyType(state)
 
 
 class Network:
@@ -22,32 +213,90 @@ class Network:
     Atributos:
         client: Socket TCP para la conexión con el servidor
         connected: Boolean que indica si hay conexión activa
-        player_id: ID único asignado por el servidor
-        game_state: Diccionario con el estado actual del juego
-        lock: Lock para sincronización de threads
+        player_id: ID único asignado por el servidor dentro de la sala
+        room: Nombre de la sala asignada por el servidor
+        tick_rate: Ticks por segundo del servidor (None si no lo informó)
+        protocol: Protocolo acordado con el servidor en el welcome
+        snapshot: GameSnapshot con el último estado del juego. Se reemplaza
+                  entero (una asignación es atómica), nunca se modifica
+        state_event: Tipo de evento de pygame que se publica con cada estado
+                     nuevo (None para no publicar eventos)
+        snapshot_seq: Secuencia del último snapshot aplicado
+        snapshots: Historial de snapshots recibidos (bases para los deltas)
+        udp: Socket UDP para las posiciones (None si no se usa)
+        udp_token: Token de la sesión UDP recibido en el welcome
+        udp_active: True cuando ya llegaron datagramas del servidor
+        udp_positions: Últimas posiciones recibidas por UDP (id -> (x, y))
+        interpolation: Buffer con las posiciones recibidas y su hora, para
+                       dibujar a los demás jugadores sin saltos
+        prediction: Estado predicho del jugador local (posición, vidas y
+                    puntaje), que se reconcilia con el del servidor
+        ready: Event que se activa al recibir el welcome (o al perder la conexión)
+        send_queue: SendQueue con los mensajes TCP pendientes de enviar
+        lock: Lock para que los threads de TCP y UDP no publiquen estados a la vez
     """
 
-    def __init__(self):
+    def __init__(self, interpolation_delay=INTERPOLATION_DELAY, state_event=None):
         """
         Inicializa el cliente de red con valores por defecto.
+
+        Argumentos:
+            interpolation_delay: Segundos en el pasado en que se dibujan
+                                 los demás jugadores
+            state_event: Tipo de evento de pygame (pygame.event.custom_type())
+                         a publicar cada vez que llega un estado nuevo
         """
         # Creamos el socket TCP
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.connected = False  # No estamos conectados al inicio
         self.player_id = None  # El servidor nos asignará un ID
+        self.room = None  # Y una sala
+
+        # Reloj del servidor: tick informado en el welcome y cuándo llegó
+        self.tick_rate = None
+        self.welcome_tick = None
+        self.welcome_time = None
+        self.protocol = JSON_PROTOCOL  # Hasta que el servidor acepte el binario
 
-        # Estado inicial del juego (se actualizará al recibir datos)
-        self.game_state = {
+        # Estado inicial del juego (se reemplazará al recibir datos)
+        self.snapshot = GameSnapshot(0, {
             "status": "waiting",
             "players": {},
             "meteors": [],
             "num_players": 0
-        }
+        })
+        self.state_event = state_event
+
+        # Snapshots recibidos, necesarios para aplicar los deltas del servidor
+        self.snapshot_seq = None
+        self.snapshots = SnapshotHistory(128)
+
+        # Canal UDP de posiciones (se abre si el servidor lo ofrece en el welcome)
+        self.host = None
+        self.udp = None
+        self.udp_token = None
+        self.udp_active = False
+        self.udp_send_seq = 0
+        self.udp_recv_seq = -1
+        self.udp_positions = {}
+
+        # Posiciones de todos los jugadores con la hora en que llegaron
+        self.interpolation = InterpolationBuffer(interpolation_delay)
+
+        # Entradas del jugador local aplicadas sin esperar al servidor
+        self.prediction = Prediction()
+
+        # Se activa cuando el servidor nos asigna un ID (o si se corta la conexión)
+        self.ready = threading.Event()
+
+        # Mensajes TCP pendientes; los envía el thread de send_loop
+        self.send_queue = SendQueue()
 
-        # Lock para evitar que varios hilos cambien el estado del juego al mismo tiempo
+        # Lock para que los threads de recepción no publiquen estados al mismo
+        # tiempo (el loop del juego lee el snapshot sin tomarlo)
         self.lock = threading.Lock()
 
-    def connect(self, host, port, username):
+    def connect(self, host, port, username, room=None):
         """
         Conecta al servidor y envía el nombre de usuario.
 
@@ -55,6 +304,8 @@ class Network:
             host: Dirección IP o hostname del servidor
             port: Puerto del servidor
             username: Nombre de usuario del jugador
+            room: Nombre de la sala a la que unirse, o None para que el
+                  servidor asigne una con lugar libre
 
         Devuelve:
             bool: True si la conexión fue exitosa, False en caso contrario
@@ -62,10 +313,24 @@ class Network:
         try:
             # Intentamos conectar al servidor
             self.client.connect((host, int(port)))
+            # Los mensajes ya salen agrupados por frame: sin el algoritmo de
+            # Nagle no esperan a que el servidor confirme la escritura anterior
+            self.client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connected = True
-
-            # Enviamos nuestro nombre de usuario
-            self.send_data({"action": "join", "username": username})
+            self.host = host
+            threading.Thread(target=self.send_loop, daemon=True).start()
+
+            # Enviamos nuestro nombre de usuario, la sala y los protocolos que entendemos
+            join = {
+                "action": "join",
+                "username": username,
+                "protocols": [BINARY_PROTOCOL, JSON_PROTOCOL],
+                "udp": True
+            }
+            if room:
+                join["room"] = room
+            self.send_data(join)
+            self.flush()
 
             # Iniciamos un thread para recibir datos continuamente
             threading.Thread(target=self.receive_data, daemon=True).start()
@@ -76,22 +341,52 @@ class Network:
 
     def send_data(self, data):
         """
-        Envía datos al servidor en formato JSON.
+        Encola datos para enviar al servidor, sin bloquear.
 
         Argumentos:
             data: Diccionario con los datos a enviar
 
-        Los datos se serializan a JSON y se envían con un salto de línea
-        al final para delimitar mensajes.
+        Se envían en la próxima llamada a flush() (al final del frame) o,
+        como mucho, SEND_INTERVAL segundos después.
         """
-        try:
-            # Convertimos el diccionario a JSON y agregamos \n
-            message = (json.dumps(data) + "\n").encode("utf-8")
-            # Enviamos todo el mensaje
-            self.client.sendall(message)
-        except Exception as e:
-            print(f"Error al enviar datos: {e}")
-            self.connected = False
+        self.send_queue.put(data)
+
+    def flush(self):
+        """
+        Envía ya todos los mensajes encolados, en una sola escritura.
+
+        El loop del juego la llama una vez por frame.
+        """
+        self.send_queue.flush()
+
+    def send_loop(self):
+        """
+        Envía los mensajes encolados en un thread separado.
+
+        Los datos se serializan como trama binaria si se acordó el protocolo
+        binario y el mensaje tiene formato fijo; si no, como JSON con un
+        salto de línea al final para delimitar mensajes. Todos los mensajes
+        de un lote van en un solo sendall.
+        """
+        while True:
+            batch = self.send_queue.get_batch()
+            if batch is None:
+                return
+            try:
+                data = b"".join(encode_message(message, self.protocol) for message, _t in batch)
+                self.client.sendall(data)
+            except Exception as e:
+                print(f"Error al enviar datos: {e}")
+                self.connected = False
+                self.send_queue.close()
+                return
+            self.send_queue.record_write(batch, len(data))
+
+    def send_stats(self):
+        """
+        Devuelve las métricas de la cola de envío (ver SendQueue.stats).
+        """
+        return self.send_queue.stats()
 
     def receive_data(self):
         """
@@ -102,28 +397,203 @@ class Network:
         para que termine automáticamente cuando el programa cierre.
         """
         try:
-            # Creamos un file object para leer línea por línea
-            file = self.client.makefile(mode="r")
+            # Creamos un file object binario (tramas binarias o líneas JSON)
+            file = self.client.makefile(mode="rb")
 
             # Loop infinito para recibir mensajes
-            for line in file:
-                # Parseamos el JSON recibido
-                data = json.loads(line.strip())
+            while True:
+                try:
+                    data = read_message(file)
+                except (ValueError, struct.error):
+                    continue  # Mensaje mal formado, lo ignoramos
+                if data is None:
+                    raise ConnectionError("el servidor cerró la conexión")
                 msg_type = data.get("type")
 
                 if msg_type == "welcome":
-                    # El servidor nos asigna un ID
+                    # El servidor nos asigna un ID y confirma el protocolo
+                    if data.get("protocol") in (BINARY_PROTOCOL, JSON_PROTOCOL):
+                        self.protocol = data["protocol"]
                     self.player_id = data.get("player_id")
-                    print(f"Conectado como jugador {self.player_id}")
+                    self.room = data.get("room")
+                    # Si el servidor confirma las entradas numeradas, reconciliamos
+                    self.prediction.authoritative = bool(data.get("inputs"))
+                    if data.get("tick_rate"):
+                        self.welcome_time = time.monotonic()
+                        self.welcome_tick = data.get("tick", 0)
+                        self.tick_rate = data["tick_rate"]
+                    print(f"Conectado como jugador {self.player_id} en la sala {self.room}")
+                    if "udp_token" in data:
+                        self.start_udp(data["udp_token"], data.get("udp_port"))
+                    self.ready.set()
 
                 elif msg_type == "state":
-                    # Actualizamos el estado del juego de forma thread-safe
-                    with self.lock:
-                        self.game_state = data.get("state", {})
+                    # Snapshot completo (keyframe)
+                    self.apply_snapshot(data.get("seq"), data.get("state", {}))
+
+                elif msg_type == "delta":
+                    # Solo los campos que cambiaron desde el snapshot "base"
+                    base_state = self.snapshots.get(data.get("base"))
+                    if base_state is None:
+                        # No tenemos la base: esperamos el próximo keyframe
+                        continue
+                    # Descartamos bases viejas que el servidor ya no usará
+                    self.snapshots.discard_before(data.get("base"))
+                    self.apply_snapshot(data.get("seq"),
+                                        apply_delta(base_state, data.get("delta", {})))
+
+                elif msg_type == "input_ack":
+                    # Estado de nuestro jugador según el servidor y última entrada procesada
+                    self.prediction.reconcile(data["seq"], data)
 
         except Exception as e:
             print(f"Conexión perdida: {e}")
             self.connected = False
+            self.ready.set()  # Nadie debe quedarse esperando un welcome que no llegará
+
+    def start_udp(self, token, port):
+        """
+        Abre el canal UDP de posiciones ofrecido por el servidor.
+
+        Argumentos:
+            token: Token de sesión recibido en el welcome
+            port: Puerto UDP del servidor
+
+        Si algo falla seguimos usando solo TCP.
+        """
+        try:
+            udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp.connect((self.host, int(port)))
+            self.udp_token = token
+            self.udp = udp
+            threading.Thread(target=self.receive_udp, daemon=True).start()
+            udp.send(encode_udp_hello(token))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Canal UDP no disponible: {e}")
+            self.udp = None
+
+    def receive_udp(self):
+        """
+        Recibe las posiciones que el servidor envía por UDP.
+
+        Los datagramas desordenados (secuencia menor a la última) se
+        descartan. Las posiciones se aplican sobre el estado actual.
+        """
+        while self.udp is not None:
+            try:
+                data = self.udp.recv(2048)
+            except OSError:
+                if not self.connected:
+                    break
+                continue  # Por ejemplo, un ICMP de puerto inalcanzable
+            try:
+                msg = decode_datagram(data)
+            except ValueError:
+                continue
+            if msg["type"] != "positions" or msg["seq"] <= self.udp_recv_seq:
+                continue
+
+            self.udp_recv_seq = msg["seq"]
+            self.udp_active = True
+            with self.lock:
+                self.udp_positions = msg["positions"]
+                self.publish(self.apply_positions(dict(self.snapshot.state)))
+                self.interpolation.add(dict(self.udp_positions))
+
+    def publish(self, state):
+        """
+        Publica un estado nuevo del juego para el loop del juego.
+
+        Argumentos:
+            state: Diccionario con el estado (no se debe modificar después)
+
+        Debe llamarse con el lock tomado. Si hay state_event, además se
+        publica ese evento en la cola de eventos de pygame.
+        """
+        version = self.snapshot.version + 1
+        self.snapshot = GameSnapshot(version, state)
+        if self.state_event is not None:
+            try:
+                pygame.event.post(pygame.event.Event(self.state_event, version=version))
+            except pygame.error:
+                pass  # Sin pygame iniciado (o con la cola llena) solo queda el snapshot
+
+    def apply_positions(self, state):
+        """
+        Devuelve el estado con las posiciones recibidas por UDP.
+
+        Argumentos:
+            state: Diccionario con el estado del juego (no se modifica)
+
+        Debe llamarse con el lock tomado.
+        """
+        if not self.udp_positions:
+            return state
+        players = dict(state.get("players", {}))
+        for pid, (x, y) in self.udp_positions.items():
+            if pid in players:
+                players[pid] = {**players[pid], "x": x, "y": y}
+        return {**state, "players": players}
+
+    def apply_snapshot(self, seq, state):
+        """
+        Reemplaza el estado local por un snapshot y lo confirma al servidor.
+
+        Argumentos:
+            seq: Secuencia del snapshot (None si el servidor no numera)
+            state: Diccionario con el estado completo del juego
+        """
+        # Actualizamos el estado del juego de forma thread-safe. El historial
+        # guarda el snapshot tal cual (base de los deltas); lo que se muestra
+        # lleva además las posiciones recibidas por UDP.
+        with self.lock:
+            shown = self.apply_positions(state)
+            self.publish(shown)
+            # Con UDP las posiciones llegan por ahí; los snapshots repetirían
+            # posiciones viejas con una hora nueva
+            if not self.udp_active:
+                self.interpolation.add({pid: (pdata["x"], pdata["y"])
+                                        for pid, pdata in shown.get("players", {}).items()
+                                        if "x" in pdata and "y" in pdata})
+
+        # Hasta enviar la primera entrada tomamos el estado inicial del servidor
+        own = state.get("players", {}).get(str(self.player_id))
+        if own is not None:
+            self.prediction.sync(own)
+
+        if seq is None:
+            return
+
+        self.snapshot_seq = seq
+        self.snapshots.add(seq, state)
+        # Confirmamos el snapshot para que el próximo delta parta de él
+        self.send_data({"action": "ack", "seq": seq})
+
+    def wait_ready(self, timeout=None):
+        """
+        Espera a que el servidor nos asigne un ID.
+
+        Argumentos:
+            timeout: Segundos máximos de espera (None para esperar sin límite)
+
+        Devuelve:
+            bool: True si llegó el welcome, False si se cortó la conexión o
+                  se cumplió el tiempo de espera
+        """
+        self.ready.wait(timeout)
+        return self.player_id is not None
+
+    def server_tick(self):
+        """
+        Estima el tick actual del servidor a partir del welcome.
+
+        Devuelve:
+            float o None: Tick estimado, o None si el servidor no informa
+                          su tick (servidores viejos)
+        """
+        if self.welcome_time is None:
+            return None
+        return self.welcome_tick + (time.monotonic() - self.welcome_time) * self.tick_rate
 
     def send_position(self, x, y):
         """
@@ -132,13 +602,54 @@ class Network:
         Argumentos:
             x: Coordenada X del jugador
             y: Coordenada Y del jugador
+
+        Si el canal UDP está activo la posición viaja por UDP: una posición
+        perdida se reemplaza con la siguiente, no hace falta reenviarla.
         """
+        if self.udp is not None:
+            try:
+                if self.udp_active:
+                    self.udp_send_seq += 1
+                    datagram = encode_udp_position(self.udp_token, self.udp_send_seq, x, y)
+                    if datagram is not None:
+                        self.udp.send(datagram)
+                        return
+                else:
+                    # El servidor todavía no confirmó el canal: repetimos el hello
+                    self.udp.send(encode_udp_hello(self.udp_token))
+            except OSError:
+                pass  # Seguimos por TCP
+
         self.send_data({
             "action": "update_position",
             "x": x,
             "y": y
         })
 
+    def send_inputs(self):
+        """
+        Envía las entradas del jugador local que todavía no se enviaron.
+
+        Con servidores que no confirman entradas numeradas se envían los
+        mensajes de siempre: la posición predicha, los golpes y el puntaje.
+        """
+        inputs = self.prediction.flush()
+        if not inputs:
+            return
+        if self.prediction.authoritative:
+            for msg in inputs:
+                self.send_data(msg)
+            return
+
+        kinds = [msg["kind"] for msg in inputs]
+        for kind in kinds:
+            if kind in ("hit", "restart"):
+                self.send_data({"action": kind})
+        if "kill" in kinds or "restart" in kinds:
+            self.send_score(self.prediction.stats()[1])
+        if "move" in kinds or "restart" in kinds:
+            self.send_position(*self.prediction.position())
+
     def send_laser(self, x, y):
         """
         Envía información de disparo láser al servidor.
@@ -157,15 +668,26 @@ class Network:
         """
         Notifica al servidor que el jugador fue golpeado por un meteorito.
 
-        El servidor reducirá las vidas del jugador y actualizará su estado.
+        La vida se descuenta en el momento en la predicción; el servidor
+        reducirá las vidas del jugador y lo confirmará.
         """
-        self.send_data({
-            "action": "hit"
-        })
+        self.prediction.input("hit")
+        self.send_inputs()
+
+    def send_kill(self):
+        """
+        Notifica al servidor que el jugador destruyó un meteorito.
+
+        Los puntos se suman en el momento en la predicción; el servidor los
+        suma también y lo confirma.
+        """
+        self.prediction.input("kill")
+        self.send_inputs()
 
     def send_score(self, score):
         """
-        Envía el puntaje actual del jugador al servidor.
+        Envía el puntaje actual del jugador al servidor (servidores que no
+        confirman entradas numeradas).
 
         Argumentos:
             score: Puntaje actual del jugador
@@ -180,30 +702,56 @@ class Network:
         Notifica al servidor que el jugador quiere reiniciar el juego.
 
         El servidor reiniciará el estado del jugador y verificará si
-        todos los jugadores están listos para comenzar de nuevo.
+        todos los jugadores están listos para comenzar de nuevo. La
+        predicción se reinicia en el momento.
         """
-        self.send_data({
-            "action": "restart"
-        })
+        self.prediction.input("restart")
+        self.send_inputs()
+
+    def interpolated_positions(self):
+        """
+        Devuelve las posiciones de los jugadores para dibujar en este frame.
+
+        Devuelve:
+            dict: id -> (x, y), interpoladas INTERPOLATION_DELAY segundos
+                  en el pasado (ver interpolation.py)
+        """
+        with self.lock:
+            return self.interpolation.sample()
 
     def get_game_state(self):
         """
-        Obtiene una copia del estado actual del juego de forma thread-safe.
+        Obtiene el estado actual del juego.
 
         Devuelve:
-            dict: Copia del diccionario con el estado del juego
+            Mapping: Estado del juego de solo lectura. No cambia aunque
+                     lleguen estados nuevos, así que se puede leer sin lock.
+        """
+        return self.snapshot.state
 
-        Usamos un lock para evitar leer el estado mientras se está actualizando.
+    def get_snapshot(self):
         """
-        with self.lock:
-            return self.game_state.copy()
+        Obtiene el último estado del juego junto con su versión.
+
+        Devuelve:
+            GameSnapshot: Snapshot inmutable; si la versión es la misma que
+                          la de la última lectura, el estado no cambió
+        """
+        return self.snapshot
 
     def disconnect(self):
         """
         Cierra la conexión con el servidor.
         """
         self.connected = False
+        self.send_queue.close()
         try:
+            # El shutdown cierra la conexión aunque el thread de recepción
+            # todavía tenga abierto el file object del socket
+            self.client.shutdown(socket.SHUT_RDWR)
             self.client.close()
         except:
             pass  # Ignoramos errores al cerrar
+        if self.udp is not None:
+            udp, self.udp = self.udp, None
+            udp.close()
@@ -0,0 +1,190 @@
+"""
+Archivo con la cola de salida por cliente del servidor.
+
+Cada conexión tiene su propia cola acotada que vacía un escritor
+(un thread o una tarea asyncio). Así el tick del servidor nunca se
+bloquea esperando a un socket lento: si la cola de un cliente se llena,
+se descartan los snapshots viejos y se conserva el más nuevo. Si ni
+así hay lugar (la cola está llena de mensajes que no se pueden
+descartar), la cola se cierra y el cliente se desconecta.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class OutboundStats:
+    """
+    Contadores compartidos por todas las colas de salida.
+
+    Atributos:
+        dropped_snapshots: Snapshots descartados por colas llenas
+        slow_disconnects: Clientes desconectados por quedarse atrás
+        lock: Lock para actualizar los contadores desde varios threads
+    """
+
+    def __init__(self):
+        """
+        Inicializa los contadores en cero.
+        """
+        self.dropped_snapshots = 0
+        self.slow_disconnects = 0
+        self.lock = threading.Lock()
+
+    def add_dropped(self, count):
+        """
+        Suma snapshots descartados.
+        """
+        with self.lock:
+            self.dropped_snapshots += count
+
+    def add_slow_disconnect(self):
+        """
+        Cuenta un cliente desconectado por lento.
+        """
+        with self.lock:
+            self.slow_disconnects += 1
+
+
+class OutboundQueue:
+    """
+    Cola de mensajes pendientes de enviar a un cliente.
+
+    Los mensajes "descartables" (snapshots) se pueden reemplazar: cuando
+    la cola está llena, los snapshots encolados se eliminan porque el
+    nuevo ya incluye todos sus cambios. Los demás mensajes (por ejemplo
+    el welcome o los keyframes) nunca se descartan: si ellos solos llenan
+    la cola, el cliente no puede seguir el ritmo y la cola se cierra.
+
+    Atributos:
+        max_size: Cantidad de mensajes a partir de la cual se descarta
+        items: deque con tuplas (bytes, descartable)
+        stats: OutboundStats donde se acumulan los descartes y las
+               desconexiones
+        dropped: Snapshots descartados en esta cola
+        full_since: Momento (time.monotonic) desde el que la cola está
+                    atrasada, o None si el cliente está al día
+        closed: Boolean que indica si la cola se cerró
+        on_put: Función opcional a llamar cuando llega un mensaje
+    """
+
+    def __init__(self, max_size, stats=None, on_put=None):
+        """
+        Inicializa una cola vacía.
+
+        Argumentos:
+            max_size: Cantidad máxima de mensajes antes de descartar
+            stats: OutboundStats compartido (opcional)
+            on_put: Función a llamar al encolar o cerrar (la usa el
+                    escritor asyncio para despertarse)
+        """
+        self.max_size = max_size
+        self.items = deque()
+        self.stats = stats
+        self.dropped = 0
+        self.full_since = None
+        self.closed = False
+        self.on_put = on_put
+        self.condition = threading.Condition()
+
+    def put(self, data, droppable=False):
+        """
+        Encola un mensaje para enviar.
+
+        Argumentos:
+            data: Bytes del mensaje ya serializado
+            droppable: True si el mensaje puede descartarse cuando llegue
+                       uno más nuevo (snapshots)
+
+        Devuelve:
+            bool: True si se encoló, False si la cola está cerrada o se
+                  cerró ahora por desbordarse (hay que desconectar al cliente)
+        """
+        with self.condition:
+            if self.closed:
+                return False
+
+            if len(self.items) >= self.max_size:
+                # El cliente no lee lo suficientemente rápido: quitamos los
+                # snapshots viejos, el nuevo ya contiene sus cambios
+                kept = deque(item for item in self.items if not item[1])
+                dropped = len(self.items) - len(kept)
+                self.items = kept
+                self.dropped += dropped
+                if self.stats is not None and dropped:
+                    self.stats.add_dropped(dropped)
+                if self.full_since is None:
+                    self.full_since = time.monotonic()
+
+            if len(self.items) >= self.max_size:
+                # Solo quedan mensajes que no se pueden descartar
+                self.closed = True
+                self.items.clear()
+                self.condition.notify_all()
+                if self.stats is not None:
+                    self.stats.add_slow_disconnect()
+            else:
+                self.items.append((data, droppable))
+                self.condition.notify()
+
+        if self.on_put is not None:
+            self.on_put()
+        return not self.closed
+
+    def get_batch(self, block=True):
+        """
+        Saca todos los mensajes pendientes.
+
+        Argumentos:
+            block: Si es True espera hasta que haya mensajes
+
+        Devuelve:
+            list o None: Lista de bytes a enviar (vacía si no hay nada y
+                         block es False), o None si la cola se cerró
+        """
+        with self.condition:
+            while block and not self.items and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            batch = [data for data, _droppable in self.items]
+            self.items.clear()
+            return batch
+
+    def mark_sent(self):
+        """
+        Indica que el escritor terminó de enviar un lote.
+
+        Si no llegó nada nuevo mientras tanto, el cliente está al día.
+        """
+        with self.condition:
+            if not self.items:
+                self.full_since = None
+
+    def depth(self):
+        """
+        Devuelve la cantidad de mensajes encolados.
+        """
+        return len(self.items)
+
+    def behind_for(self):
+        """
+        Devuelve cuántos segundos lleva la cola atrasada (0 si está al día).
+        """
+        full_since = self.full_since
+        if full_since is None:
+            return 0
+        return time.monotonic() - full_since
+
+    def close(self):
+        """
+        Cierra la cola y despierta al escritor para que termine.
+        """
+        with self.condition:
+            self.closed = True
+            self.items.clear()
+            self.condition.notify_all()
+
+        if self.on_put is not None:
+            self.on_put()
@@ -2,12 +2,23 @@
 Archivo con la clase Player.
 
 Maneja toda la lógica del jugador: movimiento, disparo de láseres,
-y cooldown entre disparos.
+y cooldown entre disparos. También tiene la clase RemotePlayer, con las
+naves de los demás jugadores.
 """
 
 import pygame
-from os.path import join
 from laser import Laser
+from sprite_pool import SpritePool
+from assets import assets
+from prediction import PLAYER_SPEED
+
+# Diccionario que mapea IDs de jugador a sus imágenes
+PLAYER_IMAGES = {
+    1: 'player.png',
+    2: 'player2.png',
+    3: 'player3.png',
+    4: 'player4.png'
+}
 
 
 class Player(pygame.sprite.Sprite):
@@ -27,10 +38,13 @@ class Player(pygame.sprite.Sprite):
         can_shoot: Boolean que indica si puede disparar
         laser_shoot_time: Timestamp del último disparo
         cooldown_duration: Tiempo de espera entre disparos en milisegundos
+        laser_pool: SpritePool con los láseres eliminados para reutilizar
+        prediction: Prediction que mueve al jugador (o None para moverlo acá)
     """
 
     def __init__(self, groups, screen_width, screen_height, laser_surf,
-                 all_sprites, laser_sprites, laser_sound, player_id=1):
+                 all_sprites, laser_sprites, laser_sound, player_id=1, laser_store=None,
+                 prediction=None):
         """
         Inicializa el jugador con su imagen, posición y configuración.
 
@@ -43,22 +57,19 @@ class Player(pygame.sprite.Sprite):
             laser_sprites: Grupo específico de láseres
             laser_sound: Sonido que se reproduce al disparar
             player_id: ID del jugador (1-4) para seleccionar la imagen correcta
+            laser_store: LaserStore donde agregar los láseres (opcional). Si
+                         no se indica, cada disparo saca un sprite Laser del pool
+            prediction: Prediction de Network (opcional). Si se indica, el
+                        movimiento es una entrada que se envía al servidor y
+                        la posición es la predicha
         """
         super().__init__(groups)
 
-        # Diccionario que mapea IDs de jugador a sus imágenes
-        player_images = {
-            1: 'player.png',
-            2: 'player2.png',
-            3: 'player3.png',
-            4: 'player4.png'
-        }
-
         # Seleccionamos la imagen según el ID del jugador
-        image_name = player_images.get(player_id, 'player.png')
+        image_name = PLAYER_IMAGES.get(player_id, 'player.png')
 
-        # Cargamos la imagen y la convertimos para mejor rendimiento
-        self.og = pygame.image.load(join('images', image_name)).convert_alpha()
+        # Imagen compartida (se carga y convierte una sola vez por archivo)
+        self.og = assets.image('images', image_name)
         self.image = self.og
 
         # Posicionamos al jugador en el centro de la pantalla
@@ -66,13 +77,16 @@ class Player(pygame.sprite.Sprite):
 
         # Vector de dirección (empieza en 0,0 = sin movimiento)
         self.direction = pygame.math.Vector2()
-        self.speed = 300  # Píxeles por segundo
+        self.speed = PLAYER_SPEED  # Píxeles por segundo
+        self.prediction = prediction
 
         # Guardamos referencias para crear láseres
         self.laser_surf = laser_surf
         self.all_sprites = all_sprites
         self.laser_sprites = laser_sprites
         self.laser_sound = laser_sound
+        self.laser_store = laser_store
+        self.laser_pool = SpritePool(Laser)  # Láseres eliminados para reutilizar
 
         # Sistema de cooldown para disparos
         self.can_shoot = True  # Puede disparar al inicio
@@ -111,22 +125,63 @@ class Player(pygame.sprite.Sprite):
         self.direction.x = int(keys[pygame.K_RIGHT] - keys[pygame.K_LEFT])
         self.direction.y = int(keys[pygame.K_DOWN] - keys[pygame.K_UP])
 
-        # Normalizamos el vector para que el movimiento diagonal no sea más rápido
-        # Si el vector es (0,0), lo dejamos así
-        self.direction = self.direction.normalize() if self.direction else self.direction
+        if self.prediction is not None:
+            # El movimiento se aplica en la predicción (igual que en el servidor)
+            self.prediction.move(int(self.direction.x), int(self.direction.y), dt)
+            self.rect.center = self.prediction.position()
+        else:
+            # Normalizamos el vector para que el movimiento diagonal no sea más rápido
+            # Si el vector es (0,0), lo dejamos así
+            self.direction = self.direction.normalize() if self.direction else self.direction
 
-        # Actualizamos la posición multiplicando dirección * velocidad * tiempo
-        self.rect.center += self.direction * self.speed * dt
+            # Actualizamos la posición multiplicando dirección * velocidad * tiempo
+            self.rect.center += self.direction * self.speed * dt
 
         # Procesamos eventos para detectar disparos
         for event in events:
             # Si presionan espacio y pueden disparar
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and self.can_shoot:
                 # Creamos un nuevo láser en la posición superior del jugador
-                Laser([self.all_sprites, self.laser_sprites], self.laser_surf, self.rect.midtop)
+                if self.laser_store is not None:
+                    self.laser_store.spawn(self.rect.midtop)
+                else:
+                    self.laser_pool.acquire([self.all_sprites, self.laser_sprites],
+                                            self.laser_surf, self.rect.midtop)
                 self.can_shoot = False  # Activamos el cooldown
                 self.laser_shoot_time = pygame.time.get_ticks()  # Guardamos el tiempo
                 self.laser_sound.play()  # Reproducimos el sonido
 
         # Actualizamos el timer del cooldown
         self.laser_timer()
+
+
+class RemotePlayer(pygame.sprite.Sprite):
+    """
+    Nave de otro jugador, ubicada con las posiciones que envía el servidor.
+
+    Atributos:
+        image: Imagen de la nave según el ID del jugador
+        rect: Rectángulo centrado en la posición del jugador
+    """
+
+    def __init__(self, groups, player_id, pos):
+        """
+        Crea la nave de otro jugador.
+
+        Argumentos:
+            groups: Grupos de sprites a los que pertenece
+            player_id: ID del jugador (1-4) para seleccionar la imagen
+            pos: Tupla (x, y) con el centro de la nave
+        """
+        super().__init__(groups)
+        self.image = assets.image('images', PLAYER_IMAGES.get(player_id, 'player.png'))
+        self.rect = self.image.get_rect(center=pos)
+
+    def move_to(self, pos):
+        """
+        Mueve la nave a una posición (ya interpolada por Network).
+
+        Argumentos:
+            pos: Tupla (x, y) con el centro de la nave
+        """
+        self.rect.center = (round(pos[0]), round(pos[1]))
@@ -0,0 +1,244 @@
+"""
+Archivo con la predicción del jugador local y su reconciliación con el servidor.
+
+El cliente no espera al servidor para mover su nave ni para descontar una
+vida: aplica cada entrada (movimiento, golpe, meteorito destruido,
+reinicio) en el momento y se la envía al servidor numerada. El servidor
+aplica las mismas entradas con la misma función (apply_input) y le
+responde al cliente con su estado y el número de la última entrada que
+procesó. El cliente vuelve a ese estado y le aplica de nuevo las entradas
+que el servidor todavía no procesó. Si ambos simularon lo mismo no se nota
+nada; si no (por ejemplo, el servidor rechazó algo) la nave se corrige
+sin esperar un ida y vuelta en cada movimiento.
+
+Este módulo lo usan tanto server.py como network.py.
+"""
+
+import math
+import threading
+
+PLAYER_SPEED = 300  # Píxeles por segundo
+KILL_SCORE = 10  # Puntos por meteorito destruido
+START_LIVES = 3
+SPAWN_X, SPAWN_Y = 500, 400  # Centro de la pantalla del cliente (1000x800)
+MAX_INPUT_MS = 100  # Duración máxima de una entrada de movimiento
+INPUT_KINDS = ("move", "hit", "kill", "restart")
+PLAYER_STATE = ("x", "y", "lives", "score", "alive")  # Campos que se predicen
+
+DIAGONAL = math.sqrt(0.5)  # Para que el movimiento diagonal no sea más rápido
+
+
+def new_player_state():
+    """
+    Devuelve el estado inicial de un jugador (al entrar o al reiniciar).
+    """
+    return {"x": SPAWN_X, "y": SPAWN_Y, "lives": START_LIVES, "score": 0, "alive": True}
+
+
+def _clamp(value, low, high):
+    """
+    Limita un entero a [low, high]. Cualquier otro valor cuenta como 0.
+    """
+    if type(value) is not int:
+        return 0
+    return max(low, min(high, value))
+
+
+def apply_input(player, msg):
+    """
+    Aplica una entrada del jugador sobre su estado.
+
+    Argumentos:
+        player: Diccionario con x, y, lives, score y alive (se modifica)
+        msg: Entrada con "kind" y, si es un movimiento, "dx" y "dy"
+             (-1, 0 o 1) y "dt" (milisegundos)
+
+    El cliente y el servidor llaman a esta función con las mismas entradas,
+    así que tienen que llegar al mismo resultado: las posiciones se
+    redondean a enteros después de cada entrada.
+    """
+    kind = msg.get("kind")
+
+    if kind == "move":
+        dx, dy = _clamp(msg.get("dx"), -1, 1), _clamp(msg.get("dy"), -1, 1)
+        distance = PLAYER_SPEED * _clamp(msg.get("dt"), 0, MAX_INPUT_MS) / 1000
+        if dx and dy:
+            distance *= DIAGONAL
+        # La posición viaja como int16 en el protocolo binario
+        player["x"] = max(-32768, min(32767, round(player["x"] + dx * distance)))
+        player["y"] = max(-32768, min(32767, round(player["y"] + dy * distance)))
+
+    elif kind == "hit":
+        if player["lives"] > 0:
+            player["lives"] -= 1
+        if player["lives"] <= 0:
+            player["alive"] = False
+
+    elif kind == "kill":
+        player["score"] += KILL_SCORE
+
+    elif kind == "restart":
+        player.update(new_player_state())
+
+
+class Prediction:
+    """
+    Estado predicho del jugador local.
+
+    Los movimientos de varios frames seguidos en la misma dirección se
+    juntan en una sola entrada (hasta MAX_INPUT_MS), así se envían unas
+    pocas entradas por segundo y no una por frame.
+
+    Atributos:
+        state: Estado predicho (x, y, lives, score, alive) con todas las
+               entradas ya numeradas aplicadas
+        server_state: Último estado confirmado por el servidor
+        seq: Número de la última entrada numerada
+        pending: Entradas que el servidor todavía no confirmó, en orden
+        outbox: Entradas numeradas que todavía no se enviaron
+        move_direction: Dirección (dx, dy) del movimiento en curso
+        move_ms: Milisegundos acumulados del movimiento en curso
+        authoritative: True si el servidor confirma las entradas; si no,
+                       no se guardan las pendientes (no hay con qué reconciliar)
+        corrections: Veces que el estado del servidor no coincidió con la predicción
+        lock: Lock (la reconciliación llega desde el thread de red)
+    """
+
+    def __init__(self):
+        """
+        Crea la predicción con el estado inicial de un jugador.
+        """
+        self.state = new_player_state()
+        self.server_state = None
+        self.seq = 0
+        self.pending = []
+        self.outbox = []
+        self.move_direction = (0, 0)
+        self.move_ms = 0.0
+        self.authoritative = False
+        self.corrections = 0
+        self.lock = threading.Lock()
+
+    def _commit(self, msg):
+        """
+        Numera una entrada, la aplica al estado predicho y la deja para enviar.
+
+        Debe llamarse con el lock tomado.
+        """
+        self.seq += 1
+        msg = {"action": "input", "seq": self.seq, **msg}
+        apply_input(self.state, msg)
+        if self.authoritative:
+            self.pending.append(msg)
+        self.outbox.append(msg)
+
+    def _commit_move(self):
+        """
+        Cierra el movimiento en curso como una entrada (si movió algo).
+
+        Debe llamarse con el lock tomado.
+        """
+        dt = round(self.move_ms)
+        if self.move_direction != (0, 0) and dt > 0:
+            dx, dy = self.move_direction
+            self._commit({"kind": "move", "dx": dx, "dy": dy, "dt": dt})
+        self.move_ms = 0.0
+
+    def move(self, dx, dy, dt):
+        """
+        Registra el movimiento de un frame.
+
+        Argumentos:
+            dx, dy: Dirección (-1, 0 o 1 en cada eje)
+            dt: Duración del frame en segundos
+        """
+        with self.lock:
+            if (dx, dy) != self.move_direction:
+                self._commit_move()
+                self.move_direction = (dx, dy)
+            self.move_ms += dt * 1000
+            while self.move_ms >= MAX_INPUT_MS:
+                # Entrada completa: la numeramos y seguimos acumulando el resto
+                rest = self.move_ms - MAX_INPUT_MS
+                self.move_ms = MAX_INPUT_MS
+                self._commit_move()
+                self.move_ms = rest
+
+    def input(self, kind):
+        """
+        Registra una entrada que no es movimiento ("hit", "kill" o "restart").
+
+        Argumentos:
+            kind: Tipo de entrada
+        """
+        with self.lock:
+            self._commit_move()  # El movimiento anterior va primero
+            self._commit({"kind": kind})
+
+    def flush(self):
+        """
+        Cierra el movimiento en curso y devuelve las entradas a enviar.
+
+        Devuelve:
+            list: Entradas numeradas, en orden
+        """
+        with self.lock:
+            self._commit_move()
+            outbox, self.outbox = self.outbox, []
+            return outbox
+
+    def position(self):
+        """
+        Devuelve la posición predicha, incluido el movimiento todavía no cerrado.
+
+        Devuelve:
+            tuple: (x, y) enteros
+        """
+        with self.lock:
+            player = {"x": self.state["x"], "y": self.state["y"]}
+            dx, dy = self.move_direction
+            apply_input(player, {"kind": "move", "dx": dx, "dy": dy, "dt": round(self.move_ms)})
+            return player["x"], player["y"]
+
+    def stats(self):
+        """
+        Devuelve las vidas y el puntaje predichos.
+
+        Devuelve:
+            tuple: (vidas, puntaje)
+        """
+        with self.lock:
+            return self.state["lives"], self.state["score"]
+
+    def sync(self, player):
+        """
+        Toma el estado del servidor mientras todavía no se envió ninguna entrada
+        (por ejemplo, la posición inicial que asignó al entrar).
+
+        Argumentos:
+            player: Datos del jugador local en el snapshot del servidor
+        """
+        with self.lock:
+            if self.seq == 0 and all(name in player for name in PLAYER_STATE):
+                self.state = {name: player[name] for name in PLAYER_STATE}
+
+    def reconcile(self, seq, player):
+        """
+        Aplica el estado confirmado por el servidor y repite las entradas pendientes.
+
+        Argumentos:
+            seq: Número de la última entrada que procesó el servidor
+            player: Estado del jugador según el servidor (x, y, lives, score, alive)
+        """
+        with self.lock:
+            if self.server_state is not None and seq < self.server_state["seq"]:
+                return  # Confirmación vieja
+            self.server_state = {"seq": seq, **{name: player[name] for name in PLAYER_STATE}}
+            self.pending = [msg for msg in self.pending if msg["seq"] > seq]
+
+            state = {name: player[name] for name in PLAYER_STATE}
+            for msg in self.pending:
+                apply_input(state, msg)
+            if state != self.state:
+                self.corrections += 1
+            self.state = state
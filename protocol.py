@@ -0,0 +1,556 @@
+"""
+Archivo con el protocolo binario compacto entre cliente y servidor.
+
+Los mensajes más frecuentes (posición, golpe, puntaje, ack, entradas
+numeradas del jugador, su confirmación y snapshots) se empaquetan con struct en tramas de tamaño fijo en lugar de JSON.
+El resto de los mensajes (join, restart, welcome...) siguen viajando
+como líneas JSON, que además son el formato de respaldo para clientes
+viejos. Ambos formatos pueden mezclarse en el mismo stream: las tramas
+binarias empiezan con un byte mágico que nunca inicia una línea JSON.
+
+Formato de cada trama binaria:
+    magic (1 byte) | tipo (1 byte) | largo del payload (2 bytes) | payload
+
+Además define los datagramas del canal UDP opcional, que lleva solo
+posiciones (no confiables y numeradas) mientras los eventos importantes
+siguen por TCP:
+    magic (1 byte) | tipo (1 byte) | token (4 bytes) | seq (4 bytes) | datos
+"""
+
+import asyncio
+import json
+import struct
+from prediction import INPUT_KINDS
+from snapshot import DELETED_KEY
+
+# Versión del protocolo binario y nombre usado en el handshake join/welcome
+PROTOCOL_VERSION = 1
+BINARY_PROTOCOL = f"bin{PROTOCOL_VERSION}"
+JSON_PROTOCOL = "json"
+
+# Byte mágico de las tramas (0xF0 | versión); una línea JSON empieza con "{"
+FRAME_MAGIC = 0xF0 | PROTOCOL_VERSION
+
+# Tipos de mensaje
+MSG_POSITION = 1
+MSG_HIT = 2
+MSG_SCORE = 3
+MSG_ACK = 4
+MSG_SNAPSHOT = 5
+MSG_INPUT = 6  # Entrada numerada del jugador (ver prediction.py)
+MSG_INPUT_ACK = 7  # Última entrada procesada y estado del jugador según el servidor
+
+# Estructuras fijas (big endian, sin padding)
+FRAME_HEADER = struct.Struct("!BBH")
+FRAME_TAIL = struct.Struct("!BH")  # Encabezado sin el byte mágico
+POSITION = struct.Struct("!hh")
+SCORE = struct.Struct("!i")
+ACK = struct.Struct("!I")
+SNAPSHOT_HEADER = struct.Struct("!BIIB")  # flags, seq, base, máscara de campos
+PLAYER_HEADER = struct.Struct("!BB")  # id, máscara de campos
+BLOB_LEN = struct.Struct("!H")
+INPUT = struct.Struct("!IBbbH")  # seq, tipo, dx, dy, dt (ms)
+INPUT_ACK = struct.Struct("!Ihhbi?")  # seq, x, y, vidas, puntaje, vivo
+INPUT_FIELDS = frozenset(("action", "seq", "kind", "dx", "dy", "dt"))
+INPUT_ACK_FIELDS = frozenset(("type", "seq", "x", "y", "lives", "score", "alive"))
+
+# Flags y bits de la máscara de campos del snapshot
+SNAPSHOT_DELTA = 0x01
+FIELD_STATUS = 0x01
+FIELD_NUM_PLAYERS = 0x02
+FIELD_PLAYERS = 0x04
+FIELD_EXTRA = 0x80
+
+# Estados del juego codificados como un byte
+STATUSES = ("waiting", "ready", "running", "finished")
+
+# Campos de jugador con formato fijo: (nombre, bit, struct, mínimo, máximo).
+# Un mínimo None indica un campo booleano.
+PLAYER_FIELDS = (
+    ("x", 0x01, struct.Struct("!h"), -32768, 32767),
+    ("y", 0x02, struct.Struct("!h"), -32768, 32767),
+    ("lives", 0x04, struct.Struct("!b"), -128, 127),
+    ("score", 0x08, struct.Struct("!i"), -2 ** 31, 2 ** 31 - 1),
+    ("alive", 0x10, struct.Struct("!?"), None, None),
+    ("id", 0x20, struct.Struct("!B"), 0, 255),
+)
+PLAYER_FIXED_NAMES = frozenset(field[0] for field in PLAYER_FIELDS) | {"username"}
+PLAYER_USERNAME = 0x40
+PLAYER_EXTRA = 0x80
+
+
+# Tipos de datagrama UDP
+UDP_HELLO = 1  # Cliente -> servidor: registra la dirección UDP del cliente
+UDP_POSITION = 2  # Cliente -> servidor: posición del jugador
+UDP_POSITIONS = 3  # Servidor -> cliente: posiciones de todos los jugadores
+
+UDP_HEADER = struct.Struct("!BBII")  # magic, tipo, token, seq
+UDP_PLAYER = struct.Struct("!Bhh")  # id, x, y
+UDP_MAX_SIZE = 1200  # Tamaño máximo de datagrama (evita fragmentación)
+
+
+def encode_json(message):
+    """
+    Codifica un mensaje como línea JSON (formato de respaldo).
+
+    Argumentos:
+        message: Diccionario con el mensaje
+
+    Devuelve:
+        bytes: JSON en UTF-8 terminado en salto de línea
+    """
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+def _frame(msg_type, payload=b""):
+    """
+    Arma una trama binaria con su encabezado.
+    """
+    return FRAME_HEADER.pack(FRAME_MAGIC, msg_type, len(payload)) + payload
+
+
+def _blob(value):
+    """
+    Serializa un valor arbitrario como JSON precedido por su largo.
+    """
+    data = json.dumps(value).encode("utf-8")
+    return BLOB_LEN.pack(len(data)) + data
+
+
+def _fits(value, low, high):
+    """
+    Indica si un valor se puede empaquetar en un campo entero [low, high].
+    Si low es None el campo es booleano.
+    """
+    if low is None:
+        return type(value) is bool
+    return type(value) is int and low <= value <= high
+
+
+def encode_action(message):
+    """
+    Codifica una acción del cliente en binario si tiene formato fijo.
+
+    Argumentos:
+        message: Diccionario con la acción (como las que envía Network)
+
+    Devuelve:
+        bytes o None: Trama binaria, o None si la acción no tiene formato
+                      binario (por ejemplo join o restart) o sus valores
+                      no entran en el formato fijo.
+    """
+    action = message.get("action")
+
+    if action == "update_position":
+        x, y = message.get("x"), message.get("y")
+        if _fits(x, -32768, 32767) and _fits(y, -32768, 32767) and len(message) == 3:
+            return _frame(MSG_POSITION, POSITION.pack(x, y))
+    elif action == "hit" and len(message) == 1:
+        return _frame(MSG_HIT)
+    elif action == "update_score" and len(message) == 2:
+        score = message.get("score")
+        if _fits(score, -2 ** 31, 2 ** 31 - 1):
+            return _frame(MSG_SCORE, SCORE.pack(score))
+    elif action == "ack" and len(message) == 2:
+        seq = message.get("seq")
+        if _fits(seq, 0, 2 ** 32 - 1):
+            return _frame(MSG_ACK, ACK.pack(seq))
+    elif action == "input" and INPUT_FIELDS.issuperset(message):
+        seq, kind = message.get("seq"), message.get("kind")
+        dx, dy, dt = message.get("dx", 0), message.get("dy", 0), message.get("dt", 0)
+        if (_fits(seq, 0, 2 ** 32 - 1) and kind in INPUT_KINDS and _fits(dx, -1, 1)
+                and _fits(dy, -1, 1) and _fits(dt, 0, 65535)):
+            return _frame(MSG_INPUT, INPUT.pack(seq, INPUT_KINDS.index(kind), dx, dy, dt))
+
+    return None
+
+
+def encode_input_ack(message):
+    """
+    Codifica en binario la confirmación de entradas que el servidor envía
+    a un cliente.
+
+    Argumentos:
+        message: Diccionario con type "input_ack", seq, x, y, lives, score y alive
+
+    Devuelve:
+        bytes o None: Trama binaria, o None si algún valor no entra en el
+                      formato fijo
+    """
+    if set(message) != INPUT_ACK_FIELDS:
+        return None
+    values = [message[name] for name in ("seq", "x", "y", "lives", "score", "alive")]
+    limits = [(0, 2 ** 32 - 1), (-32768, 32767), (-32768, 32767), (-128, 127),
+              (-2 ** 31, 2 ** 31 - 1), (None, None)]
+    if not all(_fits(value, low, high) for value, (low, high) in zip(values, limits)):
+        return None
+    return _frame(MSG_INPUT_ACK, INPUT_ACK.pack(*values))
+
+
+def _encode_player(player_id, pdata):
+    """
+    Codifica los campos de un jugador (completo o solo los que cambiaron).
+    """
+    mask = 0
+    body = []
+    extra = {}
+
+    for name, bit, field_struct, low, high in PLAYER_FIELDS:
+        if name not in pdata:
+            continue
+        value = pdata[name]
+        if _fits(value, low, high):
+            mask |= bit
+            body.append(field_struct.pack(value))
+        else:
+            # Valores fuera de formato (por ejemplo None) viajan como JSON
+            extra[name] = value
+
+    if "username" in pdata:
+        username = str(pdata["username"]).encode("utf-8")[:255]
+        mask |= PLAYER_USERNAME
+        body.append(bytes((len(username),)) + username)
+
+    # Campos que no forman parte del formato fijo
+    if len(pdata) > len(PLAYER_FIXED_NAMES) or not PLAYER_FIXED_NAMES.issuperset(pdata):
+        for name, value in pdata.items():
+            if name not in PLAYER_FIXED_NAMES:
+                extra[name] = value
+
+    if extra:
+        mask |= PLAYER_EXTRA
+        body.append(_blob(extra))
+
+    return PLAYER_HEADER.pack(player_id, mask) + b"".join(body)
+
+
+def _is_player_key(player_id):
+    """
+    Indica si una clave de jugador entra en un byte.
+    """
+    return str(player_id).isdigit() and int(player_id) <= 255
+
+
+def _packable_players(players):
+    """
+    Indica si el diccionario de jugadores tiene formato fijo.
+    """
+    if not isinstance(players, dict) or len(players) > 255:
+        return False
+    for player_id, pdata in players.items():
+        if player_id == DELETED_KEY:
+            if not all(_is_player_key(pid) for pid in pdata):
+                return False
+        elif not _is_player_key(player_id) or not isinstance(pdata, dict):
+            return False
+    return True
+
+
+def encode_snapshot(message):
+    """
+    Codifica un snapshot ("state" o "delta") del servidor en binario.
+
+    Argumentos:
+        message: Diccionario con type, seq, y state o base/delta
+
+    Devuelve:
+        bytes: Trama binaria. Si el snapshot tiene datos que no entran en
+               el formato fijo se agregan como un bloque JSON al final.
+    """
+    is_delta = message["type"] == "delta"
+    state = message["delta"] if is_delta else message["state"]
+    flags = SNAPSHOT_DELTA if is_delta else 0
+
+    mask = 0
+    body = []
+    extra = {}
+
+    for key, value in state.items():
+        if key == "status" and value in STATUSES:
+            mask |= FIELD_STATUS
+        elif key == "num_players" and isinstance(value, int) and 0 <= value <= 255:
+            mask |= FIELD_NUM_PLAYERS
+        elif key == "players" and _packable_players(value):
+            mask |= FIELD_PLAYERS
+        else:
+            extra[key] = value
+
+    if mask & FIELD_STATUS:
+        body.append(bytes((STATUSES.index(state["status"]),)))
+    if mask & FIELD_NUM_PLAYERS:
+        body.append(bytes((state["num_players"],)))
+    if mask & FIELD_PLAYERS:
+        players = state["players"]
+        changed = [(pid, pdata) for pid, pdata in players.items() if pid != DELETED_KEY]
+        removed = players.get(DELETED_KEY, [])
+        body.append(bytes((len(changed), len(removed))))
+        body.append(bytes(int(pid) for pid in removed))
+        for pid, pdata in changed:
+            body.append(_encode_player(int(pid), pdata))
+    if extra:
+        mask |= FIELD_EXTRA
+        body.append(_blob(extra))
+
+    header = SNAPSHOT_HEADER.pack(flags, message["seq"], message.get("base") or 0, mask)
+    return _frame(MSG_SNAPSHOT, header + b"".join(body))
+
+
+def encode_message(message, protocol):
+    """
+    Codifica un mensaje según el protocolo negociado.
+
+    Argumentos:
+        message: Diccionario con el mensaje (acción del cliente o
+                 snapshot del servidor)
+        protocol: BINARY_PROTOCOL o JSON_PROTOCOL
+
+    Devuelve:
+        bytes: Trama binaria si el protocolo es binario y el mensaje tiene
+               formato fijo; línea JSON en cualquier otro caso.
+    """
+    if protocol == BINARY_PROTOCOL:
+        if message.get("type") in ("state", "delta"):
+            try:
+                return encode_snapshot(message)
+            except struct.error:
+                # El snapshot no entra en una trama (más de 64 KB): va como JSON
+                return encode_json(message)
+        if message.get("type") == "input_ack":
+            frame = encode_input_ack(message)
+        else:
+            frame = encode_action(message)
+        if frame is not None:
+            return frame
+    return encode_json(message)
+
+
+def _read_blob(payload, offset):
+    """
+    Lee un bloque JSON con largo desde el payload.
+    """
+    (length,) = BLOB_LEN.unpack_from(payload, offset)
+    offset += BLOB_LEN.size
+    return json.loads(payload[offset:offset + length]), offset + length
+
+
+def decode_snapshot(payload):
+    """
+    Decodifica el payload de un snapshot binario.
+
+    Devuelve:
+        dict: Mensaje con la misma forma que el snapshot JSON equivalente
+    """
+    flags, seq, base, mask = SNAPSHOT_HEADER.unpack_from(payload)
+    offset = SNAPSHOT_HEADER.size
+    state = {}
+
+    if mask & FIELD_STATUS:
+        state["status"] = STATUSES[payload[offset]]
+        offset += 1
+    if mask & FIELD_NUM_PLAYERS:
+        state["num_players"] = payload[offset]
+        offset += 1
+    if mask & FIELD_PLAYERS:
+        num_changed, num_removed = payload[offset], payload[offset + 1]
+        offset += 2
+        players = {}
+        if num_removed:
+            players[DELETED_KEY] = [str(pid) for pid in payload[offset:offset + num_removed]]
+            offset += num_removed
+        for _ in range(num_changed):
+            player_id, player_mask = PLAYER_HEADER.unpack_from(payload, offset)
+            offset += PLAYER_HEADER.size
+            pdata = {}
+            for name, bit, field_struct, _low, _high in PLAYER_FIELDS:
+                if player_mask & bit:
+                    (pdata[name],) = field_struct.unpack_from(payload, offset)
+                    offset += field_struct.size
+            if player_mask & PLAYER_USERNAME:
+                length = payload[offset]
+                pdata["username"] = payload[offset + 1:offset + 1 + length].decode("utf-8")
+                offset += 1 + length
+            if player_mask & PLAYER_EXTRA:
+                extra, offset = _read_blob(payload, offset)
+                pdata.update(extra)
+            players[str(player_id)] = pdata
+        state["players"] = players
+    if mask & FIELD_EXTRA:
+        extra, offset = _read_blob(payload, offset)
+        state.update(extra)
+
+    if flags & SNAPSHOT_DELTA:
+        return {"type": "delta", "seq": seq, "base": base, "delta": state}
+    return {"type": "state", "seq": seq, "state": state}
+
+
+def decode_frame(msg_type, payload):
+    """
+    Convierte una trama binaria al diccionario equivalente en JSON.
+
+    Argumentos:
+        msg_type: Tipo de mensaje del encabezado
+        payload: Bytes del payload
+
+    Devuelve:
+        dict: Mensaje decodificado
+
+    Lanza ValueError si el tipo de mensaje es desconocido.
+    """
+    if msg_type == MSG_POSITION:
+        x, y = POSITION.unpack(payload)
+        return {"action": "update_position", "x": x, "y": y}
+    if msg_type == MSG_HIT:
+        return {"action": "hit"}
+    if msg_type == MSG_SCORE:
+        (score,) = SCORE.unpack(payload)
+        return {"action": "update_score", "score": score}
+    if msg_type == MSG_ACK:
+        (seq,) = ACK.unpack(payload)
+        return {"action": "ack", "seq": seq}
+    if msg_type == MSG_SNAPSHOT:
+        return decode_snapshot(payload)
+    if msg_type == MSG_INPUT:
+        seq, kind, dx, dy, dt = INPUT.unpack(payload)
+        if kind >= len(INPUT_KINDS):
+            raise ValueError(f"Tipo de entrada desconocido: {kind}")
+        return {"action": "input", "seq": seq, "kind": INPUT_KINDS[kind],
+                "dx": dx, "dy": dy, "dt": dt}
+    if msg_type == MSG_INPUT_ACK:
+        seq, x, y, lives, score, alive = INPUT_ACK.unpack(payload)
+        return {"type": "input_ack", "seq": seq, "x": x, "y": y,
+                "lives": lives, "score": score, "alive": alive}
+    raise ValueError(f"Tipo de mensaje desconocido: {msg_type}")
+
+
+def read_message(file):
+    """
+    Lee el siguiente mensaje (binario o JSON) de un stream.
+
+    Argumentos:
+        file: File object binario del socket (makefile("rb"))
+
+    Devuelve:
+        dict o None: Mensaje decodificado, o None si se cerró la conexión
+
+    Lanza ValueError (o json.JSONDecodeError) si el mensaje está mal formado.
+    """
+    first = file.read(1)
+    if not first:
+        return None
+
+    if first[0] == FRAME_MAGIC:
+        header = file.read(FRAME_TAIL.size)
+        if len(header) < FRAME_TAIL.size:
+            return None
+        msg_type, length = FRAME_TAIL.unpack(header)
+        payload = file.read(length)
+        if len(payload) < length:
+            return None
+        return decode_frame(msg_type, payload)
+
+    # Línea JSON: leemos el resto de la línea
+    return _decode_line(first + file.readline())
+
+
+async def read_message_async(reader):
+    """
+    Versión asyncio de read_message.
+
+    Argumentos:
+        reader: asyncio.StreamReader de la conexión
+
+    Devuelve:
+        dict o None: Mensaje decodificado, o None si se cerró la conexión
+    """
+    try:
+        first = await reader.readexactly(1)
+        if first[0] == FRAME_MAGIC:
+            msg_type, length = FRAME_TAIL.unpack(await reader.readexactly(FRAME_TAIL.size))
+            return decode_frame(msg_type, await reader.readexactly(length))
+    except asyncio.IncompleteReadError:
+        return None
+
+    return _decode_line(first + await reader.readline())
+
+
+def _decode_line(line):
+    """
+    Decodifica una línea JSON completa.
+    """
+    if not line.strip():
+        raise ValueError("Línea vacía")
+    return json.loads(line)
+
+
+def encode_udp_hello(token):
+    """
+    Codifica el datagrama con el que el cliente registra su dirección UDP.
+
+    Argumentos:
+        token: Token de sesión recibido en el welcome
+    """
+    return UDP_HEADER.pack(FRAME_MAGIC, UDP_HELLO, token, 0)
+
+
+def encode_udp_position(token, seq, x, y):
+    """
+    Codifica un datagrama con la posición del jugador.
+
+    Argumentos:
+        token: Token de sesión recibido en el welcome
+        seq: Número de secuencia del datagrama (creciente)
+        x, y: Posición del jugador
+
+    Devuelve:
+        bytes o None: Datagrama, o None si la posición no entra en int16
+    """
+    if not (_fits(x, -32768, 32767) and _fits(y, -32768, 32767)):
+        return None
+    return UDP_HEADER.pack(FRAME_MAGIC, UDP_POSITION, token, seq) + POSITION.pack(x, y)
+
+
+def encode_udp_positions(seq, positions):
+    """
+    Codifica un datagrama con las posiciones de los jugadores.
+
+    Argumentos:
+        seq: Número de secuencia del snapshot de posiciones
+        positions: Lista de tuplas (id, x, y)
+
+    Devuelve:
+        bytes: Datagrama. Los jugadores que no entran en el formato fijo
+               o en el tamaño máximo se omiten.
+    """
+    body = [UDP_PLAYER.pack(pid, x, y) for pid, x, y in positions
+            if _fits(pid, 0, 255) and _fits(x, -32768, 32767) and _fits(y, -32768, 32767)]
+    max_players = (UDP_MAX_SIZE - UDP_HEADER.size) // UDP_PLAYER.size
+    return UDP_HEADER.pack(FRAME_MAGIC, UDP_POSITIONS, 0, seq) + b"".join(body[:max_players])
+
+
+def decode_datagram(data):
+    """
+    Decodifica un datagrama UDP.
+
+    Argumentos:
+        data: Bytes recibidos
+
+    Devuelve:
+        dict: Con "type" ("hello", "position" o "positions"), "token",
+              "seq" y los datos según el tipo
+
+    Lanza ValueError si el datagrama no es válido.
+    """
+    if len(data) < UDP_HEADER.size or data[0] != FRAME_MAGIC:
+        raise ValueError("Datagrama inválido")
+    _magic, msg_type, token, seq = UDP_HEADER.unpack_from(data)
+    payload = data[UDP_HEADER.size:]
+
+    if msg_type == UDP_HELLO:
+        return {"type": "hello", "token": token, "seq": seq}
+    if msg_type == UDP_POSITION and len(payload) == POSITION.size:
+        x, y = POSITION.unpack(payload)
+        return {"type": "position", "token": token, "seq": seq, "x": x, "y": y}
+    if msg_type == UDP_POSITIONS and len(payload) % UDP_PLAYER.size == 0:
+        positions = {str(pid): (x, y) for pid, x, y in UDP_PLAYER.iter_unpack(payload)}
+        return {"type": "positions", "token": token, "seq": seq, "positions": positions}
+    raise ValueError("Datagrama inválido")
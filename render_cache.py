@@ -0,0 +1,234 @@
+"""
+Archivo con la caché de superficies de la interfaz.
+
+El fondo con gradiente se dibujaba línea por línea (una llamada por fila
+de la pantalla) y cada panel creaba dos superficies con transparencia
+nuevas, todo en cada frame. Acá cada gradiente y cada panel se dibuja una
+sola vez en una superficie, se guarda según sus parámetros (tamaño,
+colores, transparencia, radio) y los frames siguientes solo hacen un blit.
+
+La caché tiene un límite de memoria: si se supera, se descartan las
+superficies usadas hace más tiempo. Si cambia el tamaño de la pantalla
+se vacía entera.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+MAX_CACHE_BYTES = 16 * 1024 * 1024  # Memoria máxima de la caché (16 MB)
+PANEL_RADIUS = 20  # Radio de las esquinas de los paneles
+PANEL_SHADOW = 4  # Píxeles de sombra alrededor de cada panel
+PANEL_BORDER_COLOR = (100, 120, 180)
+
+
+class RenderCache:
+    """
+    Caché LRU de superficies con límite de memoria.
+
+    Atributos:
+        max_bytes: Memoria máxima de todas las superficies guardadas
+        surfaces: OrderedDict clave -> superficie, de la menos a la más usada
+        size_bytes: Memoria que ocupan las superficies guardadas
+        screen_size: Tamaño de la pantalla con el que se generaron
+        hits: Veces que se reutilizó una superficie
+        misses: Veces que hubo que dibujar una superficie nueva
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        """
+        Crea una caché vacía.
+
+        Argumentos:
+            max_bytes: Memoria máxima de todas las superficies guardadas
+        """
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.size_bytes = 0
+        self.screen_size = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """
+        Devuelve la superficie de una clave, dibujándola si no está guardada.
+
+        Argumentos:
+            key: Tupla con todo lo que define la superficie
+            build: Función sin argumentos que dibuja la superficie
+
+        Devuelve:
+            pygame.Surface: Superficie guardada (no se debe modificar)
+        """
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = build()
+        self.surfaces[key] = surf
+        self.size_bytes += _surface_bytes(surf)
+
+        # Descartamos las menos usadas hasta entrar en el límite
+        while self.size_bytes > self.max_bytes and len(self.surfaces) > 1:
+            old_key, old_surf = self.surfaces.popitem(last=False)
+            self.size_bytes -= _surface_bytes(old_surf)
+        return surf
+
+    def check_screen(self, screen):
+        """
+        Vacía la caché si cambió el tamaño de la pantalla.
+
+        Argumentos:
+            screen: Superficie de la pantalla
+        """
+        size = screen.get_size()
+        if size != self.screen_size:
+            self.clear()
+            self.screen_size = size
+
+    def clear(self):
+        """
+        Descarta todas las superficies guardadas.
+        """
+        self.surfaces.clear()
+        self.size_bytes = 0
+
+
+def _surface_bytes(surf):
+    """
+    Devuelve la memoria aproximada que ocupa una superficie.
+    """
+    width, height = surf.get_size()
+    return width * height * surf.get_bytesize()
+
+
+def build_gradient(size, color1, color2):
+    """
+    Dibuja un gradiente vertical en una superficie nueva.
+
+    Argumentos:
+        size: Tupla (ancho, alto)
+        color1: Color RGB superior del gradiente
+        color2: Color RGB inferior del gradiente
+
+    Devuelve:
+        pygame.Surface: Superficie opaca con el gradiente
+    """
+    width, height = size
+    surf = pygame.Surface(size)
+    for y in range(height):
+        # Calculamos cuánto se mezcla el color inicial con el final (de 0 a 1)
+        ratio = y / height
+        # Combinación de cada componente RGB
+        r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
+        g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
+        b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
+        # Dibujamos una línea horizontal con el color combinado
+        pygame.draw.line(surf, (r, g, b), (0, y), (width, y))
+    return surf.convert() if pygame.display.get_surface() else surf
+
+
+def build_panel(size, color, alpha, radius=PANEL_RADIUS):
+    """
+    Dibuja un panel con sombra, transparencia y borde en una superficie nueva.
+
+    Argumentos:
+        size: Tupla (ancho, alto) del panel, sin la sombra
+        color: Color RGB del panel
+        alpha: Nivel de transparencia (0-255)
+        radius: Radio de las esquinas
+
+    Devuelve:
+        pygame.Surface: Superficie con transparencia premultiplicada (se
+                        dibuja con BLEND_PREMULTIPLIED), PANEL_SHADOW
+                        píxeles más grande que el panel en cada dirección
+
+    La sombra y el panel se combinan con alfa premultiplicado: así el
+    resultado es el mismo que dibujar primero la sombra y después el
+    panel sobre la pantalla.
+    """
+    width, height = size
+    surf = pygame.Surface((width + 2 * PANEL_SHADOW, height + 2 * PANEL_SHADOW), pygame.SRCALPHA)
+
+    # Sombra
+    pygame.draw.rect(surf, (0, 0, 0, 60), surf.get_rect(), border_radius=radius)
+
+    # Panel principal con transparencia
+    panel_surf = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(panel_surf, (*color, alpha), panel_surf.get_rect(), border_radius=radius)
+    surf.blit(panel_surf.premul_alpha(), (PANEL_SHADOW, PANEL_SHADOW),
+              special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    # Borde brillante (opaco, igual que cuando se dibujaba directo en la pantalla)
+    border_rect = pygame.Rect(PANEL_SHADOW, PANEL_SHADOW, width, height)
+    pygame.draw.rect(surf, PANEL_BORDER_COLOR, border_rect, 2, border_radius=radius)
+    return surf.convert_alpha() if pygame.display.get_surface() else surf
+
+
+# Caché compartida por todas las pantallas del cliente y del panel del servidor
+cache = RenderCache()
+
+
+def draw_gradient_background(screen, color1, color2):
+    """
+    Dibuja un fondo con gradiente vertical.
+
+    Argumentos:
+        screen: Superficie de pygame donde dibujar
+        color1: Color RGB superior del gradiente
+        color2: Color RGB inferior del gradiente
+
+    El gradiente se dibuja una sola vez por tamaño y colores; los frames
+    siguientes lo copian con un blit.
+    """
+    cache.check_screen(screen)
+    size = screen.get_size()
+    surf = cache.get(("gradient", size, tuple(color1), tuple(color2)),
+                     lambda: build_gradient(size, color1, color2))
+    screen.blit(surf, (0, 0))
+
+
+def draw_panel(screen, rect, color=(30, 35, 55), alpha=220, radius=PANEL_RADIUS):
+    """
+    Dibuja un panel decorativo con sombra y transparencia.
+
+    Argumentos:
+        screen: Superficie donde dibujar
+        rect: Rectángulo que define posición y tamaño
+        color: Color RGB del panel
+        alpha: Nivel de transparencia (0-255)
+        radius: Radio de las esquinas
+
+    Crea paneles con efecto moderno para la interfaz. Cada combinación de
+    tamaño, color, transparencia y radio se dibuja una sola vez.
+    """
+    cache.check_screen(screen)
+    rect = pygame.Rect(rect)
+    surf = cache.get(("panel", rect.size, tuple(color), alpha, radius),
+                     lambda: build_panel(rect.size, color, alpha, radius))
+    screen.blit(surf, (rect.x - PANEL_SHADOW, rect.y - PANEL_SHADOW),
+                special_flags=pygame.BLEND_PREMULTIPLIED)
+
+
+def draw_translucent_rect(screen, rect, color, radius=0):
+    """
+    Dibuja un rectángulo con transparencia y esquinas redondeadas.
+
+    Argumentos:
+        screen: Superficie donde dibujar
+        rect: Rectángulo que define posición y tamaño
+        color: Color RGBA (el cuarto valor es la transparencia)
+        radius: Radio de las esquinas
+    """
+    cache.check_screen(screen)
+    rect = pygame.Rect(rect)
+
+    def build():
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(surf, color, surf.get_rect(), border_radius=radius)
+        return surf.convert_alpha() if pygame.display.get_surface() else surf
+
+    screen.blit(cache.get(("rect", rect.size, tuple(color), radius), build), rect)
@@ -0,0 +1,65 @@
+"""
+Archivo con la caché de rotaciones de una imagen.
+
+Rotar una imagen con rotozoom es un remuestreo completo. En lugar de
+hacerlo por cada meteorito en cada frame, se generan una sola vez las
+rotaciones a intervalos fijos de ángulo (con sus máscaras de colisión)
+y todos los meteoritos las comparten: rotar pasa a ser una búsqueda.
+"""
+
+import math
+import pygame
+
+ROTATION_STEP = 3  # Grados entre rotaciones guardadas
+MAX_CACHE_BYTES = 16 * 1024 * 1024  # Memoria máxima de la caché (16 MB)
+
+
+class RotationCache:
+    """
+    Rotaciones precalculadas de una imagen, con sus máscaras.
+
+    Atributos:
+        step: Grados entre rotaciones guardadas. Puede ser mayor al
+              pedido si con ese paso no se respeta el límite de memoria.
+        frames: Lista de tuplas (imagen rotada, máscara), una por ángulo
+        size_bytes: Memoria aproximada que ocupan las imágenes y máscaras
+    """
+
+    def __init__(self, surf, step=ROTATION_STEP, max_bytes=MAX_CACHE_BYTES):
+        """
+        Genera todas las rotaciones de la imagen.
+
+        Argumentos:
+            surf: Superficie original (sin rotar)
+            step: Grados entre rotaciones guardadas
+            max_bytes: Memoria máxima para todas las rotaciones
+        """
+        # Tamaño máximo de una rotación: un cuadrado del largo de la diagonal
+        diagonal = math.ceil(math.hypot(*surf.get_size()))
+        frame_bytes = diagonal * diagonal * (surf.get_bytesize() + 1 / 8)
+
+        # Si no entran todas las rotaciones pedidas, guardamos menos
+        max_frames = max(1, int(max_bytes // frame_bytes))
+        count = min(max(1, round(360 / step)), max_frames)
+        self.step = 360 / count
+
+        self.frames = []
+        self.size_bytes = 0
+        for index in range(count):
+            image = pygame.transform.rotozoom(surf, index * self.step, 1)
+            mask = pygame.mask.from_surface(image)
+            self.frames.append((image, mask))
+            width, height = image.get_size()
+            self.size_bytes += width * height * image.get_bytesize() + width * height // 8
+
+    def get(self, angle):
+        """
+        Devuelve la rotación guardada más cercana a un ángulo.
+
+        Argumentos:
+            angle: Ángulo en grados (cualquier valor, se normaliza)
+
+        Devuelve:
+            tuple: (imagen rotada, máscara de colisión)
+        """
+        return self.frames[round(angle / self.step) % len(self.frames)]
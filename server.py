@@ -6,550 +6,1916 @@ Este módulo implementa un servidor TCP que maneja múltiples conexiones
 de clientes usando threading para permitir el juego multijugador.
 """
 
+import argparse
+import asyncio
+import multiprocessing
+import os
+import selectors
 import socket
+import socketserver
+import sys
 import threading
 import json
 import time
-import pygame
-from os.path import join
+import queue
+import random
+import struct
+import zlib
+from metrics import TimedLock, registry, start_http_server, start_log_dump
+from snapshot import SnapshotHistory, diff_state
+from prediction import PLAYER_STATE, apply_input, new_player_state
+from outbound import OutboundQueue, OutboundStats
+from protocol import (BINARY_PROTOCOL, JSON_PROTOCOL, decode_datagram, encode_json,
+                      encode_message, encode_udp_positions, read_message,
+                      read_message_async)
 
 # Configuración del servidor
 HOST = "0.0.0.0"  # Escucha en todas las interfaces de red disponibles
 PORT = 5555  # Puerto donde el servidor va a escuchar conexiones
-MAX_PLAYERS = 4  # Máximo de jugadores permitidos en una partida
+MAX_PLAYERS = 4  # Máximo de jugadores permitidos en cada sala
 MIN_PLAYERS = 2  # Mínimo de jugadores para iniciar el juego
+TICK_RATE = 30  # Ticks por segundo del servidor (por ejemplo 20, 30 o 60)
+SNAPSHOT_HISTORY = 64  # Snapshots guardados para calcular deltas por cliente
+LISTEN_BACKLOG = 128  # Conexiones pendientes de aceptar
+OUTBOUND_QUEUE_SIZE = 8  # Mensajes pendientes por cliente antes de descartar snapshots (o desconectarlo)
+SLOW_CLIENT_TIMEOUT = 5  # Segundos atrasado antes de desconectar a un cliente
+ENGINE = "threaded"  # Motor de red: "threaded" (un thread por cliente) o "asyncio"
+UDP_ENABLED = True  # Ofrece el canal UDP de posiciones a los clientes que lo pidan
+UDP_REFRESH_TICKS = 30  # Ticks entre reenvíos de posiciones aunque no cambien
+MAX_ROOMS = 1000  # Máximo de salas simultáneas en el proceso
+MAX_ROOM_NAME = 32  # Largo máximo del nombre de una sala
+AUTO_ROOM_PREFIX = "room-"  # Prefijo de las salas asignadas automáticamente
+UDP_PORT = None  # Puerto UDP de posiciones (None: el mismo que el TCP)
+WORKERS = 1  # Procesos de salas; con más de uno se usa el modo multiproceso
+JOIN_TIMEOUT = 5  # Segundos que el proceso principal espera el join de un cliente
+MAX_JOIN_SIZE = 4096  # Tamaño máximo del join en el modo multiproceso
+REPORT_INTERVAL = 1  # Segundos entre reportes de cada proceso al principal
+HEADLESS = os.environ.get("SPACE_SHOOTER_HEADLESS", "") not in ("", "0")  # Sin GUI (ni pygame)
+AUTO_START = None  # Segundos con suficientes jugadores antes de iniciar solo (None: manual)
+ADMIN_HOST = "127.0.0.1"  # El socket de administración solo escucha localmente
+ADMIN_PORT = None  # Puerto del socket de administración (None: desactivado)
+STATUS_INTERVAL = 10  # Segundos entre líneas de estado en el modo headless
+METRICS_PORT = None  # Puerto del endpoint HTTP de métricas (None: desactivado)
+METRICS_LOG = None  # Archivo al que se agregan las métricas (None: no se escriben)
+METRICS_INTERVAL = 60  # Segundos entre escrituras de METRICS_LOG
+
+# Métricas del servidor (ver metrics.py). Las acciones desconocidas se cuentan
+# como "other", así un cliente no puede crear etiquetas sin límite.
+METRIC_ACTIONS = ("join", "ack", "input", "update_position", "update_score",
+                  "shoot_laser", "hit", "restart")
+message_seconds = registry.histogram(
+    "space_shooter_message_seconds",
+    "Tiempo de handle_message por acción recibida (la cantidad es la tasa de mensajes)",
+    ("action",))
+action_seconds = registry.histogram(
+    "space_shooter_action_apply_seconds",
+    "Tiempo de aplicar cada acción en el tick de su sala", ("action",))
+lock_wait_seconds = registry.histogram(
+    "space_shooter_lock_wait_seconds",
+    "Espera para tomar rooms_lock o el lock de una sala cuando ya estaba tomado",
+    ("lock",))
+broadcast_seconds = registry.histogram(
+    "space_shooter_broadcast_seconds",
+    "Duración de broadcast_state con el lock de la sala tomado")
+broadcast_messages = registry.counter(
+    "space_shooter_broadcast_messages_total",
+    "Snapshots encolados a los clientes por tipo (state o delta)", ("type",))
+tick_seconds = registry.histogram(
+    "space_shooter_tick_seconds", "Duración de un tick de todas las salas")
+
+# Salas (partidas) activas. Cada sala tiene su propio estado, jugadores y
+# lock, así que las partidas no compiten entre sí; rooms_lock solo protege
+# el diccionario de salas y se toma al entrar o salir de una.
+rooms = {}  # nombre -> Room
+rooms_lock = TimedLock(lock_wait_seconds, "rooms")
+room_count = 0  # Contador para nombrar las salas asignadas automáticamente
+
+messages_received = 0  # Mensajes recibidos de todos los clientes
+outbound_stats = OutboundStats()  # Snapshots descartados y clientes lentos
+
+# Canal UDP de posiciones: socket (o transport asyncio) y sesiones por token.
+# Las sesiones se agregan y eliminan con rooms_lock tomado.
+udp_transport = None
+udp_sessions = {}  # token -> ClientConnection
+
+# Modo multiproceso (solo en el proceso principal): conexiones de control
+# con cada proceso de salas y el último reporte recibido de cada uno
+worker_controls = []
+worker_reports = {}  # número de proceso -> reporte
+
+
+class ClientConnection:
+    """
+    Clase que representa la conexión de un cliente con el servidor.
 
-# Estado global del juego - Este diccionario guarda toda la info del juego
-game_state = {
-    "status": "waiting",  # Estados posibles: waiting, ready, running, finished
-    "players": {},  # Diccionario con info de cada jugador conectado
-    "meteors": [],  # Lista de meteoritos activos (no se usa mucho aquí)
-    "num_players": 0  # Contador de jugadores conectados
-}
+    Guarda el socket junto con la información necesaria para enviarle
+    snapshots delta: el último snapshot que confirmó y el último keyframe
+    (snapshot completo) que se le envió. Los envíos pasan por una cola
+    propia que vacía un thread escritor, así un socket lento no frena
+    al resto.
 
-# Lock para evitar condiciones de carrera cuando varios threads acceden al estado
-lock = threading.Lock()
-clients = []  # Lista de sockets de clientes conectados
-player_count = 0  # Contador global para asignar IDs únicos a jugadores
+    Atributos:
+        conn: Socket de conexión con el cliente
+        addr: Dirección IP y puerto del cliente
+        player_id: ID del jugador asociado (-1 hasta que se asigna)
+        protocol: Protocolo negociado en el join (binario o JSON)
+        last_ack: Secuencia del último snapshot confirmado por el cliente
+        keyframe_seq: Secuencia del último keyframe enviado
+        last_sent_seq: Secuencia del último snapshot enviado
+        outbound: OutboundQueue con los mensajes pendientes de enviar
+        udp_token: Token de la sesión UDP (None si el cliente no la pidió)
+        udp_addr: Dirección UDP del cliente una vez que envió su hello
+        udp_last_seq: Secuencia del último datagrama de posición aceptado
+        room: Room en la que está el jugador (None hasta el join)
+        bytes_in: Bytes recibidos del cliente (TCP y UDP)
+        bytes_out: Bytes enviados al cliente (TCP y UDP)
+    """
 
-game_started = False  # Marca para saber si el juego ya comenzó
+    def __init__(self, conn, addr):
+        """
+        Inicializa la conexión sin snapshots enviados.
+
+        Argumentos:
+            conn: Socket de conexión con el cliente
+            addr: Dirección IP y puerto del cliente
+        """
+        self.conn = conn
+        self.addr = addr
+        if isinstance(conn, socket.socket):
+            # Los mensajes salen en lotes: sin el algoritmo de Nagle no esperan
+            # a que el cliente confirme el lote anterior (asyncio ya lo desactiva)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.player_id = -1
+        self.protocol = JSON_PROTOCOL  # JSON hasta que el join diga otra cosa
+        self.last_ack = None
+        self.keyframe_seq = None
+        self.last_sent_seq = None
+        self.outbound = OutboundQueue(OUTBOUND_QUEUE_SIZE, outbound_stats)
+        self.udp_token = None
+        self.udp_addr = None
+        self.udp_last_seq = -1
+        self.room = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def baseline(self):
+        """
+        Devuelve la secuencia que se puede usar como base para un delta.
+
+        Usamos el último ack o, si es más nuevo, el último keyframe enviado:
+        como TCP entrega en orden, el cliente lo tendrá aplicado antes de
+        recibir cualquier delta posterior.
+        """
+        known = [seq for seq in (self.last_ack, self.keyframe_seq) if seq is not None]
+        return max(known) if known else None
+
+    def ack(self, seq):
+        """
+        Registra la confirmación de un snapshot aplicado por el cliente.
+
+        Argumentos:
+            seq: Secuencia del snapshot confirmado
+        """
+        if isinstance(seq, int) and (self.last_ack is None or seq > self.last_ack):
+            self.last_ack = seq
+
+    def send(self, data, droppable=False):
+        """
+        Encola bytes para enviar al cliente sin bloquear.
+
+        Argumentos:
+            data: Mensaje ya serializado
+            droppable: True para snapshots que pueden reemplazarse por
+                       uno más nuevo si el cliente se atrasa
+
+        Devuelve:
+            bool: False si la cola de salida se desbordó (o ya estaba
+                  cerrada); en ese caso se cierra la conexión
+        """
+        if self.outbound.put(data, droppable):
+            return True
+        self.close()
+        return False
+
+    def is_lagging(self):
+        """
+        Indica si el cliente lleva demasiado tiempo sin poder recibir.
+        """
+        return self.outbound.behind_for() > SLOW_CLIENT_TIMEOUT
+
+    def start_writer(self):
+        """
+        Inicia el thread que vacía la cola de salida en el socket.
+        """
+        threading.Thread(target=self.writer_loop, daemon=True).start()
+
+    def writer_loop(self):
+        """
+        Envía los mensajes encolados. Es el único lugar donde se bloquea
+        esperando al socket de este cliente.
+        """
+        while True:
+            batch = self.outbound.get_batch()
+            if batch is None:
+                break  # La conexión se cerró
+            data = b"".join(batch)
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                self.close()
+                break
+            self.bytes_out += len(data)
+            self.outbound.mark_sent()
+
+    def close(self):
+        """
+        Cierra la conexión con el cliente.
+
+        El shutdown despierta al thread que está leyendo del socket para
+        que termine y elimine al jugador.
+        """
+        self.outbound.close()
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class AsyncClientConnection(ClientConnection):
+    """
+    Conexión de un cliente atendida por el motor asyncio.
 
+    La cola de salida la vacía una tarea del event loop que espera a
+    drain() antes de escribir más, así un cliente lento solo frena a
+    su propia tarea.
 
-def broadcast_state():
+    Atributos:
+        reader: asyncio.StreamReader de la conexión
+        writer: asyncio.StreamWriter de la conexión
+        ready: asyncio.Event que avisa que hay mensajes en la cola
     """
-    Envía el estado del juego a todos los clientes conectados.
 
-    Esta función serializa el estado del juego a JSON y lo envía
-    a cada cliente. Si algún cliente se desconectó, lo elimina de la lista.
+    def __init__(self, reader, writer):
+        """
+        Inicializa la conexión a partir del par reader/writer de asyncio.
+        """
+        self.ready = asyncio.Event()
+        super().__init__(writer, writer.get_extra_info("peername"))
+        self.outbound.on_put = self.ready.set
+        self.reader = reader
+        self.writer = writer
+
+    def start_writer(self):
+        """
+        Crea la tarea que vacía la cola de salida.
+        """
+        self.writer_task = asyncio.create_task(self.writer_loop_async())
+
+    async def writer_loop_async(self):
+        """
+        Escribe los mensajes encolados respetando el control de flujo.
+        """
+        while True:
+            batch = self.outbound.get_batch(block=False)
+            if batch is None:
+                break
+            if not batch:
+                self.ready.clear()
+                await self.ready.wait()
+                continue
+            data = b"".join(batch)
+            try:
+                self.writer.write(data)
+                await self.writer.drain()
+            except (ConnectionError, OSError):
+                self.close()
+                break
+            self.bytes_out += len(data)
+            self.outbound.mark_sent()
+
+    def close(self):
+        """
+        Cierra la conexión sin esperar a que se vacíe el buffer.
+        """
+        self.outbound.close()
+        self.writer.transport.abort()
+
+
+class CountingReader:
     """
-    # Creamos el mensaje con el estado actual del juego
-    state_message = {"type": "state", "state": game_state}
-    # Convertimos a JSON y agregamos salto de línea para delimitar mensajes
-    message = (json.dumps(state_message) + "\n").encode("utf-8")
+    File object de lectura que suma al cliente los bytes leídos.
 
-    with lock:  # Bloqueamos para evitar problemas de concurrencia
-        disconnected = []  # Lista para guardar clientes desconectados
+    Atributos:
+        file: File object binario del socket
+        client: ClientConnection a la que se suman los bytes
+    """
 
-        # Intentamos enviar el mensaje a cada cliente
-        for client_socket in clients:
-            try:
-                client_socket.sendall(message)
-            except:
-                # Si falla, el cliente se desconectó
-                disconnected.append(client_socket)
+    def __init__(self, file, client):
+        self.file = file
+        self.client = client
 
-        # Removemos los clientes desconectados de la lista
-        for client_socket in disconnected:
-            if client_socket in clients:
-                clients.remove(client_socket)
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.client.bytes_in += len(data)
+        return data
 
+    def readline(self, size=-1):
+        data = self.file.readline(size)
+        self.client.bytes_in += len(data)
+        return data
 
-def handle_client(conn, addr):
+
+class AsyncCountingReader:
     """
-    Maneja la conexión de un cliente individual en un thread separado.
+    asyncio.StreamReader que suma al cliente los bytes leídos (solo los
+    métodos que usa read_message_async).
 
-    Argumentos:
-        conn: Socket de conexión con el cliente
-        addr: Dirección IP y puerto del cliente
+    Atributos:
+        reader: asyncio.StreamReader de la conexión
+        client: ClientConnection a la que se suman los bytes
+    """
 
-    Esta función procesa todos los mensajes que envía un cliente
-    y actualiza el estado del juego según las acciones recibidas.
+    def __init__(self, reader, client):
+        self.reader = reader
+        self.client = client
+
+    async def readexactly(self, size):
+        data = await self.reader.readexactly(size)
+        self.client.bytes_in += len(data)
+        return data
+
+    async def readline(self):
+        data = await self.reader.readline()
+        self.client.bytes_in += len(data)
+        return data
+
+
+class Room:
+    """
+    Clase que representa una sala: una partida independiente.
+
+    Cada sala tiene su propio estado del juego, sus jugadores, su máquina
+    de estados (waiting, ready, running, finished), sus clientes de
+    difusión y su historial de snapshots. Todo se protege con el lock de
+    la sala, así que cientos de salas pueden correr en el mismo proceso
+    sin bloquearse entre sí.
+
+    Atributos:
+        name: Nombre de la sala
+        auto: True si la sala se creó para la asignación automática
+        game_state: Diccionario con el estado del juego de la sala
+        lock: Lock de la sala
+        clients: Lista de ClientConnection de los clientes de la sala
+        player_count: Contador para asignar IDs de jugador en la sala
+        game_started: Marca para saber si la partida ya comenzó
+        input_queue: Acciones recibidas pendientes de aplicar en el tick
+        state_dirty: Indica si el estado cambió desde el último envío
+        snapshot_seq: Secuencia del último snapshot
+        snapshot_history: Snapshots ya enviados (bases de los deltas)
+        tick: Cantidad de ticks ejecutados por la sala
+        ready_since: Momento (time.monotonic) desde el que la sala tiene
+                     jugadores suficientes, para el inicio automático
+        input_acks: ID de jugador -> última entrada numerada procesada en
+                    este tick, para confirmarla a su cliente
     """
-    global player_count
-    player_id = -1  # ID del jugador, se asigna después
 
-    try:
-        with lock:
+    def __init__(self, name, auto=False):
+        """
+        Inicializa una sala vacía.
+
+        Argumentos:
+            name: Nombre de la sala
+            auto: True si la sala acepta jugadores sin sala elegida
+        """
+        self.name = name
+        self.auto = auto
+        self.game_state = {
+            "status": "waiting",  # Estados posibles: waiting, ready, running, finished
+            "players": {},  # Diccionario con info de cada jugador conectado
+            "meteors": [],  # Lista de meteoritos activos (no se usa mucho aquí)
+            "num_players": 0  # Contador de jugadores conectados
+        }
+        self.lock = TimedLock(lock_wait_seconds, "room")
+        self.clients = []
+        self.player_count = 0
+        self.game_started = False
+
+        # Los threads de cada cliente solo encolan; el tick de la sala
+        # aplica todas las acciones juntas una vez por tick.
+        self.input_queue = queue.SimpleQueue()
+        self.state_dirty = False
+
+        self.snapshot_seq = 0
+        self.snapshot_history = SnapshotHistory(SNAPSHOT_HISTORY)
+        self.tick = 0
+        self.ready_since = None
+        self.input_acks = {}
+
+        # Posiciones enviadas por UDP
+        self.udp_seq = 0  # Secuencia del último datagrama de posiciones
+        self.udp_last_positions = None  # Posiciones del último datagrama
+        self.udp_idle_ticks = 0  # Ticks desde el último datagrama
+        self.udp_refresh_pending = False  # Un cliente nuevo necesita las posiciones ya
+
+    def has_space(self):
+        """
+        Indica si un jugador nuevo puede entrar a la sala.
+        """
+        with self.lock:
+            return not self.game_started and len(self.game_state["players"]) < MAX_PLAYERS
+
+    def is_empty(self):
+        """
+        Indica si la sala se quedó sin jugadores.
+        """
+        with self.lock:
+            return not self.game_state["players"]
+
+    def build_snapshot(self):
+        """
+        Crea una copia del estado del juego lista para enviar.
+
+        Devuelve:
+            dict: Estado con las claves de jugadores como texto (igual que las
+                  recibe el cliente por JSON). Se omite la lista de meteoritos,
+                  que el servidor no usa.
+
+        Debe llamarse con el lock tomado.
+        """
+        snapshot = {
+            "status": self.game_state["status"],
+            "num_players": self.game_state["num_players"],
+            "players": {str(pid): dict(pdata) for pid, pdata in self.game_state["players"].items()}
+        }
+        if "match" in self.game_state:
+            snapshot["match"] = self.game_state["match"]
+        return snapshot
+
+    def broadcast_state(self):
+        """
+        Envía el estado del juego a todos los clientes de la sala.
+
+        Si el estado cambió respecto al último snapshot se genera uno nuevo
+        con el siguiente número de secuencia. A cada cliente se le envía solo
+        lo que cambió desde su snapshot base ("delta"), o el estado completo
+        ("state") si acaba de entrar o se atrasó más que el historial guardado.
+        Los mensajes se encolan en la cola de cada cliente, así que esta
+        función nunca se bloquea esperando a un socket. Si algún cliente se
+        desconectó o se quedó atrás demasiado tiempo, lo elimina de la lista.
+        """
+        with self.lock:  # Bloqueamos para evitar problemas de concurrencia
+            start = time.perf_counter()
+            sent = {"state": 0, "delta": 0}  # Snapshots encolados por tipo
+            snapshot = self.build_snapshot()
+            latest = self.snapshot_history.latest()
+
+            # Solo avanzamos la secuencia si algo cambió de verdad
+            if latest is None or latest[1] != snapshot:
+                self.snapshot_seq += 1
+                self.snapshot_history.add(self.snapshot_seq, snapshot)
+
+            seq = self.snapshot_seq
+            encoded = {}  # Mensajes ya serializados por (base, protocolo), compartidos entre clientes
+            disconnected = []  # Lista para guardar clientes desconectados
+
+            # Intentamos enviar el mensaje a cada cliente
+            for client in self.clients:
+                if client.last_sent_seq == seq:
+                    continue  # El cliente ya tiene este snapshot
+
+                base = client.baseline()
+                if base is None or self.snapshot_history.get(base) is None:
+                    # Keyframe: el cliente es nuevo o se atrasó demasiado
+                    base = None
+                    client.keyframe_seq = seq
+
+                # Si el cliente recibe las posiciones por UDP no las repetimos por TCP
+                udp = client.udp_addr is not None
+                key = (base, client.protocol, udp)
+                if key not in encoded:
+                    if base is None:
+                        message = {"type": "state", "seq": seq, "state": snapshot}
+                    else:
+                        delta = diff_state(self.snapshot_history.get(base), snapshot,
+                                           ignore=("x", "y") if udp else ())
+                        message = {"type": "delta", "seq": seq, "base": base, "delta": delta}
+                        if not delta and seq - base < SNAPSHOT_HISTORY // 2:
+                            # Solo cambiaron posiciones: no hay nada que enviar por
+                            # TCP mientras la base siga lejos del final del historial
+                            message = None
+                    # Serializamos en binario o como línea JSON según el cliente
+                    encoded[key] = message and encode_message(message, client.protocol)
+
+                if encoded[key] is None:
+                    continue
+
+                try:
+                    # Los keyframes no se descartan: los deltas siguientes parten de ellos
+                    queued = client.send(encoded[key], droppable=base is not None)
+                except:
+                    queued = False
+                if not queued:
+                    # El cliente se desconectó o su cola se desbordó
+                    disconnected.append(client)
+                    continue
+                client.last_sent_seq = seq
+                sent["delta" if base is not None else "state"] += 1
+
+                if client.is_lagging():
+                    # Lleva demasiado tiempo sin poder recibir: lo desconectamos
+                    print(f"Jugador {client.player_id} desconectado por lento")
+                    outbound_stats.add_slow_disconnect()
+                    client.close()
+                    disconnected.append(client)
+
+            # Removemos los clientes desconectados de la lista
+            for client in disconnected:
+                if client in self.clients:
+                    self.clients.remove(client)
+
+            for kind, count in sent.items():
+                if count:
+                    broadcast_messages.inc(kind, amount=count)
+            broadcast_seconds.observe(time.perf_counter() - start)
+
+    def mark_dirty(self):
+        """
+        Marca el estado del juego como modificado.
+
+        El siguiente tick enviará un snapshot a todos los clientes de la sala.
+        """
+        self.state_dirty = True
+
+    def broadcast_positions(self):
+        """
+        Envía por UDP las posiciones de todos los jugadores de la sala.
+
+        Solo a los clientes que registraron su dirección UDP. Se envía un
+        datagrama cuando alguna posición cambió y, aunque no cambien, cada
+        UDP_REFRESH_TICKS ticks para reponer un datagrama perdido.
+        """
+        if udp_transport is None:
+            return
+
+        with self.lock:
+            targets = [client for client in self.clients if client.udp_addr is not None]
+            positions = [(pid, pdata["x"], pdata["y"])
+                         for pid, pdata in self.game_state["players"].items()]
+            refresh = self.udp_refresh_pending
+            self.udp_refresh_pending = False
+
+        if not targets:
+            return
+
+        self.udp_idle_ticks += 1
+        if (positions == self.udp_last_positions and not refresh
+                and self.udp_idle_ticks < UDP_REFRESH_TICKS):
+            return
+
+        self.udp_seq += 1
+        self.udp_last_positions = positions
+        self.udp_idle_ticks = 0
+        datagram = encode_udp_positions(self.udp_seq, positions)
+        for client in targets:
+            try:
+                udp_transport.sendto(datagram, client.udp_addr)
+                client.bytes_out += len(datagram)
+            except OSError:
+                pass  # UDP no garantiza la entrega: el próximo datagrama lo repone
+
+    def apply_action(self, player_id, msg):
+        """
+        Aplica una acción de un jugador sobre el estado de la sala.
+
+        Argumentos:
+            player_id: ID del jugador que envió la acción
+            msg: Diccionario con el mensaje recibido del cliente
+
+        Debe llamarse con el lock tomado. Si el jugador ya no existe
+        (por ejemplo, se desconectó antes del tick) la acción se descarta.
+        """
+        game_state = self.game_state
+
+        # Verificamos que el jugador aún exista
+        if player_id not in game_state["players"]:
+            return
+
+        action = msg.get("action")  # Obtenemos la acción solicitada
+        pdata = game_state["players"][player_id]
+
+        # Procesamos diferentes tipos de acciones
+        if action == "join":
+            # El jugador envía su nombre de usuario
+            pdata["username"] = msg.get("username", f"Player{player_id}")
+
+        elif action == "update_position":
+            # Actualizamos la posición del jugador
+            pdata["x"] = msg.get("x")
+            pdata["y"] = msg.get("y")
+
+        elif action == "update_score":
+            # Actualizamos el puntaje del jugador
+            pdata["score"] = msg.get("score")
+
+        elif action == "input":
+            # Entrada numerada: se simula igual que en el cliente (prediction.py)
+            # y se le confirma al cliente al final del tick
+            seq = msg.get("seq")
+            if type(seq) is not int:
+                return
+            apply_input(pdata, msg)
+            self.input_acks[player_id] = seq
+            if msg.get("kind") == "hit":
+                self.check_finished()
+            elif msg.get("kind") == "restart":
+                self.check_restart()
+
+        elif action == "hit":
+            # El jugador fue golpeado por un meteorito
+            apply_input(pdata, {"kind": "hit"})
+            self.check_finished()
+
+        elif action == "restart":
+            # El jugador quiere reiniciar
+            apply_input(pdata, {"kind": "restart"})
+            self.check_restart()
+
+        else:
+            # Acción desconocida: no cambia el estado
+            return
+
+        self.mark_dirty()
+
+    def check_finished(self):
+        """
+        Termina la partida si murieron todos los jugadores.
+
+        Debe llamarse con el lock tomado.
+        """
+        alive_players = [p for p in self.game_state["players"].values() if p["alive"]]
+        if len(alive_players) == 0:
+            self.game_state["status"] = "finished"
+
+    def check_restart(self):
+        """
+        Reinicia la partida si todos los jugadores volvieron a estar vivos.
+
+        Debe llamarse con el lock tomado.
+        """
+        all_alive = all(p["alive"] for p in self.game_state["players"].values())
+        if all_alive and self.game_state["status"] != "running":
+            self.game_state["status"] = "running"
+            self.new_match()
+
+    def send_input_acks(self):
+        """
+        Confirma a cada cliente la última entrada que se le procesó en este
+        tick, junto con el estado de su jugador según el servidor.
+
+        Con eso el cliente corrige su predicción (ver prediction.py). Es un
+        mensaje solo para ese cliente y se puede descartar si se atrasa:
+        la confirmación siguiente lo reemplaza.
+        """
+        with self.lock:
+            acks, self.input_acks = self.input_acks, {}
+            if not acks:
+                return
+            for client in self.clients:
+                seq = acks.get(client.player_id)
+                pdata = self.game_state["players"].get(client.player_id)
+                if seq is None or pdata is None:
+                    continue
+                message = {"type": "input_ack", "seq": seq,
+                           **{name: pdata[name] for name in PLAYER_STATE}}
+                client.send(encode_message(message, client.protocol), droppable=True)
+
+    def new_match(self):
+        """
+        Reparte una semilla nueva para los meteoritos de la partida.
+
+        Los clientes generan todos los mismos meteoritos a partir de la
+        semilla y del tick de inicio (ver meteor_field.py), así que los
+        meteoritos nunca viajan por la red. Debe llamarse con el lock tomado.
+        """
+        self.game_state["match"] = {"seed": random.getrandbits(32), "start_tick": self.tick}
+        self.mark_dirty()
+
+    def process_inputs(self):
+        """
+        Aplica en un solo lote todas las acciones encoladas desde el último tick.
+
+        Devuelve:
+            int: Cantidad de acciones procesadas
+        """
+        processed = 0
+        with self.lock:
+            while True:
+                try:
+                    player_id, msg = self.input_queue.get_nowait()
+                except queue.Empty:
+                    break
+                start = time.perf_counter()
+                self.apply_action(player_id, msg)
+                action_seconds.observe(time.perf_counter() - start, metric_action(msg))
+                processed += 1
+        return processed
+
+    def run_tick(self):
+        """
+        Ejecuta un tick de la sala.
+
+        Aplica todas las acciones pendientes y, si el estado cambió, envía un
+        único snapshot a cada cliente. Así el tráfico de salida crece de forma
+        lineal con la cantidad de jugadores, en lugar de enviar el estado
+        completo después de cada mensaje recibido.
+        """
+        self.tick += 1
+        self.process_inputs()
+        self.send_input_acks()
+
+        if AUTO_START is not None:
+            self.check_auto_start()
+
+        with self.lock:
+            send_snapshot = self.state_dirty
+            self.state_dirty = False
+
+        if send_snapshot:
+            self.broadcast_state()
+        self.broadcast_positions()
+
+    def check_auto_start(self):
+        """
+        Inicia la partida si lleva AUTO_START segundos con jugadores suficientes.
+        """
+        with self.lock:
+            enough = not self.game_started and self.game_state["num_players"] >= MIN_PLAYERS
+        if not enough:
+            self.ready_since = None
+        elif self.ready_since is None:
+            self.ready_since = time.monotonic()
+        elif time.monotonic() - self.ready_since >= AUTO_START and self.start():
+            print(f"¡Juego iniciado en la sala {self.name}!")
+
+    def start(self):
+        """
+        Inicia la partida si hay suficientes jugadores.
+
+        Devuelve:
+            bool: True si la partida se inició
+        """
+        with self.lock:
+            if self.game_started or self.game_state["num_players"] < MIN_PLAYERS:
+                return False
+            self.game_state["status"] = "running"
+            self.game_started = True
+            self.new_match()  # El próximo tick avisa a los clientes
+        return True
+
+    def register_player(self, client):
+        """
+        Reserva un lugar en la sala para un cliente nuevo.
+
+        Argumentos:
+            client: ClientConnection del cliente
+
+        Devuelve:
+            int o None: ID asignado, o None si la sala está llena
+        """
+        with self.lock:
+            game_state = self.game_state
+
             # Verificamos si ya hay demasiados jugadores
             if len(game_state["players"]) >= MAX_PLAYERS:
-                conn.close()
-                return
+                return None
 
-            # Asignamos un ID único al nuevo jugador
-            player_count += 1
-            player_id = player_count
+            # Asignamos un ID único dentro de la sala al nuevo jugador
+            self.player_count += 1
+            player_id = self.player_count
+            client.player_id = player_id
 
             # Inicializamos los datos del jugador en el estado del juego
             game_state["players"][player_id] = {
                 "id": player_id,
                 "username": f"Player{player_id}",  # Nombre
-                "x": 500,  # Posición inicial X
-                "y": 500,  # Posición inicial Y
-                "lives": 3,  # Vidas iniciales
-                "score": 0,  # Puntaje inicial
-                "alive": True  # Estado del jugador
+                # Posición inicial, vidas, puntaje y estado (los mismos que
+                # usa el cliente para predecir antes del primer snapshot)
+                **new_player_state()
             }
             game_state["num_players"] = len(game_state["players"])
+            self.mark_dirty()  # Notificamos a todos del nuevo jugador
 
-        print(f"Jugador {player_id} conectado desde {addr}")
+        print(f"Jugador {player_id} conectado a la sala {self.name} desde {client.addr}")
+        return player_id
 
-        # Enviamos mensaje de bienvenida con el ID asignado
-        welcome = {"type": "welcome", "player_id": player_id}
-        conn.sendall((json.dumps(welcome) + "\n").encode("utf-8"))
-        broadcast_state()  # Notificamos a todos del nuevo jugador
+    def accept_join(self, client, join_msg, welcome):
+        """
+        Responde al join de un cliente y lo agrega a la lista de difusión.
+
+        Argumentos:
+            client: ClientConnection del cliente ya registrado
+            join_msg: Primer mensaje del cliente
+            welcome: Mensaje de bienvenida a enviar
+        """
+        with self.lock:
+            # Lo agregamos a la lista en el mismo bloque para que el welcome llegue primero
+            client.send(encode_json(welcome))
+            self.clients.append(client)
 
-        with lock:
             # Si ya hay suficientes jugadores, cambiamos el estado a "ready"
-            if game_state["num_players"] >= MIN_PLAYERS:
-                game_state["status"] = "ready"
-                print(f"¡{game_state['num_players']} jugadores conectados! Esperando señal de inicio...")
+            if self.game_state["num_players"] >= MIN_PLAYERS:
+                self.game_state["status"] = "ready"
+                self.mark_dirty()
+                print(f"¡{self.game_state['num_players']} jugadores en la sala {self.name}! "
+                      "Esperando señal de inicio...")
+
+        # El nombre de usuario se aplica en el próximo tick como cualquier acción
+        self.input_queue.put((client.player_id, join_msg))
+
+    def unregister_player(self, client):
+        """
+        Elimina al jugador del estado de la sala.
+
+        Argumentos:
+            client: ClientConnection del cliente que se desconectó
+        """
+        with self.lock:
+            if client.player_id in self.game_state["players"]:
+                del self.game_state["players"][client.player_id]
+                self.game_state["num_players"] = len(self.game_state["players"])
+                self.mark_dirty()
+            if client in self.clients:
+                self.clients.remove(client)
+
+
+class RemoteRoom:
+    """
+    Vista de una sala que corre en otro proceso (modo multiproceso).
+
+    Tiene los atributos que usa la GUI del servidor, tomados del último
+    reporte del proceso dueño de la sala.
+
+    Atributos:
+        worker: Número del proceso dueño de la sala
+        name: Nombre de la sala
+        game_state: Estado del juego según el último reporte
+        game_started: Marca para saber si la partida ya comenzó
+    """
+
+    def __init__(self, worker, report):
+        """
+        Crea la vista a partir del reporte de una sala.
+        """
+        self.worker = worker
+        self.name = report["name"]
+        self.game_state = report["game_state"]
+        self.game_started = report["game_started"]
+
+    def start(self):
+        """
+        Pide al proceso dueño que inicie la partida.
+
+        Devuelve:
+            bool: True si se envió el pedido
+        """
+        if self.game_started or self.game_state["num_players"] < MIN_PLAYERS:
+            return False
+        worker_controls[self.worker].send({"command": "start", "room": self.name})
+        return True
+
+
+def get_rooms():
+    """
+    Devuelve la lista de salas activas ordenada por nombre.
+
+    En el modo multiproceso devuelve RemoteRoom armadas con los reportes
+    de los procesos de salas.
+    """
+    if worker_controls:
+        return sorted((RemoteRoom(index, report)
+                       for index, worker_report in list(worker_reports.items())
+                       for report in worker_report["rooms"]),
+                      key=lambda room: room.name)
+    with rooms_lock:
+        return sorted(rooms.values(), key=lambda room: room.name)
+
+
+def get_outbound_stats():
+    """
+    Devuelve los contadores de las colas de salida.
+
+    Devuelve:
+        dict: Profundidad total y máxima de las colas, snapshots
+              descartados y clientes desconectados por lentos
+
+    En el modo multiproceso combina los valores de los reportes de los
+    procesos de salas.
+    """
+    if worker_controls:
+        outbound = [worker_report["outbound"]
+                    for worker_report in list(worker_reports.values())
+                    if "outbound" in worker_report]
+        return {
+            "queued": sum(stats["queued"] for stats in outbound),
+            "max_queue_depth": max((stats["max_queue_depth"] for stats in outbound), default=0),
+            "dropped_snapshots": sum(stats["dropped_snapshots"] for stats in outbound),
+            "slow_disconnects": sum(stats["slow_disconnects"] for stats in outbound)
+        }
+    depths = []
+    with rooms_lock:
+        active_rooms = list(rooms.values())
+    for room in active_rooms:
+        with room.lock:
+            depths.extend(client.outbound.depth() for client in room.clients)
+    return {
+        "queued": sum(depths),
+        "max_queue_depth": max(depths, default=0),
+        "dropped_snapshots": outbound_stats.dropped_snapshots,
+        "slow_disconnects": outbound_stats.slow_disconnects
+    }
+
+
+def join_room(client, name=None):
+    """
+    Ubica a un cliente en una sala y le reserva un lugar.
+
+    Argumentos:
+        client: ClientConnection del cliente
+        name: Nombre de la sala pedida, o None para asignar una
+              automáticamente (la primera que no empezó y tenga lugar)
+
+    Devuelve:
+        Room o None: Sala asignada, o None si la sala pedida está llena
+                     o se alcanzó el máximo de salas
+    """
+    global room_count
+
+    with rooms_lock:
+        if name is not None:
+            room = rooms.get(name)
+        else:
+            room = next((room for room in rooms.values() if room.auto and room.has_space()), None)
+
+        if room is None:
+            if len(rooms) >= MAX_ROOMS:
+                return None
+            auto = name is None
+            if auto:
+                # Nombre libre para una sala automática
+                room_count += 1
+                while f"{AUTO_ROOM_PREFIX}{room_count}" in rooms:
+                    room_count += 1
+                name = f"{AUTO_ROOM_PREFIX}{room_count}"
+            room = Room(name, auto)
+            rooms[name] = room
+
+        if room.register_player(client) is None:
+            return None
+
+    client.room = room
+    return room
+
 
-        # Procesamos mensajes del cliente línea por línea
-        conn_file = conn.makefile(mode="r")
-        for line in conn_file:
+def run_tick():
+    """
+    Ejecuta un tick del servidor: un tick de cada sala activa.
+
+    Cada sala toma solo su propio lock, así que una sala con mucho
+    tráfico no frena a las demás más allá del tiempo de su tick. Un
+    error en una sala tampoco: se informa y se sigue con la siguiente.
+    """
+    start = time.perf_counter()
+    with rooms_lock:
+        active_rooms = list(rooms.values())
+    for room in active_rooms:
+        try:
+            room.run_tick()
+        except Exception as e:
+            print(f"Error en el tick de la sala {room.name}: {e}")
+    tick_seconds.observe(time.perf_counter() - start)
+
+
+def handle_datagram(data, addr):
+    """
+    Procesa un datagrama UDP recibido.
+
+    Argumentos:
+        data: Bytes del datagrama
+        addr: Dirección de origen
+
+    Los datagramas con un token desconocido, mal formados o más viejos que
+    el último aceptado (llegaron desordenados) se descartan.
+    """
+    try:
+        msg = decode_datagram(data)
+    except ValueError:
+        return
+
+    # La búsqueda en el diccionario es atómica; solo las altas y bajas toman rooms_lock
+    client = udp_sessions.get(msg["token"])
+    if client is None or client.room is None:
+        return
+
+    room = client.room
+    client.bytes_in += len(data)
+    with room.lock:
+        if msg["type"] == "hello":
+            if client.udp_addr is None:
+                room.udp_refresh_pending = True
+            client.udp_addr = addr
+            return
+        if msg["type"] != "position" or msg["seq"] <= client.udp_last_seq:
+            return
+        client.udp_last_seq = msg["seq"]
+        client.udp_addr = addr
+
+    handle_message(client, {"action": "update_position", "x": msg["x"], "y": msg["y"]})
+
+
+def tick_loop(tick_rate=TICK_RATE):
+    """
+    Loop de simulación del servidor a frecuencia fija (motor con threads).
+
+    Argumentos:
+        tick_rate: Cantidad de ticks por segundo
+    """
+    tick_interval = 1 / tick_rate
+    next_tick = time.perf_counter()
+
+    while True:
+        try:
+            run_tick()
+        except Exception as e:
+            # Un error en un tick no debe detener la simulación
+            print(f"Error en el tick del servidor: {e}")
+
+        # Esperamos hasta el siguiente tick
+        next_tick += tick_interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Si nos atrasamos, no intentamos recuperar los ticks perdidos
+            next_tick = time.perf_counter()
+
+
+async def tick_loop_async(tick_rate=TICK_RATE):
+    """
+    Loop de simulación del servidor a frecuencia fija (motor asyncio).
+
+    Argumentos:
+        tick_rate: Cantidad de ticks por segundo
+    """
+    tick_interval = 1 / tick_rate
+    next_tick = time.perf_counter()
+
+    while True:
+        try:
+            run_tick()
+        except Exception as e:
+            print(f"Error en el tick del servidor: {e}")
+
+        next_tick += tick_interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            next_tick = time.perf_counter()
+            await asyncio.sleep(0)  # Dejamos correr a las conexiones
+
+
+def room_name(join_msg):
+    """
+    Devuelve el nombre de sala pedido en un join, o None si no pidió ninguna.
+    """
+    name = join_msg.get("room")
+    if not isinstance(name, str) or not name.strip():
+        return None  # Sin sala elegida: se asigna una automáticamente
+    return name.strip()[:MAX_ROOM_NAME]
+
+
+def accept_join(client, join_msg):
+    """
+    Ubica al cliente en una sala según su join y le responde.
+
+    Argumentos:
+        client: ClientConnection del cliente
+        join_msg: Primer mensaje del cliente, con su nombre, la sala
+                  pedida (opcional) y los protocolos que entiende
+
+    Devuelve:
+        Room o None: Sala del cliente, o None si no hay lugar
+    """
+    room = join_room(client, room_name(join_msg))
+    if room is None:
+        return None
+
+    if BINARY_PROTOCOL in join_msg.get("protocols", ()):
+        client.protocol = BINARY_PROTOCOL
+
+    # Mensaje de bienvenida con el ID asignado, la sala, el protocolo elegido
+    # y el tick actual de la sala (los clientes lo usan como reloj de la partida)
+    # "inputs" indica que el servidor confirma las entradas numeradas (prediction.py)
+    welcome = {"type": "welcome", "player_id": client.player_id, "room": room.name,
+               "protocol": client.protocol, "tick": room.tick, "tick_rate": TICK_RATE,
+               "inputs": True}
+
+    if join_msg.get("udp") and udp_transport is not None:
+        # Sesión UDP para las posiciones: el cliente se identifica con el token
+        with rooms_lock:
+            token = random.getrandbits(32)
+            while token in udp_sessions:
+                token = random.getrandbits(32)
+            client.udp_token = token
+            udp_sessions[token] = client
+        welcome["udp_token"] = token
+        welcome["udp_port"] = UDP_PORT or PORT
+
+    room.accept_join(client, join_msg, welcome)
+    return room
+
+
+def handle_message(client, msg):
+    """
+    Procesa un mensaje recibido de un cliente.
+
+    Argumentos:
+        client: ClientConnection que envió el mensaje
+        msg: Diccionario con el mensaje decodificado
+    """
+    global messages_received
+    messages_received += 1
+    start = time.perf_counter()
+
+    if msg.get("action") == "ack":
+        # Confirmación de snapshot: no cambia el estado del juego
+        client.ack(msg.get("seq"))
+    else:
+        # Encolamos la acción; se aplicará en el próximo tick de su sala
+        client.room.input_queue.put((client.player_id, msg))
+
+    message_seconds.observe(time.perf_counter() - start, metric_action(msg))
+
+
+def metric_action(msg):
+    """
+    Devuelve la acción de un mensaje para las etiquetas de las métricas
+    ("other" si no es una acción conocida).
+    """
+    action = msg.get("action")
+    return action if action in METRIC_ACTIONS else "other"
+
+
+def unregister_player(client):
+    """
+    Saca al jugador de su sala, elimina la sala si quedó vacía y cierra
+    la conexión.
+
+    Argumentos:
+        client: ClientConnection del cliente que se desconectó
+    """
+    room = client.room
+    if room is not None:
+        room.unregister_player(client)
+        with rooms_lock:
+            udp_sessions.pop(client.udp_token, None)
+            if room.is_empty() and rooms.get(room.name) is room:
+                del rooms[room.name]
+    client.close()
+    if room is not None:
+        print(f"Jugador {client.player_id} desconectado de la sala {room.name}")
+
+
+def handle_client(client):
+    """
+    Maneja la conexión de un cliente individual en un thread separado.
+
+    Argumentos:
+        client: ClientConnection con el socket y la dirección del cliente
+
+    Esta función procesa todos los mensajes que envía un cliente
+    y actualiza el estado del juego según las acciones recibidas.
+    """
+    client.start_writer()
+    try:
+        # El primer mensaje es el join, que indica la sala y qué protocolos entiende el cliente
+        conn_file = CountingReader(client.conn.makefile(mode="rb"), client)
+        join_msg = read_message(conn_file)
+        if join_msg is None:
+            return
+        if accept_join(client, join_msg) is None:
+            print(f"Sala llena, conexión rechazada desde {client.addr}")
+            return
+
+        # Procesamos mensajes del cliente (tramas binarias o líneas JSON)
+        while True:
             try:
-                msg = json.loads(line.strip())  # Convertimos el JSON
-                action = msg.get("action")  # Obtenemos la acción solicitada
-
-                with lock:
-                    # Verificamos que el jugador aún exista
-                    if player_id not in game_state["players"]:
-                        continue
-
-                    pdata = game_state["players"][player_id]
-
-                    # Procesamos diferentes tipos de acciones
-                    if action == "join":
-                        # El jugador envía su nombre de usuario
-                        pdata["username"] = msg.get("username", f"Player{player_id}")
-
-                    elif action == "update_position":
-                        # Actualizamos la posición del jugador
-                        pdata["x"] = msg.get("x")
-                        pdata["y"] = msg.get("y")
-
-                    elif action == "update_score":
-                        # Actualizamos el puntaje del jugador
-                        pdata["score"] = msg.get("score")
-
-                    elif action == "hit":
-                        # El jugador fue golpeado por un meteorito
-                        pdata["lives"] -= 1
-                        if pdata["lives"] <= 0:
-                            pdata["alive"] = False
-                            # Verificamos si todos los jugadores murieron
-                            alive_players = [p for p in game_state["players"].values() if p["alive"]]
-                            if len(alive_players) == 0:
-                                game_state["status"] = "finished"
-
-                    elif action == "restart":
-                        # El jugador quiere reiniciar
-                        pdata["lives"] = 3
-                        pdata["score"] = 0
-                        pdata["alive"] = True
-                        # Si todos están vivos, reiniciamos el juego
-                        all_alive = all(p["alive"] for p in game_state["players"].values())
-                        if all_alive:
-                            game_state["status"] = "running"
-
-                # Enviamos el estado actualizado a todos
-                broadcast_state()
-
-            except json.JSONDecodeError:
-                # Si el JSON está mal formado, lo ignoramos
+                msg = read_message(conn_file)
+            except (ValueError, struct.error):
+                # Si el mensaje está mal formado, lo ignoramos
                 continue
+            if msg is None:
+                break  # El cliente cerró la conexión
+            handle_message(client, msg)
 
     except Exception as e:
-        print(f"Error con jugador {player_id}: {e}")
+        print(f"Error con jugador {client.player_id}: {e}")
     finally:
         # Limpieza cuando el cliente se desconecta
-        with lock:
-            if player_id in game_state["players"]:
-                del game_state["players"][player_id]
-                game_state["num_players"] = len(game_state["players"])
-        conn.close()
-        print(f"Jugador {player_id} desconectado")
-        broadcast_state()
+        unregister_player(client)
+
+
+async def handle_client_async(reader, writer):
+    """
+    Maneja la conexión de un cliente en el motor asyncio.
 
+    Argumentos:
+        reader: asyncio.StreamReader de la conexión
+        writer: asyncio.StreamWriter de la conexión
 
-def start_server_thread():
+    Tiene la misma semántica que handle_client, pero todas las
+    conexiones comparten un único thread y un event loop.
     """
-    Inicia el servidor en un hilo separado.
+    client = AsyncClientConnection(reader, writer)
+    reader = AsyncCountingReader(reader, client)
+    client.start_writer()
+    try:
+        join_msg = await read_message_async(reader)
+        if join_msg is None:
+            return
+        if accept_join(client, join_msg) is None:
+            print(f"Sala llena, conexión rechazada desde {client.addr}")
+            return
+
+        while True:
+            try:
+                msg = await read_message_async(reader)
+            except (ValueError, struct.error):
+                continue
+            if msg is None:
+                break
+            handle_message(client, msg)
+
+    except Exception as e:
+        print(f"Error con jugador {client.player_id}: {e}")
+    finally:
+        unregister_player(client)
+
+
+def start_udp_thread():
+    """
+    Abre el socket UDP de posiciones y lo atiende en un thread (motor con threads).
+    """
+    global udp_transport
+
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_socket.bind((HOST, UDP_PORT or PORT))
+    udp_transport = udp_socket
+    threading.Thread(target=udp_loop, args=(udp_socket,), daemon=True).start()
+
+
+def start_server_thread(channel=None):
+    """
+    Inicia el servidor en un hilo separado (motor con threads).
+
+    Argumentos:
+        channel: Socket por el que llegan las conexiones en el modo
+                 multiproceso, o None para escuchar en HOST:PORT
 
     Crea un socket TCP, lo configura para escuchar conexiones
     y acepta clientes en un loop infinito. Cada cliente se maneja
-    en su propio thread.
+    en su propio thread. También arranca el tick del servidor, que es
+    el único que envía el estado a los clientes.
     """
+    # Iniciamos el loop de ticks a frecuencia fija
+    threading.Thread(target=tick_loop, args=(TICK_RATE,), daemon=True).start()
+
+    if UDP_ENABLED:
+        start_udp_thread()
+
+    if channel is not None:
+        # Modo multiproceso: el proceso principal nos pasa las conexiones
+        while True:
+            conn = receive_connection(channel)
+            if conn is None:
+                break  # El proceso principal terminó
+            try:
+                client = ClientConnection(conn, conn.getpeername())
+            except OSError:
+                conn.close()  # El cliente se fue antes de llegar a este proceso
+                continue
+            threading.Thread(target=handle_client, args=(client,), daemon=True).start()
+        return
+
     # Creamos el socket TCP
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     # Permitimos reusar la dirección inmediatamente después de cerrar
     server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     # Vinculamos el socket al host y puerto
     server.bind((HOST, PORT))
-    # Empezamos a escuchar conexiones (cola de hasta MAX_PLAYERS)
-    server.listen(MAX_PLAYERS)
+    # Empezamos a escuchar conexiones
+    server.listen(LISTEN_BACKLOG)
     print(f"Servidor iniciado en {HOST}:{PORT}")
     print(f"Esperando hasta {MAX_PLAYERS} jugadores...")
 
     # Loop infinito para aceptar clientes
     while True:
         conn, addr = server.accept()  # Bloquea hasta que llegue un cliente
-        with lock:
-            clients.append(conn)  # Agregamos el cliente a la lista
+        client = ClientConnection(conn, addr)
         # Creamos un thread daemon para manejar este cliente
-        threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
+        threading.Thread(target=handle_client, args=(client,), daemon=True).start()
 
 
-def draw_gradient_background(screen, color1, color2):
+def udp_loop(udp_socket):
     """
-    Dibuja un fondo con gradiente vertical.
+    Recibe datagramas UDP en un thread separado (motor con threads).
 
     Argumentos:
-        screen: Superficie de pygame donde dibujar
-        color1: Color RGB superior del gradiente
-        color2: Color RGB inferior del gradiente
+        udp_socket: Socket UDP ya vinculado al puerto del servidor
+    """
+    while True:
+        try:
+            data, addr = udp_socket.recvfrom(2048)
+        except OSError:
+            continue  # Por ejemplo, un ICMP de un cliente que ya se fue
+        handle_datagram(data, addr)
 
-    Dibuja líneas horizontales interpolando entre los dos colores
-    para crear un efecto de gradiente suave.
+
+class UdpServerProtocol(asyncio.DatagramProtocol):
+    """
+    Recibe los datagramas UDP en el motor asyncio.
     """
-    height = screen.get_height()
-    for y in range(height):
-        # Calculamos cuánto se mezcla el color inicial con el final (de 0 a 1)
-        ratio = y / height
-        # Combinamos cada componente RGB
-        r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-        g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-        b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-        # Dibujamos una línea horizontal con el color interpolado
-        pygame.draw.line(screen, (r, g, b), (0, y), (screen.get_width(), y))
 
+    def datagram_received(self, data, addr):
+        handle_datagram(data, addr)
 
-def draw_panel(screen, rect, color=(30, 35, 55), alpha=220):
+
+async def serve_async(channel=None):
     """
-    Dibuja un panel decorativo con sombra y bordes redondeados.
+    Corrutina principal del motor asyncio.
 
     Argumentos:
-        screen: Superficie donde dibujar
-        rect: Rectángulo que define la posición y tamaño del panel
-        color: Color RGB del panel
-        alpha: Transparencia del panel (0-255)
+        channel: Socket por el que llegan las conexiones en el modo
+                 multiproceso, o None para escuchar en HOST:PORT
 
-    Crea un efecto visual moderno con sombra, transparencia y bordes brillantes.
+    Escucha conexiones con asyncio.start_server y corre el tick del
+    servidor como una tarea más del mismo event loop.
     """
-    # Dibujamos la sombra (un poco más grande que el panel)
-    shadow_rect = rect.copy()
-    shadow_rect.inflate_ip(8, 8)  # Agrandamos 8 píxeles en cada dirección
-    shadow_surf = pygame.Surface(shadow_rect.size, pygame.SRCALPHA)
-    pygame.draw.rect(shadow_surf, (0, 0, 0, 60), shadow_surf.get_rect(), border_radius=20)
-    screen.blit(shadow_surf, shadow_rect)
+    global udp_transport
+
+    loop = asyncio.get_running_loop()
+    if UDP_ENABLED:
+        udp_transport, _ = await loop.create_datagram_endpoint(
+            UdpServerProtocol, local_addr=(HOST, UDP_PORT or PORT))
+
+    tick_task = asyncio.create_task(tick_loop_async(TICK_RATE))
+
+    if channel is not None:
+        # Modo multiproceso: el proceso principal nos pasa las conexiones
+        await receive_connections_async(channel)
+        tick_task.cancel()
+        return
 
-    # Dibujamos el panel principal con transparencia
-    panel_surf = pygame.Surface(rect.size, pygame.SRCALPHA)
-    pygame.draw.rect(panel_surf, (*color, alpha), panel_surf.get_rect(), border_radius=20)
-    screen.blit(panel_surf, rect)
+    server = await asyncio.start_server(handle_client_async, HOST, PORT,
+                                        reuse_address=True, backlog=LISTEN_BACKLOG)
+    print(f"Servidor asyncio iniciado en {HOST}:{PORT}")
+    print(f"Esperando hasta {MAX_PLAYERS} jugadores...")
 
-    # Dibujamos un borde brillante
-    pygame.draw.rect(screen, (100, 120, 180, 150), rect, 2, border_radius=20)
+    async with server:
+        await server.serve_forever()
+    tick_task.cancel()
 
 
-def draw_button(screen, rect, text, font, hovered, active=True):
+async def receive_connections_async(channel):
+    """
+    Atiende las conexiones que llegan por el canal del proceso principal
+    (motor asyncio en el modo multiproceso). Termina cuando el canal se cierra.
     """
-    Dibuja un botón moderno con efectos visuales.
+    loop = asyncio.get_running_loop()
+    closed = loop.create_future()
+
+    def on_readable():
+        # Solo este proceso lee del canal: si está listo, recv_fds no bloquea
+        conn = receive_connection(channel)
+        if conn is None:
+            loop.remove_reader(channel.fileno())
+            if not closed.done():
+                closed.set_result(None)
+            return
+        asyncio.create_task(handle_connection_async(conn))
+
+    loop.add_reader(channel.fileno(), on_readable)
+    await closed
+
+
+async def handle_connection_async(conn):
+    """
+    Atiende con asyncio un socket recibido del proceso principal.
+    """
+    reader, writer = await asyncio.open_connection(sock=conn)
+    await handle_client_async(reader, writer)
+
+
+def start_async_server_thread(channel=None):
+    """
+    Inicia el servidor con el motor asyncio (para correr en un hilo separado).
 
     Argumentos:
-        screen: Superficie donde dibujar
-        rect: Rectángulo del botón
-        text: Texto a mostrar en el botón
-        font: Fuente de pygame para el texto
-        hovered: Boolean que indica si el mouse está sobre el botón
-        active: Boolean que indica si el botón está activo
-
-    Cambia de color según el estado (hover, activo/inactivo) y
-    agrega efectos de sombra y bordes.
-    """
-    # Definimos colores según el estado del botón
-    if not active:
-        color = (80, 80, 100)  # Gris si está inactivo
-        border_color = (120, 120, 140)
-    else:
-        # Verde más brillante si está en hover
-        color = (80, 220, 150) if hovered else (60, 180, 120)
-        border_color = (255, 255, 255) if hovered else (200, 200, 200)
+        channel: Socket de conexiones en el modo multiproceso (opcional)
+    """
+    asyncio.run(serve_async(channel))
+
+
+# Motores de red disponibles: nombre -> función que corre el servidor
+ENGINES = {
+    "threaded": start_server_thread,
+    "asyncio": start_async_server_thread,
+}
 
-    # Dibujamos sombra del botón
-    shadow_rect = rect.copy()
-    shadow_rect.y += 4  # Desplazamos la sombra hacia abajo
-    pygame.draw.rect(screen, (0, 0, 0, 100), shadow_rect, border_radius=15)
 
-    # Dibujamos el botón principal
-    pygame.draw.rect(screen, color, rect, border_radius=15)
+def receive_connection(channel):
+    """
+    Recibe un socket de cliente enviado por el proceso principal.
 
-    # Dibujamos el borde
-    pygame.draw.rect(screen, border_color, rect, 4, border_radius=15)
+    Argumentos:
+        channel: Socket Unix compartido con el proceso principal
 
-    # Renderizamos y centramos el texto
-    text_surf = font.render(text, True, (255, 255, 255))
-    text_rect = text_surf.get_rect(center=rect.center)
-    screen.blit(text_surf, text_rect)
+    Devuelve:
+        socket o None: Conexión del cliente, o None si el canal se cerró
+    """
+    try:
+        msg, fds, _flags, _addr = socket.recv_fds(channel, 1, 1)
+    except OSError:
+        return None
+    if not msg or not fds:
+        return None
+    conn = socket.socket(fileno=fds[0])
+    conn.setblocking(True)  # El proceso principal lo usó en modo no bloqueante
+    return conn
 
 
-def draw_status_indicator(screen, x, y, status):
+def build_worker_report(index):
     """
-    Dibuja un indicador de estado con color pulsante.
+    Arma el reporte que un proceso de salas envía al proceso principal.
 
     Argumentos:
-        screen: Superficie donde dibujar
-        x, y: Coordenadas del centro del indicador
-        status: Estado actual ("waiting", "ready", "running", "finished")
-
-    Muestra un círculo de color que pulsa para indicar el estado del servidor.
-    """
-    # Mapeamos cada estado a un color específico
-    colors = {
-        "waiting": (255, 200, 100),  # Naranja - esperando
-        "ready": (100, 200, 255),  # Azul - listo
-        "running": (100, 255, 150),  # Verde - corriendo
-        "finished": (255, 100, 100)  # Rojo - terminado
-    }
+        index: Número del proceso
+
+    Devuelve:
+        dict: Mensajes recibidos, por cada sala su estado y si empezó,
+              contadores de las colas de salida y métricas
+    """
+    with rooms_lock:
+        active_rooms = list(rooms.values())
+    report = []
+    for room in active_rooms:
+        with room.lock:
+            report.append({"name": room.name, "game_started": room.game_started,
+                           "game_state": room.build_snapshot()})
+    return {"worker": index, "messages": messages_received, "rooms": report,
+            "outbound": get_outbound_stats(), "metrics": registry.snapshot()}
+
+
+def worker_control_loop(index, control):
+    """
+    Canal de control de un proceso de salas: envía un reporte cada
+    REPORT_INTERVAL segundos y ejecuta los comandos del proceso principal
+    (por ejemplo, iniciar una partida desde la GUI).
 
-    color = colors.get(status, (150, 150, 150))  # Gris por defecto
+    Argumentos:
+        index: Número del proceso
+        control: multiprocessing.Connection con el proceso principal
+    """
+    next_report = time.monotonic()
+    try:
+        while True:
+            if control.poll(max(0, next_report - time.monotonic())):
+                command = control.recv()
+                if command.get("command") == "start":
+                    with rooms_lock:
+                        room = rooms.get(command.get("room"))
+                    if room is not None and room.start():
+                        print(f"¡Juego iniciado en la sala {room.name}!")
+                continue
 
-    # Calculamos el efecto de pulso usando el tiempo
-    pulse = 1 + 0.2 * abs((pygame.time.get_ticks() / 500) % 2 - 1)
-    radius = int(8 * pulse)
+            control.send(build_worker_report(index))
+            next_report = time.monotonic() + REPORT_INTERVAL
+    except (EOFError, OSError):
+        # El proceso principal terminó: este proceso no tiene a quién reportar
+        os._exit(0)
 
-    # Dibujamos el círculo con el color correspondiente
-    pygame.draw.circle(screen, color, (x, y), radius)
-    # Dibujamos el borde blanco
-    pygame.draw.circle(screen, (255, 255, 255), (x, y), radius, 2)
 
+def run_worker(index, channel, control, engine, host, port, tick_rate, auto_start):
+    """
+    Punto de entrada de un proceso de salas (modo multiproceso).
 
-def run_server_gui():
+    Argumentos:
+        index: Número del proceso
+        channel: Socket Unix por el que llegan las conexiones
+        control: multiprocessing.Connection para reportes y comandos
+        engine: Motor de red a usar ("threaded" o "asyncio")
+        host, port, tick_rate, auto_start: Configuración del proceso principal
+
+    Cada proceso usa su propio puerto UDP (PORT + 1 + index), que se
+    informa al cliente en el welcome, y su propio prefijo para las salas
+    automáticas.
     """
-    Ejecuta la interfaz gráfica del servidor
+    global HOST, PORT, TICK_RATE, AUTO_START, UDP_PORT, AUTO_ROOM_PREFIX
 
-    Esta función crea una ventana de pygame que muestra:
-    - Estado del servidor
-    - Jugadores conectados
-    - Botón para iniciar el juego
-    - Información en tiempo real
+    HOST, PORT, TICK_RATE, AUTO_START = host, port, tick_rate, auto_start
+    UDP_PORT = port + 1 + index
+    AUTO_ROOM_PREFIX = f"w{index}-room-"  # Nombres únicos entre procesos
+    threading.Thread(target=worker_control_loop, args=(index, control), daemon=True).start()
+    ENGINES[engine](channel)
 
-    Es el loop principal de la GUI del servidor.
+
+def collect_reports(index, control):
     """
-    global game_started
+    Recibe los reportes de un proceso de salas (en el proceso principal).
 
-    # Inicializamos pygame y creamos la ventana
-    pygame.init()
-    screen = pygame.display.set_mode((800, 600))
-    pygame.display.set_caption("Space Shooter Server")
-    clock = pygame.time.Clock()
+    Argumentos:
+        index: Número del proceso
+        control: multiprocessing.Connection con el proceso
+    """
+    while True:
+        try:
+            report = control.recv()
+        except (EOFError, OSError):
+            print(f"El proceso de salas {index} terminó")
+            worker_reports.pop(index, None)
+            return
+        worker_reports[index] = report
 
-    # Cargamos diferentes fuentes para la interfaz
-    title_font = pygame.font.Font(None, 70)
-    font = pygame.font.Font(None, 45)
-    small_font = pygame.font.Font(None, 32)
-    info_font = pygame.font.Font(None, 28)
 
-    # Definimos el rectángulo del botón de inicio
-    start_button_rect = pygame.Rect(250, 480, 300, 80)
+def get_worker_stats():
+    """
+    Devuelve la cantidad de salas y jugadores de cada proceso.
 
-    # Creamos partículas decorativas para el fondo
-    particles = []
-    for i in range(20):
-        particles.append({
-            "x": (i * 40) % 800,
-            "y": (i * 30) % 600,
-            "speed": 20 + (i % 5) * 10  # Velocidades variadas
+    Devuelve:
+        list: Diccionarios con "worker", "rooms", "players" y "messages",
+              ordenados por número de proceso (vacía si no hay procesos)
+    """
+    stats = []
+    for index, report in sorted(worker_reports.items()):
+        stats.append({
+            "worker": index,
+            "rooms": len(report["rooms"]),
+            "players": sum(room["game_state"]["num_players"] for room in report["rooms"]),
+            "messages": report["messages"]
         })
+    return stats
 
-    running = True
-    animation_time = 0  # Tiempo para animaciones
-
-    # Loop principal de la GUI
-    while running:
-        dt = clock.tick(60) / 1000  # Delta time en segundos
-        animation_time += dt
-
-        mouse_pos = pygame.mouse.get_pos()
-        button_hovered = start_button_rect.collidepoint(mouse_pos)
-
-        # Procesamos eventos
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Si dan click en el botón y hay suficientes jugadores
-                if button_hovered and game_state["num_players"] >= MIN_PLAYERS and not game_started:
-                    with lock:
-                        game_state["status"] = "running"
-                        game_started = True
-                    broadcast_state()
-                    print("¡Juego iniciado!")
-
-        # Dibujamos el fondo con gradiente
-        draw_gradient_background(screen, (20, 25, 40), (40, 45, 70))
-
-        # Animamos las partículas de fondo
-        for particle in particles:
-            particle["y"] = (particle["y"] + particle["speed"] * dt) % 600
-            size = 2 + (particle["speed"] // 20)
-            alpha = 150
-            pygame.draw.circle(screen, (255, 255, 255, alpha),
-                               (int(particle["x"]), int(particle["y"])), size)
-
-        # Dibujamos el panel principal
-        main_panel_rect = pygame.Rect(50, 50, 700, 380)
-        draw_panel(screen, main_panel_rect, (30, 35, 55), 240)
-
-        # Dibujamos el título con efecto de sombra
-        title = title_font.render("SERVER CONTROL", True, (100, 200, 255))
-        title_shadow = title_font.render("SERVER CONTROL", True, (50, 100, 150))
-        title_rect = title.get_rect(center=(400, 100))
-        screen.blit(title_shadow, title_rect.move(3, 3))  # Sombra desplazada
-        screen.blit(title, title_rect)
-
-        # Panel de información del servidor
-        server_panel_rect = pygame.Rect(80, 150, 640, 60)
-        draw_panel(screen, server_panel_rect, (40, 50, 80), 200)
-
-        server_info = info_font.render(f"Host: {HOST}:{PORT}", True, (200, 220, 255))
-        screen.blit(server_info, (100, 165))
-
-        # Indicador de estado del servidor
-        status = game_state.get("status", "waiting")
-        draw_status_indicator(screen, 620, 180, status)
-
-        # Texto del estado
-        status_texts = {
-            "waiting": "Waiting",
-            "ready": "Ready",
-            "running": "Running",
-            "finished": "Finished"
-        }
-        status_text = info_font.render(status_texts.get(status, "Unknown"), True, (220, 220, 220))
-        screen.blit(status_text, (640, 165))
-
-        # Contador de jugadores
-        num_players = game_state.get("num_players", 0)
-        players_panel_rect = pygame.Rect(80, 230, 640, 60)
-        draw_panel(screen, players_panel_rect, (50, 40, 80), 200)
-
-        players_text = font.render(f"Players: {num_players}/{MAX_PLAYERS}", True, (255, 255, 255))
-        screen.blit(players_text, (100, 240))
-
-        # Barra de progreso de jugadores
-        progress_width = 200
-        progress_rect = pygame.Rect(450, 245, progress_width, 30)
-        pygame.draw.rect(screen, (40, 40, 60), progress_rect, border_radius=15)
-
-        if num_players > 0:
-            # Calculamos el ancho de la barra según jugadores conectados
-            filled_width = int((num_players / MAX_PLAYERS) * progress_width)
-            filled_rect = pygame.Rect(450, 245, filled_width, 30)
-
-            # Color verde si hay suficientes jugadores, naranja si no
-            if num_players >= MIN_PLAYERS:
-                color = (100, 255, 150)
-            else:
-                color = (255, 200, 100)
 
-            pygame.draw.rect(screen, color, filled_rect, border_radius=15)
+def peek_join(conn):
+    """
+    Lee el join de una conexión sin sacarlo del socket.
+
+    Argumentos:
+        conn: Socket no bloqueante del cliente
 
-        pygame.draw.rect(screen, (100, 120, 150), progress_rect, 2, border_radius=15)
+    Devuelve:
+        dict o None: Mensaje de join, o None si todavía no llegó completo
 
-        # Lista de jugadores conectados
-        if game_state.get("players"):
-            players_list_panel = pygame.Rect(80, 310, 640, 110)
-            draw_panel(screen, players_list_panel, (40, 45, 70), 200)
+    Lanza ValueError si la conexión se cerró o el join no es válido. El
+    join siempre es una línea JSON (el protocolo se negocia en el welcome).
+    """
+    try:
+        data = conn.recv(MAX_JOIN_SIZE, socket.MSG_PEEK)
+    except BlockingIOError:
+        return None
+    except OSError as e:
+        raise ValueError(e)
+    if not data:
+        raise ValueError("conexión cerrada")
+
+    line, newline, _rest = data.partition(b"\n")
+    if not newline:
+        if len(data) >= MAX_JOIN_SIZE:
+            raise ValueError("join demasiado largo")
+        return None
+    msg = json.loads(line)
+    if not isinstance(msg, dict):
+        raise ValueError("join inválido")
+    return msg
+
+
+def start_prefork_server(engine=ENGINE, workers=WORKERS):
+    """
+    Inicia el servidor en modo multiproceso.
 
-            list_title = small_font.render("Jugadores conectados:", True, (180, 200, 255))
-            screen.blit(list_title, (100, 320))
+    Argumentos:
+        engine: Motor de red de cada proceso ("threaded" o "asyncio")
+        workers: Cantidad de procesos de salas
+
+    El proceso principal solo acepta conexiones: espera el join de cada
+    cliente (sin consumirlo), elige el proceso dueño de la sala y le pasa
+    el socket. Las salas con nombre siempre van al mismo proceso (hash del
+    nombre); las automáticas se reparten de a MAX_PLAYERS jugadores, así
+    se llenan dentro de un mismo proceso. Cada proceso tiene su propio GIL,
+    así que el servidor aprovecha todos los núcleos.
+    """
+    # Los procesos se crean antes de abrir el puerto para que no lo hereden
+    context = multiprocessing.get_context("spawn")
+    channels = []
+    for index in range(workers):
+        parent_channel, child_channel = socket.socketpair()
+        parent_control, child_control = context.Pipe()
+        context.Process(target=run_worker, daemon=True,
+                        args=(index, child_channel, child_control, engine,
+                              HOST, PORT, TICK_RATE, AUTO_START)).start()
+        child_channel.close()
+        child_control.close()
+        channels.append(parent_channel)
+        worker_controls.append(parent_control)
+        threading.Thread(target=collect_reports, args=(index, parent_control), daemon=True).start()
 
-            y_offset = 355
-            x_offset = 120
-            col = 0
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((HOST, PORT))
+    server.listen(LISTEN_BACKLOG)
+    print(f"Servidor iniciado en {HOST}:{PORT} con {workers} procesos ({engine})")
 
-            # Mostramos cada jugador con su info
-            for player_id, pdata in game_state.get("players", {}).items():
-                username = pdata.get("username", f"Player{player_id}")
-                lives = pdata.get("lives", 3)
-                score = pdata.get("score", 0)
-                alive = pdata.get("alive", True)
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    pending = {}  # Conexiones esperando el join: socket -> límite de tiempo
+    partial = set()  # Conexiones con un join incompleto (se revisan en cada vuelta)
+    auto_joins = 0  # Joins sin sala elegida, para repartirlos entre procesos
 
-                # Color según si está vivo o muerto
-                if alive:
-                    name_color = (150, 255, 150)  # Verde
-                    icon = "●"  # Círculo lleno
-                else:
-                    name_color = (255, 100, 100)  # Rojo
-                    icon = "○"  # Círculo vacío
+    while True:
+        ready = [key.fileobj for key, _events in selector.select(0.05 if partial else 1)]
+        now = time.monotonic()
+
+        for conn in ready + list(partial):
+            if conn is server:
+                conn, _addr = server.accept()
+                conn.setblocking(False)
+                pending[conn] = now + JOIN_TIMEOUT
+                selector.register(conn, selectors.EVENT_READ)
+                continue
+            if conn not in pending:
+                continue
 
-                player_text = info_font.render(f"{icon} {username}", True, name_color)
-                screen.blit(player_text, (x_offset, y_offset))
+            try:
+                join_msg = peek_join(conn)
+            except ValueError:
+                join_msg = False  # Conexión cerrada o join inválido
+
+            if join_msg is None and now < pending[conn]:
+                if conn not in partial:
+                    # Sacamos el socket del selector para no girar en vacío
+                    selector.unregister(conn)
+                    partial.add(conn)
+                continue
 
-                stats_text = info_font.render(f"({score} pts, {lives})", True, (200, 200, 200))
-                screen.blit(stats_text, (x_offset + 150, y_offset))
+            if conn in partial:
+                partial.discard(conn)
+            else:
+                selector.unregister(conn)
+            del pending[conn]
 
-                # Organizamos en dos columnas
-                col += 1
-                if col % 2 == 0:
-                    y_offset += 35
-                    x_offset = 120
+            if join_msg:
+                name = room_name(join_msg)
+                if name is not None:
+                    index = zlib.crc32(name.encode()) % workers
                 else:
-                    x_offset = 420
-
-        # Botón de inicio o mensaje de estado según la situación
-        if game_state["num_players"] >= MIN_PLAYERS and not game_started:
-            draw_button(screen, start_button_rect, "Iniciando", font, button_hovered, True)
-        elif game_state["status"] == "Corriendo":
-            status_panel = pygame.Rect(250, 480, 300, 80)
-            draw_panel(screen, status_panel, (50, 150, 100), 220)
-            status_msg = small_font.render("Jugando...", True, (150, 255, 150))
-            status_rect = status_msg.get_rect(center=status_panel.center)
-            screen.blit(status_msg, status_rect)
-        elif game_state["status"] == "Terminado":
-            status_panel = pygame.Rect(250, 480, 300, 80)
-            draw_panel(screen, status_panel, (150, 50, 50), 220)
-            status_msg = small_font.render("Juego terminado", True, (255, 150, 150))
-            status_rect = status_msg.get_rect(center=status_panel.center)
-            screen.blit(status_msg, status_rect)
-        else:
-            status_panel = pygame.Rect(200, 480, 400, 80)
-            draw_panel(screen, status_panel, (80, 80, 100), 220)
+                    index = (auto_joins // MAX_PLAYERS) % workers
+                    auto_joins += 1
+                try:
+                    socket.send_fds(channels[index], [b"c"], [conn.fileno()])
+                except OSError as e:
+                    print(f"No se pudo pasar la conexión al proceso {index}: {e}")
+            conn.close()
+
+        # Cerramos las conexiones que nunca enviaron el join
+        for conn, deadline in list(pending.items()):
+            if now >= deadline and conn not in partial:
+                selector.unregister(conn)
+                del pending[conn]
+                conn.close()
 
-            # Mensaje según cuántos jugadores faltan
-            if num_players == 0:
-                msg = "Esperando jugadores..."
-            else:
-                msg = f"Necesita {MIN_PLAYERS - num_players} mas jugador(es)"
 
-            status_msg = small_font.render(msg, True, (200, 200, 200))
-            status_rect = status_msg.get_rect(center=status_panel.center)
+def get_status():
+    """
+    Devuelve una línea de texto con el estado del servidor.
+    """
+    room_list = get_rooms()
+    players = sum(room.game_state["num_players"] for room in room_list)
+    running = sum(1 for room in room_list if room.game_state["status"] == "running")
+    worker_stats = get_worker_stats()
+    if worker_stats:
+        messages = sum(stats["messages"] for stats in worker_stats)
+    else:
+        messages = messages_received
+    outbound = get_outbound_stats()
+    return (f"salas: {len(room_list)}, en juego: {running}, jugadores: {players}, "
+            f"mensajes: {messages}, snapshots descartados: {outbound['dropped_snapshots']}, "
+            f"clientes lentos: {outbound['slow_disconnects']}")
+
+
+def collect_client_metric(value):
+    """
+    Calcula un valor de cada cliente conectado a las salas de este proceso.
+
+    Argumentos:
+        value: Función que recibe un ClientConnection y devuelve el valor
+
+    Devuelve:
+        dict: (sala, ID del jugador) -> valor
+    """
+    with rooms_lock:
+        active_rooms = list(rooms.values())
+    values = {}
+    for room in active_rooms:
+        with room.lock:
+            for client in room.clients:
+                values[(room.name, str(client.player_id))] = value(client)
+    return values
+
+
+registry.callback("space_shooter_client_received_bytes_total",
+                  "Bytes recibidos de cada cliente conectado (TCP y UDP)", "counter",
+                  ("room", "player"), lambda: collect_client_metric(lambda c: c.bytes_in))
+registry.callback("space_shooter_client_sent_bytes_total",
+                  "Bytes enviados a cada cliente conectado (TCP y UDP)", "counter",
+                  ("room", "player"), lambda: collect_client_metric(lambda c: c.bytes_out))
+registry.callback("space_shooter_client_outbound_queue_depth",
+                  "Mensajes en la cola de salida de cada cliente conectado", "gauge",
+                  ("room", "player"), lambda: collect_client_metric(lambda c: c.outbound.depth()))
+registry.callback("space_shooter_dropped_snapshots_total",
+                  "Snapshots descartados por colas de salida llenas", "counter", (),
+                  lambda: {(): outbound_stats.dropped_snapshots})
+registry.callback("space_shooter_slow_disconnects_total",
+                  "Clientes desconectados por no poder recibir", "counter", (),
+                  lambda: {(): outbound_stats.slow_disconnects})
+
+
+def render_metrics():
+    """
+    Devuelve las métricas en el formato de texto de Prometheus.
+
+    En el modo multiproceso incluye las de cada proceso de salas (del
+    último reporte), con la etiqueta worker.
+    """
+    extra = [({"worker": str(index)}, report["metrics"])
+             for index, report in sorted(worker_reports.items()) if "metrics" in report]
+    return registry.render(extra)
+
+
+def run_admin_command(line):
+    """
+    Ejecuta un comando de administración y devuelve la respuesta.
+
+    Argumentos:
+        line: Línea con el comando, por ejemplo "start room-1"
+
+    Comandos:
+        status: Resumen del servidor
+        rooms: Una línea por sala con su estado y sus jugadores
+        start <sala>: Inicia la partida de una sala
+        start all: Inicia todas las salas con jugadores suficientes
+        metrics: Métricas en el formato de texto de Prometheus
+    """
+    words = line.split()
+    if not words:
+        return ""
+    command = words[0].lower()
+
+    if command == "status":
+        return get_status()
+
+    if command == "metrics":
+        return render_metrics()
+
+    if command == "rooms":
+        lines = [f"{room.name}: {room.game_state['status']}, "
+                 f"{room.game_state['num_players']}/{MAX_PLAYERS} jugadores"
+                 for room in get_rooms()]
+        return "\n".join(lines) or "No hay salas"
+
+    if command == "start" and len(words) == 2:
+        room_list = get_rooms()
+        if words[1] != "all":
+            room_list = [room for room in room_list if room.name == words[1]]
+            if not room_list:
+                return f"No existe la sala {words[1]}"
+        started = [room.name for room in room_list if room.start()]
+        for name in started:
+            print(f"¡Juego iniciado en la sala {name}!")
+        if not started:
+            return "Ninguna sala pudo iniciarse (faltan jugadores o ya empezó)"
+        return "Iniciadas: " + ", ".join(started)
+
+    return "Comandos: status, rooms, start <sala>, start all, metrics"
+
+
+class AdminHandler(socketserver.StreamRequestHandler):
+    """
+    Atiende una conexión al socket de administración: una línea de
+    comando por vez, con la respuesta terminada en una línea vacía.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            response = run_admin_command(line.decode("utf-8", "replace"))
+            self.wfile.write(response.encode() + b"\n\n")
+
+
+def start_admin_server(port):
+    """
+    Abre el socket de administración local en un thread separado.
 
-            # Texto parpadeante
-            if pygame.time.get_ticks() % 1000 < 500:
-                screen.blit(status_msg, status_rect)
+    Argumentos:
+        port: Puerto TCP (solo escucha en ADMIN_HOST)
+
+    Se puede usar, por ejemplo, con: printf 'start all\n' | nc 127.0.0.1 5560
+    """
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    admin_server = socketserver.ThreadingTCPServer((ADMIN_HOST, port), AdminHandler)
+    admin_server.daemon_threads = True
+    threading.Thread(target=admin_server.serve_forever, daemon=True).start()
+    print(f"Administración en {ADMIN_HOST}:{port}")
+
+
+def read_stdin_commands():
+    """
+    Lee comandos de administración de la entrada estándar (modo headless).
+
+    Termina sin error si la entrada estándar se cierra, por ejemplo al
+    correr como servicio.
+    """
+    for line in sys.stdin:
+        response = run_admin_command(line)
+        if response:
+            print(response)
 
-        pygame.display.update()
 
-    pygame.quit()
+def run_headless():
+    """
+    Loop principal del servidor sin interfaz gráfica.
+
+    Imprime una línea de estado cada STATUS_INTERVAL segundos. Las
+    partidas se inician con los comandos de la entrada estándar o del
+    socket de administración, o solas con AUTO_START.
+    """
+    threading.Thread(target=read_stdin_commands, daemon=True).start()
+    print("Modo headless. Comandos: status, rooms, start <sala>, start all, metrics")
+    while True:
+        time.sleep(STATUS_INTERVAL)
+        print(f"[{time.strftime('%H:%M:%S')}] {get_status()}", flush=True)
 
 
 # Punto de entrada del programa
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de Space Shooter")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=ENGINE,
+                        help="Motor de red (por defecto: %(default)s)")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE,
+                        help="Ticks por segundo (por defecto: %(default)s)")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Procesos de salas, por ejemplo uno por núcleo (por defecto: %(default)s)")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS,
+                        help="Sin interfaz gráfica (también con SPACE_SHOOTER_HEADLESS=1)")
+    parser.add_argument("--auto-start", type=float, default=AUTO_START, metavar="SEGUNDOS",
+                        help="Inicia cada sala sola tras SEGUNDOS con jugadores suficientes")
+    parser.add_argument("--admin-port", type=int, default=ADMIN_PORT,
+                        help=f"Puerto del socket de administración local en {ADMIN_HOST}")
+    parser.add_argument("--status-interval", type=float, default=STATUS_INTERVAL,
+                        help="Segundos entre líneas de estado en modo headless (por defecto: %(default)s)")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="Puerto del endpoint HTTP de métricas (formato Prometheus) "
+                             "en 127.0.0.1")
+    parser.add_argument("--metrics-log", default=METRICS_LOG, metavar="ARCHIVO",
+                        help="Archivo al que se agregan las métricas cada --metrics-interval segundos")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL,
+                        help="Segundos entre escrituras de --metrics-log (por defecto: %(default)s)")
+    args = parser.parse_args()
+    TICK_RATE = args.tick_rate
+    AUTO_START = args.auto_start
+    STATUS_INTERVAL = args.status_interval
+
     # Iniciamos el servidor en un thread separado para no bloquear la GUI
-    server_thread = threading.Thread(target=start_server_thread, daemon=True)
+    if args.workers > 1:
+        server_thread = threading.Thread(target=start_prefork_server,
+                                         args=(args.engine, args.workers), daemon=True)
+    else:
+        server_thread = threading.Thread(target=ENGINES[args.engine], daemon=True)
     server_thread.start()
 
-    # Ejecutamos la interfaz gráfica en el thread principal
-    run_server_gui()
+    if args.admin_port is not None:
+        start_admin_server(args.admin_port)
+    if args.metrics_port is not None:
+        start_http_server(render_metrics, args.metrics_port)
+    if args.metrics_log is not None:
+        start_log_dump(render_metrics, args.metrics_log, args.metrics_interval)
+
+    if args.headless:
+        run_headless()
+    else:
+        # La GUI (y pygame) solo se importan si se va a mostrar
+        from server_gui import run_server_gui
+        # Le pasamos este módulo: al correr como script se llama __main__
+        run_server_gui(sys.modules[__name__])
@@ -0,0 +1,321 @@
+"""
+Archivo con el panel de control gráfico del servidor.
+
+Se importa solo cuando el servidor corre con interfaz gráfica; en el
+modo headless (server.py --headless) pygame no se importa.
+"""
+
+import pygame
+from render_cache import draw_gradient_background, draw_panel
+from text_cache import render_text
+from assets import assets
+
+
+def draw_button(screen, rect, text, font, hovered, active=True):
+    """
+    Dibuja un botón moderno con efectos visuales.
+
+    Argumentos:
+        screen: Superficie donde dibujar
+        rect: Rectángulo del botón
+        text: Texto a mostrar en el botón
+        font: Fuente de pygame para el texto
+        hovered: Boolean que indica si el mouse está sobre el botón
+        active: Boolean que indica si el botón está activo
+
+    Cambia de color según el estado (hover, activo/inactivo) y
+    agrega efectos de sombra y bordes.
+    """
+    # Definimos colores según el estado del botón
+    if not active:
+        color = (80, 80, 100)  # Gris si está inactivo
+        border_color = (120, 120, 140)
+    else:
+        # Verde más brillante si está en hover
+        color = (80, 220, 150) if hovered else (60, 180, 120)
+        border_color = (255, 255, 255) if hovered else (200, 200, 200)
+
+    # Dibujamos sombra del botón
+    shadow_rect = rect.copy()
+    shadow_rect.y += 4  # Desplazamos la sombra hacia abajo
+    pygame.draw.rect(screen, (0, 0, 0, 100), shadow_rect, border_radius=15)
+
+    # Dibujamos el botón principal
+    pygame.draw.rect(screen, color, rect, border_radius=15)
+
+    # Dibujamos el borde
+    pygame.draw.rect(screen, border_color, rect, 4, border_radius=15)
+
+    # Renderizamos y centramos el texto
+    text_surf = render_text(font, text, True, (255, 255, 255))
+    text_rect = text_surf.get_rect(center=rect.center)
+    screen.blit(text_surf, text_rect)
+
+
+def draw_status_indicator(screen, x, y, status):
+    """
+    Dibuja un indicador de estado con color pulsante.
+
+    Argumentos:
+        screen: Superficie donde dibujar
+        x, y: Coordenadas del centro del indicador
+        status: Estado actual ("waiting", "ready", "running", "finished")
+
+    Muestra un círculo de color que pulsa para indicar el estado del servidor.
+    """
+    # Mapeamos cada estado a un color específico
+    colors = {
+        "waiting": (255, 200, 100),  # Naranja - esperando
+        "ready": (100, 200, 255),  # Azul - listo
+        "running": (100, 255, 150),  # Verde - corriendo
+        "finished": (255, 100, 100)  # Rojo - terminado
+    }
+
+    color = colors.get(status, (150, 150, 150))  # Gris por defecto
+
+    # Calculamos el efecto de pulso usando el tiempo
+    pulse = 1 + 0.2 * abs((pygame.time.get_ticks() / 500) % 2 - 1)
+    radius = int(8 * pulse)
+
+    # Dibujamos el círculo con el color correspondiente
+    pygame.draw.circle(screen, color, (x, y), radius)
+    # Dibujamos el borde blanco
+    pygame.draw.circle(screen, (255, 255, 255), (x, y), radius, 2)
+
+
+def run_server_gui(server):
+    """
+    Ejecuta la interfaz gráfica del servidor
+
+    Argumentos:
+        server: Módulo del servidor ya iniciado (con las salas y la
+                configuración que se muestran)
+
+    Esta función crea una ventana de pygame que muestra:
+    - Estado del servidor
+    - Jugadores conectados
+    - Botón para iniciar el juego
+    - Información en tiempo real
+
+    Muestra una sala a la vez; con las flechas izquierda y derecha se
+    cambia de sala. Es el loop principal de la GUI del servidor.
+    """
+    # Inicializamos pygame y creamos la ventana
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("Space Shooter Server")
+    clock = pygame.time.Clock()
+
+    # Cargamos diferentes fuentes para la interfaz
+    title_font = assets.font(70, None)
+    font = assets.font(45, None)
+    small_font = assets.font(32, None)
+    info_font = assets.font(28, None)
+
+    # Definimos el rectángulo del botón de inicio
+    start_button_rect = pygame.Rect(250, 480, 300, 80)
+
+    # Creamos partículas decorativas para el fondo
+    particles = []
+    for i in range(20):
+        particles.append({
+            "x": (i * 40) % 800,
+            "y": (i * 30) % 600,
+            "speed": 20 + (i % 5) * 10  # Velocidades variadas
+        })
+
+    running = True
+    animation_time = 0  # Tiempo para animaciones
+    selected_room = 0  # Índice de la sala que se muestra
+    empty_room = server.Room("-")  # Se muestra mientras no hay salas
+
+    # Loop principal de la GUI
+    while running:
+        dt = clock.tick(60) / 1000  # Delta time en segundos
+        animation_time += dt
+
+        mouse_pos = pygame.mouse.get_pos()
+        button_hovered = start_button_rect.collidepoint(mouse_pos)
+
+        # Sala seleccionada (si no hay ninguna mostramos una vacía)
+        room_list = server.get_rooms()
+        room = room_list[selected_room % len(room_list)] if room_list else empty_room
+        game_state = room.game_state
+        game_started = room.game_started
+
+        # Procesamos eventos
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                # Cambiamos la sala que se muestra
+                if event.key == pygame.K_RIGHT:
+                    selected_room += 1
+                elif event.key == pygame.K_LEFT:
+                    selected_room -= 1
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # Si dan click en el botón y hay suficientes jugadores
+                if button_hovered and room.start():
+                    print(f"¡Juego iniciado en la sala {room.name}!")
+
+        # Dibujamos el fondo con gradiente
+        draw_gradient_background(screen, (20, 25, 40), (40, 45, 70))
+
+        # Animamos las partículas de fondo
+        for particle in particles:
+            particle["y"] = (particle["y"] + particle["speed"] * dt) % 600
+            size = 2 + (particle["speed"] // 20)
+            alpha = 150
+            pygame.draw.circle(screen, (255, 255, 255, alpha),
+                               (int(particle["x"]), int(particle["y"])), size)
+
+        # Dibujamos el panel principal
+        main_panel_rect = pygame.Rect(50, 50, 700, 380)
+        draw_panel(screen, main_panel_rect, (30, 35, 55), 240)
+
+        # Dibujamos el título con efecto de sombra
+        title = render_text(title_font, "SERVER CONTROL", True, (100, 200, 255))
+        title_shadow = render_text(title_font, "SERVER CONTROL", True, (50, 100, 150))
+        title_rect = title.get_rect(center=(400, 100))
+        screen.blit(title_shadow, title_rect.move(3, 3))  # Sombra desplazada
+        screen.blit(title, title_rect)
+
+        # En el modo multiproceso mostramos las salas de cada proceso
+        worker_stats = server.get_worker_stats()
+        if worker_stats:
+            rooms_per_worker = ", ".join(str(stats["rooms"]) for stats in worker_stats)
+            workers_text = render_text(
+                info_font, f"{len(worker_stats)} procesos - salas por proceso: {rooms_per_worker}",
+                True, (180, 200, 255))
+            screen.blit(workers_text, workers_text.get_rect(center=(400, 135)))
+
+        # Panel de información del servidor
+        server_panel_rect = pygame.Rect(80, 150, 640, 60)
+        draw_panel(screen, server_panel_rect, (40, 50, 80), 200)
+
+        server_info = render_text(info_font, f"Host: {server.HOST}:{server.PORT}", True, (200, 220, 255))
+        screen.blit(server_info, (100, 165))
+
+        room_number = selected_room % len(room_list) + 1 if room_list else 0
+        room_info = render_text(info_font, f"Sala: {room.name} ({room_number}/{len(room_list)})",
+                                True, (200, 220, 255))
+        screen.blit(room_info, (330, 165))
+
+        # Indicador de estado del servidor
+        status = game_state.get("status", "waiting")
+        draw_status_indicator(screen, 620, 180, status)
+
+        # Texto del estado
+        status_texts = {
+            "waiting": "Waiting",
+            "ready": "Ready",
+            "running": "Running",
+            "finished": "Finished"
+        }
+        status_text = render_text(info_font, status_texts.get(status, "Unknown"), True, (220, 220, 220))
+        screen.blit(status_text, (640, 165))
+
+        # Contador de jugadores
+        num_players = game_state.get("num_players", 0)
+        players_panel_rect = pygame.Rect(80, 230, 640, 60)
+        draw_panel(screen, players_panel_rect, (50, 40, 80), 200)
+
+        players_text = render_text(font, f"Players: {num_players}/{server.MAX_PLAYERS}", True, (255, 255, 255))
+        screen.blit(players_text, (100, 240))
+
+        # Barra de progreso de jugadores
+        progress_width = 200
+        progress_rect = pygame.Rect(450, 245, progress_width, 30)
+        pygame.draw.rect(screen, (40, 40, 60), progress_rect, border_radius=15)
+
+        if num_players > 0:
+            # Calculamos el ancho de la barra según jugadores conectados
+            filled_width = int((num_players / server.MAX_PLAYERS) * progress_width)
+            filled_rect = pygame.Rect(450, 245, filled_width, 30)
+
+            # Color verde si hay suficientes jugadores, naranja si no
+            if num_players >= server.MIN_PLAYERS:
+                color = (100, 255, 150)
+            else:
+                color = (255, 200, 100)
+
+            pygame.draw.rect(screen, color, filled_rect, border_radius=15)
+
+        pygame.draw.rect(screen, (100, 120, 150), progress_rect, 2, border_radius=15)
+
+        # Lista de jugadores conectados
+        if game_state.get("players"):
+            players_list_panel = pygame.Rect(80, 310, 640, 110)
+            draw_panel(screen, players_list_panel, (40, 45, 70), 200)
+
+            list_title = render_text(small_font, "Jugadores conectados:", True, (180, 200, 255))
+            screen.blit(list_title, (100, 320))
+
+            y_offset = 355
+            x_offset = 120
+            col = 0
+
+            # Mostramos cada jugador con su info
+            for player_id, pdata in game_state.get("players", {}).items():
+                username = pdata.get("username", f"Player{player_id}")
+                lives = pdata.get("lives", 3)
+                score = pdata.get("score", 0)
+                alive = pdata.get("alive", True)
+
+                # Color según si está vivo o muerto
+                if alive:
+                    name_color = (150, 255, 150)  # Verde
+                    icon = "●"  # Círculo lleno
+                else:
+                    name_color = (255, 100, 100)  # Rojo
+                    icon = "○"  # Círculo vacío
+
+                player_text = render_text(info_font, f"{icon} {username}", True, name_color)
+                screen.blit(player_text, (x_offset, y_offset))
+
+                stats_text = render_text(info_font, f"({score} pts, {lives})", True, (200, 200, 200))
+                screen.blit(stats_text, (x_offset + 150, y_offset))
+
+                # Organizamos en dos columnas
+                col += 1
+                if col % 2 == 0:
+                    y_offset += 35
+                    x_offset = 120
+                else:
+                    x_offset = 420
+
+        # Botón de inicio o mensaje de estado según la situación
+        if game_state["num_players"] >= server.MIN_PLAYERS and not game_started:
+            draw_button(screen, start_button_rect, "Iniciando", font, button_hovered, True)
+        elif game_state["status"] == "Corriendo":
+            status_panel = pygame.Rect(250, 480, 300, 80)
+            draw_panel(screen, status_panel, (50, 150, 100), 220)
+            status_msg = render_text(small_font, "Jugando...", True, (150, 255, 150))
+            status_rect = status_msg.get_rect(center=status_panel.center)
+            screen.blit(status_msg, status_rect)
+        elif game_state["status"] == "Terminado":
+            status_panel = pygame.Rect(250, 480, 300, 80)
+            draw_panel(screen, status_panel, (150, 50, 50), 220)
+            status_msg = render_text(small_font, "Juego terminado", True, (255, 150, 150))
+            status_rect = status_msg.get_rect(center=status_panel.center)
+            screen.blit(status_msg, status_rect)
+        else:
+            status_panel = pygame.Rect(200, 480, 400, 80)
+            draw_panel(screen, status_panel, (80, 80, 100), 220)
+
+            # Mensaje según cuántos jugadores faltan
+            if num_players == 0:
+                msg = "Esperando jugadores..."
+            else:
+                msg = f"Necesita {server.MIN_PLAYERS - num_players} mas jugador(es)"
+
+            status_msg = render_text(small_font, msg, True, (200, 200, 200))
+            status_rect = status_msg.get_rect(center=status_panel.center)
+
+            # Texto parpadeante
+            if pygame.time.get_ticks() % 1000 < 500:
+                screen.blit(status_msg, status_rect)
+
+        pygame.display.update()
+
+    pygame.quit()
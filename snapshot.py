@@ -0,0 +1,144 @@
+"""
+Archivo con las utilidades de snapshots del estado del juego.
+
+El servidor numera cada snapshot con un número de secuencia y solo envía
+los campos que cambiaron respecto al último snapshot que el cliente
+confirmó (ack). Este módulo lo usan tanto server.py como network.py.
+"""
+
+from collections import OrderedDict
+
+# Clave especial dentro de un delta con la lista de claves eliminadas
+DELETED_KEY = "__del__"
+
+
+def diff_state(old, new, ignore=()):
+    """
+    Calcula las diferencias entre dos estados del juego.
+
+    Argumentos:
+        old: Diccionario con el estado base (el que ya tiene el cliente)
+        new: Diccionario con el estado actual
+        ignore: Claves que no se comparan en ningún nivel (por ejemplo
+                "x" e "y" cuando las posiciones viajan por UDP)
+
+    Devuelve:
+        dict: Delta con solo los campos que cambiaron. Los diccionarios
+              anidados se comparan de forma recursiva y las claves que
+              desaparecieron se listan en DELETED_KEY. Si no hay cambios
+              devuelve un diccionario vacío.
+    """
+    delta = {}
+
+    for key, value in new.items():
+        if key not in old:
+            # Clave nueva: la enviamos completa
+            delta[key] = value
+            continue
+
+        old_value = old[key]
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            # Comparamos recursivamente (por ejemplo, cada jugador)
+            sub_delta = diff_state(old_value, value, ignore)
+            if sub_delta:
+                delta[key] = sub_delta
+        elif value != old_value and key not in ignore:
+            delta[key] = value
+
+    # Claves que existían en el estado base pero ya no están
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta[DELETED_KEY] = removed
+
+    return delta
+
+
+def apply_delta(base, delta):
+    """
+    Aplica un delta sobre un estado base y devuelve el estado resultante.
+
+    Argumentos:
+        base: Diccionario con el estado base
+        delta: Delta generado por diff_state
+
+    Devuelve:
+        dict: Nuevo estado. El estado base no se modifica; las partes que
+              no cambiaron se comparten entre ambos diccionarios.
+    """
+    state = dict(base)
+
+    for key in delta.get(DELETED_KEY, ()):
+        state.pop(key, None)
+
+    for key, value in delta.items():
+        if key == DELETED_KEY:
+            continue
+        old_value = state.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            state[key] = apply_delta(old_value, value)
+        else:
+            state[key] = value
+
+    return state
+
+
+class SnapshotHistory:
+    """
+    Historial acotado de snapshots indexados por número de secuencia.
+
+    Lo usa el servidor para calcular deltas respecto al último snapshot
+    confirmado por cada cliente, y el cliente para tener disponible el
+    estado base de los deltas que recibe.
+
+    Atributos:
+        max_size: Cantidad máxima de snapshots guardados
+        snapshots: OrderedDict con seq -> estado, del más viejo al más nuevo
+    """
+
+    def __init__(self, max_size=64):
+        """
+        Inicializa un historial vacío.
+
+        Argumentos:
+            max_size: Cantidad máxima de snapshots a guardar
+        """
+        self.max_size = max_size
+        self.snapshots = OrderedDict()
+
+    def add(self, seq, state):
+        """
+        Guarda un snapshot y descarta los más viejos si se supera el límite.
+
+        Argumentos:
+            seq: Número de secuencia del snapshot
+            state: Diccionario con el estado (no se debe modificar después)
+        """
+        self.snapshots[seq] = state
+        while len(self.snapshots) > self.max_size:
+            self.snapshots.popitem(last=False)
+
+    def get(self, seq):
+        """
+        Devuelve el snapshot con la secuencia dada o None si ya no está.
+        """
+        return self.snapshots.get(seq)
+
+    def latest(self):
+        """
+        Devuelve una tupla (seq, estado) con el snapshot más reciente,
+        o None si el historial está vacío.
+        """
+        if not self.snapshots:
+            return None
+        seq = next(reversed(self.snapshots))
+        return seq, self.snapshots[seq]
+
+    def discard_before(self, seq):
+        """
+        Elimina los snapshots con secuencia menor a la dada.
+
+        Argumentos:
+            seq: Secuencia más vieja que se debe conservar
+        """
+        while self.snapshots and next(iter(self.snapshots)) < seq:
+            self.snapshots.popitem(last=False)
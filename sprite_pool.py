@@ -0,0 +1,135 @@
+"""
+Archivo con los pools de sprites y la caché de máscaras.
+
+Láseres, meteoritos y explosiones viven poco: se crean, se dibujan un
+rato y se eliminan con kill(). En lugar de crear un objeto nuevo (y una
+máscara nueva) cada vez, los sprites eliminados vuelven a un pool y el
+próximo se "rearma" con reset(). Las máscaras de colisión se calculan
+una sola vez por superficie.
+
+Con NumPy, main.py maneja los meteoritos y láseres con los arreglos de
+entity_store.py, así que los pools de Meteor y Laser solo se usan sin
+NumPy. El de explosiones se usa siempre.
+"""
+
+import pygame
+
+from assets import assets
+
+POOL_SIZE = 256  # Máximo de sprites libres guardados por pool
+
+
+def get_mask(surf):
+    """
+    Devuelve la máscara de colisión de una superficie, calculándola una sola vez.
+
+    Argumentos:
+        surf: Superficie (no se debe modificar después de pedir su máscara)
+
+    Devuelve:
+        pygame.mask.Mask: Máscara compartida por todos los que usan la superficie
+                          (las de las imágenes del atlas ya están calculadas)
+    """
+    return assets.mask(surf)
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """
+    Sprite que vuelve a su pool cuando se elimina con kill().
+
+    Las subclases inicializan todo su estado en reset(), así el mismo
+    objeto se puede reutilizar.
+
+    Atributos:
+        pool: SpritePool al que vuelve el sprite (o None)
+    """
+
+    def __init__(self, groups, *args, pool=None, **kwargs):
+        """
+        Crea el sprite y lo arma con reset().
+
+        Argumentos:
+            groups: Grupos de sprites a los que pertenece
+            pool: SpritePool al que vuelve al eliminarse (opcional)
+            Los demás argumentos se pasan a reset()
+        """
+        super().__init__(groups)
+        self.pool = pool
+        self.reset(*args, **kwargs)
+
+    def reset(self, *args, **kwargs):
+        """
+        Inicializa el estado del sprite. Las subclases la redefinen con sus
+        propios argumentos; esta no hace nada.
+        """
+
+    def kill(self):
+        """
+        Elimina el sprite de todos sus grupos y lo devuelve a su pool.
+        """
+        was_alive = self.alive()
+        super().kill()
+        # Solo lo devolvemos una vez, aunque se llame a kill() de nuevo
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    """
+    Pool de sprites de una clase, con contadores de reutilización.
+
+    Atributos:
+        sprite_class: Subclase de PooledSprite que se crea
+        max_size: Máximo de sprites libres guardados
+        free: Lista de sprites eliminados listos para reutilizar
+        hits: Veces que se reutilizó un sprite
+        misses: Veces que hubo que crear un sprite nuevo
+    """
+
+    def __init__(self, sprite_class, max_size=POOL_SIZE):
+        """
+        Crea un pool vacío.
+
+        Argumentos:
+            sprite_class: Subclase de PooledSprite que se crea
+            max_size: Máximo de sprites libres guardados
+        """
+        self.sprite_class = sprite_class
+        self.max_size = max_size
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, groups, *args, **kwargs):
+        """
+        Devuelve un sprite armado con los argumentos dados y agregado a los grupos.
+
+        Argumentos:
+            groups: Grupos de sprites a los que pertenece
+            Los demás argumentos son los de reset() de la clase
+
+        Devuelve:
+            PooledSprite: Un sprite reutilizado si hay alguno libre, o uno nuevo
+        """
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args, **kwargs)
+            sprite.add(groups)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        return self.sprite_class(groups, *args, pool=self, **kwargs)
+
+    def release(self, sprite):
+        """
+        Guarda un sprite eliminado para reutilizarlo (si el pool no está lleno).
+        """
+        if len(self.free) < self.max_size:
+            self.free.append(sprite)
+
+    def stats(self):
+        """
+        Devuelve un diccionario con los contadores del pool.
+        """
+        return {"hits": self.hits, "misses": self.misses, "free": len(self.free)}
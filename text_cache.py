@@ -0,0 +1,103 @@
+"""
+Archivo con la caché de textos renderizados.
+
+Renderizar un texto con una fuente TrueType rasteriza cada letra. El HUD,
+el marcador y los menús dibujan casi siempre los mismos textos, así que
+las superficies ya renderizadas se guardan según (fuente, texto, color,
+antialias) y un texto que no cambió cuesta solo un blit.
+
+La caché es LRU: cuando se llena se descartan los textos usados hace
+más tiempo (por ejemplo, puntajes viejos).
+"""
+
+from collections import OrderedDict
+
+MAX_ENTRIES = 512  # Cantidad máxima de textos guardados
+
+
+class TextCache:
+    """
+    Caché LRU de superficies de texto.
+
+    Atributos:
+        max_entries: Cantidad máxima de textos guardados
+        surfaces: OrderedDict clave -> superficie, de la menos a la más usada
+        hits: Veces que se reutilizó un texto
+        misses: Veces que hubo que renderizar un texto
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        """
+        Crea una caché vacía.
+
+        Argumentos:
+            max_entries: Cantidad máxima de textos guardados
+        """
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color, background=None):
+        """
+        Devuelve el texto renderizado, renderizándolo solo si no está guardado.
+
+        Argumentos:
+            font: pygame.font.Font con la que se renderiza
+            text: Texto a renderizar
+            antialias: Si se suavizan los bordes
+            color: Color RGB del texto
+            background: Color de fondo (opcional), igual que en Font.render
+
+        Devuelve:
+            pygame.Surface: Superficie compartida (no se debe modificar)
+        """
+        key = (font, text, antialias, tuple(color),
+               None if background is None else tuple(background))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color, background)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def hit_rate(self):
+        """
+        Devuelve la proporción de textos que salieron de la caché (de 0 a 1).
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """
+        Devuelve un diccionario con los contadores de la caché.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self.surfaces), "hit_rate": self.hit_rate()}
+
+
+# Caché compartida por todas las pantallas del cliente y del panel del servidor
+cache = TextCache()
+
+
+def render_text(font, text, antialias, color, background=None):
+    """
+    Renderiza un texto usando la caché compartida.
+
+    Argumentos:
+        font: pygame.font.Font con la que se renderiza
+        text: Texto a renderizar
+        antialias: Si se suavizan los bordes
+        color: Color RGB del texto
+        background: Color de fondo (opcional)
+
+    Devuelve:
+        pygame.Surface: Superficie compartida (no se debe modificar)
+    """
+    return cache.render(font, text, antialias, color, background)